@@ -0,0 +1,103 @@
+"""
+Micro-benchmark for history file codecs.
+
+Builds synthetic histories of 1k/10k/100k user/model pairs and reports save
+time, load time and file size for every codec available in this environment.
+
+Usage:
+    python benchmarks/bench_codecs.py [--sizes 1000 10000 100000] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from terminator_app.Data import codec
+from terminator_app.Data.codec import Codec
+
+
+def build_history(pair_count: int, pairs_per_conversation: int = 20) -> list[dict]:
+    """Synthetic history shaped like conversation_history.json."""
+    history = []
+    for c in range(0, pair_count, pairs_per_conversation):
+        messages = [{
+            "user": {"role": "user", "parts": [], "timestamp": None},
+            "model": {"role": "model", "parts": [{"text": "Hello! How can I assist you today?"}],
+                      "timestamp": "2025-01-01T00:00:00"},
+            "ai_pending": False,
+            "gen_id": None,
+        }]
+        for i in range(min(pairs_per_conversation, pair_count - c)):
+            messages.append({
+                "user": {"role": "user", "parts": [{"text": f"Question {c + i}: how do I sort a list in Python?"}],
+                         "timestamp": "2025-01-01T00:00:00"},
+                "model": {"role": "model", "parts": [{"text": "Use `sorted(items)` for a new list or "
+                                                              "`items.sort()` to sort in place.\n" * 8}],
+                          "timestamp": "2025-01-01T00:00:01"},
+                "ai_pending": False,
+                "gen_id": f"msg_conv_{c}",
+            })
+        history.append({"id": f"conv_{c}", "timestamp": "2025-01-01T00:00:00",
+                        "title": f"Conversation {c}", "messages": messages})
+    return history
+
+
+def available_codecs() -> list[tuple[str, object]]:
+    """(label, encoder) pairs; encoder is a Codec or the legacy json.dump call."""
+    legacy = ("legacy json indent=2", None)
+    codecs = [legacy, ("json compact", Codec("json")), ("json + gzip", Codec("json", "gzip"))]
+    if codec.zstandard is not None:
+        codecs.append(("json + zstd", Codec("json", "zstd")))
+    if codec.msgpack is not None:
+        codecs.append(("msgpack", Codec("msgpack")))
+        codecs.append(("msgpack + gzip", Codec("msgpack", "gzip")))
+        if codec.zstandard is not None:
+            codecs.append(("msgpack + zstd", Codec("msgpack", "zstd")))
+    return codecs
+
+
+def bench(history: list[dict], encoder, path: str, repeat: int) -> tuple[float, float, int]:
+    save_times, load_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if encoder is None:
+            with open(path, 'w') as f:
+                json.dump(history, f, indent=2)
+        else:
+            with open(path, 'wb') as f:
+                f.write(encoder.dumps(history))
+        save_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with open(path, 'rb') as f:
+            loaded = Codec.loads(f.read())
+        load_times.append(time.perf_counter() - start)
+        assert len(loaded) == len(history)
+    return min(save_times), min(load_times), os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if codec.orjson else 'no'}, msgpack: {'yes' if codec.msgpack else 'no'}, "
+          f"zstandard: {'yes' if codec.zstandard else 'no'}\n")
+    print(f"{'messages':>9}  {'codec':<22} {'save ms':>9} {'load ms':>9} {'size KiB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.bin")
+        for size in args.sizes:
+            history = build_history(size)
+            for label, encoder in available_codecs():
+                save_s, load_s, file_size = bench(history, encoder, path, args.repeat)
+                print(f"{size:>9}  {label:<22} {save_s * 1000:>9.1f} {load_s * 1000:>9.1f} {file_size / 1024:>10.0f}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
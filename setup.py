@@ -22,7 +22,7 @@ setup(
     include_package_data=True,
     
     install_requires=[
-        "textual>=0.47.0",
+        "textual>=8.2.8",  # textual.visual, text-wrap/text-overflow CSS
         "google-genai",       # The new v1.0+ SDK
         "python-dotenv>=1.0.0",
         # Removed Pillow if you aren't actually processing images locally, 
@@ -29,8 +29,9 @@ class ChatDataManager:
             self.write_conversation_to_history(conv)
         return changed
 
-    def start_auto_response(self, conv: ConversationDict, index: int, input_controller, app_instance):
-        """Trigger AI response for a user/model pair at index if model is None and not ai_pending."""
+    def start_auto_response(self, conv: ConversationDict, index: int, input_controller, app_instance, priority):
+        """Trigger AI response for a user/model pair at index if model is None and not ai_pending.
+        `priority` is the worker pool priority the controller gives the response."""
         messages = conv.get('messages', [])
         if 1 <= index < len(messages):
             pair = messages[index]
@@ -39,27 +40,17 @@ class ChatDataManager:
                 user_text = ''.join(part.get('text', '') for part in user_msg.get('parts', []) if isinstance(part, dict) and 'text' in part)
                 if user_text and not pair.get('ai_pending'):
                     pair['ai_pending'] = True
-                    self.write_conversation_to_history(conv)
-                    input_controller.ai_handler.start_ai_response_thread((user_text, index), conv, app_instance)
+                    self.write_conversation_to_history(conv, index)
+                    input_controller.ai_handler.start_ai_response_thread(
+                        (user_text, index), conv, app_instance, priority=priority
+                    )
 
-    def write_conversation_to_history(self, conv: ConversationDict) -> bool:
-        """Write conversation to history using DataManager. Returns True if successful."""
-        conv_id = conv.get('id')
-        if not conv_id:
+    def write_conversation_to_history(self, conv: ConversationDict, index: int = None) -> bool:
+        """Write conversation to history using DataManager. Returns True if successful.
+        If `index` is given, only the user/model pair at that index is persisted."""
+        if not conv.get('id'):
             return False
-        # Always update the conversation in memory and force save to disk
-        existing = self.data_manager.get_conversation_by_id(conv_id)
-        if existing is None:
-            self.data_manager._conversation_history.append(conv)
-            self.data_manager._conversation_dict[conv_id] = conv
-        else:
-            self.data_manager._conversation_dict[conv_id] = conv
-            # Replace in history list
-            for i, c in enumerate(self.data_manager._conversation_history):
-                if c.get('id') == conv_id:
-                    self.data_manager._conversation_history[i] = conv
-                    break
-        return self.data_manager.save_to_disk()
+        return self.data_manager.save_conversation(conv, index)
     
     def create_new_conversation(self, new_conv_id: str, AI_controller) -> ConversationDict:
         """Create a new conversation with a unique ID."""
@@ -0,0 +1,201 @@
+"""
+ChatListView - Virtualized chat view.
+Every page of a conversation (the greeting and each user/model pair) is a
+row. Only rows in or next to the viewport are rendered, through the Textual
+line API, and only the most recently shown rows are kept; rows further away
+are dropped and rendered again when scrolled back into view. Rows never
+rendered count with an estimated height, so a long conversation costs a
+list of row heights, not a widget per message.
+"""
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Callable, Hashable, Optional
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.visual import Visual, visualize
+try:
+    from terminator_app.config import UserConfig
+except ImportError:
+    from config import UserConfig
+
+
+class ChatListView(ScrollView):
+    """Scrollable list of rows supplied by `show()`.
+
+    `content_hash(row)` identifies a row's current content and
+    `render(row, width)` returns its markup; a rendered row is reused until
+    its hash or the width changes. The view follows the end of the list
+    while it is scrolled to the bottom (e.g. while a reply streams in), and
+    reports the row at the top of the viewport through `on_anchor`.
+    """
+
+    ESTIMATED_ROW_HEIGHT = 6
+    OVERSCAN_ROWS = 1  # Rows rendered beyond each edge of the viewport
+
+    def __init__(self, max_cached_rows: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_cached_rows = max_cached_rows or UserConfig.CHAT_ROW_CACHE
+        self._key: Optional[Hashable] = None
+        self._content_hash: Callable[[int], str] = lambda row: ""
+        self._render_markup: Callable[[int, int], str] = lambda row, width: ""
+        self._on_anchor: Optional[Callable[[int], None]] = None
+        self._heights: list[int] = []
+        self._offsets: list[int] = [0]  # First line of each row, then the total height
+        self._rows: OrderedDict[int, tuple[str, int, list[Strip]]] = OrderedDict()  # row -> (hash, width, strips)
+        self._anchor = 0
+        self._measuring = False
+        self.stats = {'rows_rendered': 0, 'rows_recycled': 0}
+
+    @property
+    def row_width(self) -> int:
+        return self.scrollable_content_region.width
+
+    @property
+    def row_count(self) -> int:
+        return len(self._heights)
+
+    def show(self, key: Hashable, row_count: int, content_hash: Callable[[int], str],
+             render: Callable[[int, int], str], anchor: int = 0,
+             on_anchor: Optional[Callable[[int], None]] = None) -> None:
+        """Display `row_count` rows of list `key` with row `anchor` at the top,
+        or the end of the list when `anchor` is the last row. Showing the same
+        list and anchor again only redraws rows whose content changed."""
+        at_end = self.scroll_y >= self.max_scroll_y
+        self._content_hash, self._render_markup, self._on_anchor = content_hash, render, on_anchor
+        if key != self._key:
+            self._key = key
+            self._rows.clear()
+            self._heights = [self.ESTIMATED_ROW_HEIGHT] * row_count
+            jump = True
+        else:
+            del self._heights[row_count:]
+            self._heights.extend([self.ESTIMATED_ROW_HEIGHT] * (row_count - len(self._heights)))
+            for row in [row for row in self._rows if row >= row_count]:
+                del self._rows[row]
+            jump = anchor != self._anchor
+        self._update_layout()
+        if jump:
+            self._anchor = anchor
+            if anchor >= row_count - 1:
+                self._scroll_to_end()
+            else:
+                self._scroll_to_row(anchor)
+        elif at_end:
+            self._scroll_to_end()
+        self._measure()
+        self.refresh()
+
+    def clear(self) -> None:
+        self._key = None
+        self._rows.clear()
+        self._heights = []
+        self._update_layout()
+        self.refresh()
+
+    # --- Layout ---
+
+    def _update_layout(self) -> None:
+        self._offsets = [0, *accumulate(self._heights)]
+        self.virtual_size = Size(self.row_width, self._offsets[-1])
+
+    def _row_at(self, line: int) -> int:
+        return min(max(0, bisect_right(self._offsets, line) - 1), self.row_count - 1)
+
+    def _scroll_to_row(self, row: int) -> None:
+        self._measure_from(row)
+        self.scroll_to(y=self._offsets[row], animate=False, force=True, immediate=True)
+
+    def _scroll_to_end(self) -> None:
+        # Measure the last rows first so the end is where it will stay
+        height, row = 0, self.row_count - 1
+        while row >= 0 and height < self.scrollable_content_region.height:
+            height += len(self._strips(row))
+            row -= 1
+        self._update_layout()
+        self.scroll_to(y=self.max_scroll_y, animate=False, force=True, immediate=True)
+
+    def _measure_from(self, first: int) -> bool:
+        """Render rows from `first` until the viewport is filled. Returns True if a height changed."""
+        changed, filled, row = False, 0, max(0, first)
+        limit = self.scrollable_content_region.height
+        while row < self.row_count and filled < limit:
+            before = self._heights[row]
+            filled += len(self._strips(row))
+            changed = changed or self._heights[row] != before
+            row += 1
+        for extra in range(row, min(row + self.OVERSCAN_ROWS, self.row_count)):
+            before = self._heights[extra]
+            self._strips(extra)
+            changed = changed or self._heights[extra] != before
+        if changed:
+            self._update_layout()
+        return changed
+
+    def _measure(self) -> None:
+        """Render the rows around the viewport, keeping the top row in place
+        when rows above it turn out taller or shorter than estimated."""
+        if self._measuring or not self.row_count:
+            return
+        self._measuring = True
+        try:
+            at_end = self.scroll_y >= self.max_scroll_y and self.scroll_y > 0
+            top = self._row_at(int(self.scroll_y))
+            within = int(self.scroll_y) - self._offsets[top]
+            if self._measure_from(top - self.OVERSCAN_ROWS):
+                target = self.max_scroll_y if at_end else self._offsets[top] + within
+                self.scroll_to(y=target, animate=False, force=True, immediate=True)
+            top = self._row_at(int(self.scroll_y))
+            if top != self._anchor:
+                self._anchor = top
+                if self._on_anchor:
+                    self._on_anchor(top)
+        finally:
+            self._measuring = False
+
+    def _strips(self, row: int) -> list[Strip]:
+        """The rendered lines of a row, from the row cache when still valid."""
+        content_hash, width = self._content_hash(row), self.row_width
+        cached = self._rows.get(row)
+        if cached is not None and cached[0] == content_hash and cached[1] == width:
+            self._rows.move_to_end(row)
+            return cached[2]
+        visual = visualize(self, self._render_markup(row, width))
+        strips = Visual.to_strips(self, visual, width, None, self.visual_style) or [Strip.blank(width)]
+        self._rows[row] = (content_hash, width, strips)
+        self._rows.move_to_end(row)
+        self._heights[row] = len(strips)
+        self.stats['rows_rendered'] += 1
+        while len(self._rows) > self.max_cached_rows:
+            self._rows.popitem(last=False)
+            self.stats['rows_recycled'] += 1
+        return strips
+
+    # --- Textual hooks ---
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if round(old_value) != round(new_value):
+            self._measure()
+
+    def on_resize(self) -> None:
+        """Re-lay out the rows: they are rendered again at the new width."""
+        self._update_layout()
+        self._measure()
+        self.refresh()
+
+    def render_line(self, y: int) -> Strip:
+        width = self.row_width
+        line = int(self.scroll_y) + y
+        if self.row_count and line < self._offsets[-1]:
+            row = self._row_at(line)
+            height = self._heights[row]
+            strips = self._strips(row)
+            if len(strips) != height:
+                # Not measured yet: fix the layout after this frame
+                self.call_later(self.on_resize)
+            offset = line - self._offsets[row]
+            if offset < len(strips):
+                return strips[offset].adjust_cell_length(width).apply_style(self.rich_style)
+        return Strip.blank(width, self.rich_style)
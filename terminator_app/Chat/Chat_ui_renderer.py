@@ -1,5 +1,4 @@
 from textual.widgets import Static
-from textual.containers import VerticalScroll
 import re, textwrap
 from rich.markdown import Markdown as RichMarkdown
 from rich.console import Console
@@ -7,101 +6,146 @@ from rich.text import Text
 
 try:
     from terminator_app.interfaces import ConversationDict
+    from terminator_app.Chat.Streaming_markdown import StreamingMarkdown
+    from terminator_app.Chat.Render_cache import RenderCache
+    from terminator_app.Chat.Chat_list_view import ChatListView
+    from terminator_app.config import UserConfig
 except ImportError:
     from interfaces import ConversationDict
+    from Chat.Streaming_markdown import StreamingMarkdown
+    from Chat.Render_cache import RenderCache
+    from Chat.Chat_list_view import ChatListView
+    from config import UserConfig
 
 
 class ChatUIRenderer:
     def __init__(self):
         self.chat_position_index = {}
+        self.markdown = StreamingMarkdown(self._render_prose, self._render_code_block)
+        self.render_cache = RenderCache(UserConfig.RENDER_CACHE_MAX_BYTES)
 
-    def display_conversation_at_index(self, conv: ConversationDict, chat_panel: Static, chat_scroll: VerticalScroll) -> None:
-        """Display conversation for mixed format: greeting at index 0, user/model pairs at index 1+."""
-        text = f"Conversation: {conv.get('id')}\n"
-        text += f"Time: {conv.get('timestamp')}\n\n"
-
+    def display_conversation_at_index(self, conv: ConversationDict, chat_panel: Static, chat_scroll: ChatListView) -> None:
+        """Display conversation for mixed format: greeting at index 0, user/model pairs at index 1+.
+        The header goes to chat_panel; every page is a row of the virtualized chat_scroll, scrolled to the current index."""
         messages = conv.get('messages', [])
         total_length = len(messages)
-
-        pair_count = total_length - 1
-        default_index = 0
-        index = self.chat_position_index.get(conv.get('id'), default_index)
+        index = self.chat_position_index.get(conv.get('id'), 0)
 
         if total_length == 0:
-            chat_panel.update(text + "[dim]No messages yet[/dim]")
+            chat_panel.update(self._header(conv) + "[dim]No messages yet[/dim]")
+            chat_scroll.clear()
             return
-        
-        panel_width = chat_panel.size.width if chat_panel.size.width > 0 else chat_scroll.size.width
-        box_width = max(20, panel_width - 4)
 
-        # Greeting message
+        index = min(max(index, 0), total_length - 1)
+        chat_panel.update(self._header(conv, index))
+        chat_scroll.show(
+            conv.get('id'), total_length,
+            content_hash=lambda i: RenderCache.content_hash(*self._page_content(messages, i)),
+            render=lambda i, width: self._render_page(conv, i, self._box_width(width)),
+            anchor=index,
+            on_anchor=lambda i: self._on_anchor(conv, chat_panel, i),
+        )
+
+    def is_page_cached(self, conv: ConversationDict, chat_panel: Static, chat_scroll: ChatListView) -> bool:
+        """Whether the current page of `conv` can be displayed from the render cache."""
+        messages = conv.get('messages', [])
+        index = self.chat_position_index.get(conv.get('id'), 0)
+        if not 0 <= index < len(messages):
+            return False
+        content_hash = RenderCache.content_hash(*self._page_content(messages, index))
+        return self.render_cache.contains(conv.get('id'), index, content_hash, self._box_width(chat_scroll.row_width))
+
+    def _header(self, conv: ConversationDict, index: int | None = None) -> str:
+        text = f"Conversation: {conv.get('id')}\n"
+        text += f"Time: {conv.get('timestamp')}\n"
+        if index is not None:
+            text += f"[dim]Page {index + 1}/{len(conv.get('messages', []))}[/dim]"
+        return text
+
+    def _on_anchor(self, conv: ConversationDict, chat_panel: Static, index: int) -> None:
+        """The chat view was scrolled: the page at its top becomes the current one."""
+        self.chat_position_index[conv.get('id')] = index
+        chat_panel.update(self._header(conv, index))
+
+    def _box_width(self, row_width: int) -> int:
+        return max(20, row_width - 2)
+
+    def _page_content(self, messages, index: int) -> tuple:
+        """The texts a page is rendered from: (greeting,) or (user, model, ai_pending)."""
         if index == 0:
             greeting = messages[index].get('model', {})
-            text_parts = ''.join(part.get('text', '') for part in greeting.get('parts', []) if isinstance(part, dict) and 'text' in part)
+            return (''.join(part.get('text', '') for part in greeting.get('parts', []) if isinstance(part, dict) and 'text' in part),)
+        user_msg = messages[index].get('user', {})
+        model_msg = messages[index].get('model', {})
+        user_text = ''.join(part.get('text', '') for part in user_msg.get('parts', []))
+        model_text = None
+        if isinstance(model_msg, dict) and model_msg.get('parts'):
+            model_text = ''.join(part.get('text', '') for part in model_msg.get('parts', []))
+        return user_text, model_text, messages[index].get('ai_pending', False)
+
+    def _render_page(self, conv: ConversationDict, index: int, box_width: int) -> str:
+        """Markup of one page, from the render cache when its content and width are unchanged."""
+        content = self._page_content(conv.get('messages', []), index)
+        content_hash = RenderCache.content_hash(*content)
+        markup = self.render_cache.get(conv.get('id'), index, content_hash, box_width)
+        if markup is None:
+            markup = self._render_greeting(*content, box_width) if index == 0 else self._render_pair(*content, box_width)
+            # Textual markup has no alignment tags; [right] would only be parsed, slowly, as an unknown style
+            markup = markup.replace('[right]', '').replace('[/right]', '')
+            self.render_cache.put(conv.get('id'), index, content_hash, box_width, markup)
+        return markup
+
+    def _render_greeting(self, text_parts: str, box_width: int) -> str:
+        text = f"[right][magenta]{'─' * (box_width - 13)} ASSISTANT ─┐[/magenta][/right]\n"
+        text += f"[right]{self._render_markdown(text_parts, box_width)}[/right]"
+        text += f"\n[right][magenta]{'─' * (box_width - 1)}┘[/magenta][/right]\n\n"
+        return text
+
+    def _render_pair(self, user_text: str, model_text: str | None, ai_pending: bool, box_width: int) -> str:
+        """Markup of a user/model pair."""
+        text = ""
+        # Parse text
+        thoughts, final_answer = self.parse_thinking_response(model_text) if model_text else (None, None)
+
+        # --- RENDER USER ---
+        if user_text:
+            text += f"[cyan]┌─ USER {'─' * (box_width - 8)}[/cyan]\n"
+            text += self._render_markdown(user_text, box_width)
+            text += f"\n[cyan]└{'─' * (box_width - 1)}[/cyan]\n\n"
+
+        # --- RENDER ASSISTANT ---
+
+        # Case 1: We have the Final Answer (Finished thinking)
+        if final_answer:
+            # Optional: You can uncomment this if you want to show collapsed thoughts above the answer
+            # text += f"[dim]💭 Thought Process: {thoughts[:50]}...[/dim]\n" 
+
             text += f"[right][magenta]{'─' * (box_width - 13)} ASSISTANT ─┐[/magenta][/right]\n"
-            text += f"[right]{self._render_markdown(text_parts, box_width)}[/right]"
+            text += f"[right]{self._render_markdown(final_answer, box_width)}[/right]"
             text += f"\n[right][magenta]{'─' * (box_width - 1)}┘[/magenta][/right]\n\n"
-        
-        # ... inside display_conversation_at_index ...
-        
-        # User/Model pairs
-        elif 1 <= index <= pair_count:
-            user_msg = messages[index].get('user', {})
-            model_msg = messages[index].get('model', {})
-            ai_pending = messages[index].get('ai_pending', False)
-            
-            user_text = ''.join(part.get('text', '') for part in user_msg.get('parts', []))
-            
-            model_text = None
-            if isinstance(model_msg, dict) and model_msg.get('parts'):
-                model_text = ''.join(part.get('text', '') for part in model_msg.get('parts', []))
-            
-            # Parse text
-            thoughts, final_answer = self.parse_thinking_response(model_text) if model_text else (None, None)
-
-            # --- RENDER USER ---
-            if user_text:
-                text += f"[cyan]┌─ USER {'─' * (box_width - 8)}[/cyan]\n"
-                text += self._render_markdown(user_text, box_width)
-                text += f"\n[cyan]└{'─' * (box_width - 1)}[/cyan]\n\n"
-            
-            # --- RENDER ASSISTANT ---
-            
-            # Case 1: We have the Final Answer (Finished thinking)
-            if final_answer:
-                # Optional: You can uncomment this if you want to show collapsed thoughts above the answer
-                # text += f"[dim]💭 Thought Process: {thoughts[:50]}...[/dim]\n" 
-                
-                text += f"[right][magenta]{'─' * (box_width - 13)} ASSISTANT ─┐[/magenta][/right]\n"
-                text += f"[right]{self._render_markdown(final_answer, box_width)}[/right]"
-                text += f"\n[right][magenta]{'─' * (box_width - 1)}┘[/magenta][/right]\n\n"
-
-            # Case 2: We are actively Thinking (Streaming thoughts)
-            elif thoughts:
-                # Show the live thought stream in a dim box
-                text += f"[right][dim]┌─ 🧠 Thinking... {'─' * (box_width - 16)}┐[/dim][/right]\n"
-                # Render thoughts (limit length or box height if needed)
-                text += f"[right][dim]{self._render_markdown(thoughts, box_width)}[/dim][/right]"
-                text += f"\n[right][dim]└{'─' * (box_width - 1)}┘[/dim][/right]\n\n"
-
-            # Case 3: Waiting for first token (Connected, but empty)
-            elif ai_pending and not model_text:
-                text += f"[bold][yellow]⏳ Waiting for assistant response...[/yellow][/bold]\n\n"
-
-            # Case 4: Finished but empty/error
-            elif not ai_pending and not model_text:
-                text += f"[bold][red]⚠️ No assistant response available.[/red][/bold]\n\n"
-            
-            # Case 5: Fallback (Has text, but regex didn't match tags, likely standard model)
-            elif model_text and not final_answer:
-                 text += f"[right][magenta]{'─' * (box_width - 13)} ASSISTANT ─┐[/magenta][/right]\n"
-                 text += f"[right]{self._render_markdown(model_text, box_width)}[/right]"
-                 text += f"\n[right][magenta]{'─' * (box_width - 1)}┘[/magenta][/right]\n\n"
-        current_page = index + 1
-        total_pages = pair_count + 1
-        text += f"\n[dim]Page {current_page}/{total_pages}[/dim]"
-        chat_panel.update(text)
-        chat_scroll.scroll_end(animate=True)
+
+        # Case 2: We are actively Thinking (Streaming thoughts)
+        elif thoughts:
+            # Show the live thought stream in a dim box
+            text += f"[right][dim]┌─ 🧠 Thinking... {'─' * (box_width - 16)}┐[/dim][/right]\n"
+            # Render thoughts (limit length or box height if needed)
+            text += f"[right][dim]{self._render_markdown(thoughts, box_width)}[/dim][/right]"
+            text += f"\n[right][dim]└{'─' * (box_width - 1)}┘[/dim][/right]\n\n"
+
+        # Case 3: Waiting for first token (Connected, but empty)
+        elif ai_pending and not model_text:
+            text += f"[bold][yellow]⏳ Waiting for assistant response...[/yellow][/bold]\n\n"
+
+        # Case 4: Finished but empty/error
+        elif not ai_pending and not model_text:
+            text += f"[bold][red]⚠️ No assistant response available.[/red][/bold]\n\n"
+
+        # Case 5: Fallback (Has text, but regex didn't match tags, likely standard model)
+        elif model_text and not final_answer:
+             text += f"[right][magenta]{'─' * (box_width - 13)} ASSISTANT ─┐[/magenta][/right]\n"
+             text += f"[right]{self._render_markdown(model_text, box_width)}[/right]"
+             text += f"\n[right][magenta]{'─' * (box_width - 1)}┘[/magenta][/right]\n\n"
+        return text
 
     def parse_thinking_response(self, raw_response: str) -> tuple[str | None, str | None]:
         """
@@ -129,18 +173,19 @@ class ChatUIRenderer:
 
     def view_page(self, increment_or_special: int | str, conv: ConversationDict) -> int:
         """Navigate to a different page: greeting at index 0, user/model pairs at index 1+.
-        If increment_or_special == 'end', jump to last page.
+        If increment_or_special == 'end', jump to last page; moves past either end stop at it.
         If the current page is a user/model pair with None model, trigger AI response once."""
         messages = conv.get('messages', [])
         pair_count = len(messages) - 1
+        if pair_count < 0:
+            return -1
+        current = self.chat_position_index.get(conv.get('id'), 0)
         if increment_or_special == 'end':
             new_index = pair_count
         else:
-            new_index = self.chat_position_index.get(conv.get('id'), 0) + increment_or_special
-        if new_index < 0:
-            return -1
-        elif new_index > pair_count:
-            return -1
+            new_index = min(max(current + increment_or_special, 0), pair_count)
+            if new_index == current and increment_or_special != 0:
+                return -1
         self.chat_position_index[conv.get('id')] = new_index
         # If on a user/model pair with None model, trigger AI auto-response
         return new_index if 1 <= new_index <= pair_count else -1
@@ -168,32 +213,13 @@ class ChatUIRenderer:
         return f"{top_line}\n{label}\n{url_line}\n{bottom_line}"
 
     def _render_markdown(self, content: str, box_width: int = 80) -> str:
-        """Render markdown content with modular handlers for code, images, and more."""
+        """Render markdown content with modular handlers for code, images, and more.
+        Completed blocks are cached, so a streaming reply only re-renders its tail."""
+        return self.markdown.render(content, box_width)
 
-        # Patterns for code blocks and images
-        code_block_pattern = re.compile(r"```(\w+)?\n([\s\S]*?)```", re.MULTILINE)
-        image_pattern = re.compile(r"!\[(.*?)\]\((.*?)\)")
-        parts = []
-        last_end = 0
-        # Process code blocks
-        for match in code_block_pattern.finditer(content):
-            # Markdown before code block
-            if match.start() > last_end:
-                md_text = content[last_end:match.start()]
-                md_chunks = self._process_images(md_text, box_width)
-                parts.extend(md_chunks)
-            # Code block
-            lang = match.group(1) or ""
-            code = match.group(2)
-            code_lines = code.splitlines()
-            parts.append(self._render_code_block(lang, code_lines, box_width))
-            last_end = match.end()
-        # Markdown after last code block
-        if last_end < len(content):
-            md_text = content[last_end:]
-            md_chunks = self._process_images(md_text, box_width)
-            parts.extend(md_chunks)
-        return '\n'.join(parts)
+    def _render_prose(self, md_text: str, box_width: int) -> str:
+        """Render one paragraph (with any images in it)."""
+        return '\n'.join(self._process_images(md_text, box_width)).strip('\n')
 
     def _process_images(self, md_text, box_width):
         """Detect and render images in markdown text, return list of markup chunks."""
@@ -227,7 +253,6 @@ class ChatUIRenderer:
             parts.append(md_markup)
         return parts
 
-    def show_loading_screen(self, chat_panel: Static, chat_scroll: VerticalScroll, message: str = "Loading conversation..."):
-        loading_text = f"[bold][yellow]⏳ {message}[/yellow][/bold]\n\n[dim]Please wait while the conversation loads.[/dim]"
-        chat_panel.update(loading_text)
-        chat_scroll.scroll_end(animate=False)
\ No newline at end of file
+    def show_loading_screen(self, chat_panel: Static, chat_scroll: ChatListView, message: str = "Loading conversation..."):
+        loading_text = f"[bold][yellow]⏳ {message}[/yellow][/bold]\n[dim]Please wait while the conversation loads.[/dim]"
+        chat_panel.update(loading_text)
\ No newline at end of file
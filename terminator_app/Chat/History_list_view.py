@@ -0,0 +1,185 @@
+"""
+HistoryListView - Virtualized conversation list for the history panel.
+Only the buttons that fit in the panel are mounted. Scrolling moves the
+list a row at a time and relabels those buttons, fetching the metadata of
+the rows in view page by page, so the cost of the panel does not grow with
+the number of conversations.
+"""
+from typing import Callable, Hashable, Optional
+from textual import events
+from textual.binding import Binding
+from textual.containers import Vertical
+from textual.widgets import Button, Static
+try:
+    from terminator_app.config import Config
+except ImportError:
+    from config import Config
+
+
+class HistoryRow(Button):
+    """A reusable history button; `conv_id` is the conversation it currently shows."""
+
+    # Rows share one height, so long titles are cut off instead of wrapped
+    DEFAULT_CSS = """
+    HistoryRow {
+        text-wrap: nowrap;
+        text-overflow: ellipsis;
+    }
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__("", classes=Config.CONVERSATION_BUTTON_CLASS, **kwargs)
+        self.conv_id: Optional[str] = None
+
+
+class HistoryListView(Vertical):
+    """List of conversation buttons, all of the same height.
+
+    `show()` sets the number of rows, with `fetch(start, count)` returning the
+    metadata of a range of rows and `describe(metadata)` building a label;
+    `on_window(metadatas)` is told which rows came into view.
+    The list scrolls by whole rows with the mouse wheel, or with the arrow,
+    page and home/end keys while a row has focus.
+    """
+
+    DEFAULT_CSS = """
+    HistoryListView {
+        overflow: hidden hidden;
+    }
+    """
+
+    BINDINGS = [
+        Binding("up", "scroll_rows(-1)", show=False),
+        Binding("down", "scroll_rows(1)", show=False),
+        Binding("pageup", "scroll_page(-1)", show=False),
+        Binding("pagedown", "scroll_page(1)", show=False),
+        Binding("home", "scroll_home_row", show=False),
+        Binding("end", "scroll_end_row", show=False),
+    ]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._placeholder = Static("", classes="history-placeholder")
+        self._rows: list[HistoryRow] = []
+        self._row_count = 0
+        self._row_height = 3
+        self._fetch: Callable[[int, int], list[dict]] = lambda start, count: []
+        self._describe: Callable[[dict], str] = lambda metadata: ""
+        self._on_window: Callable[[list[dict]], None] = lambda window: None
+        self._selected: Optional[str] = None
+        self._key: Optional[Hashable] = None
+        self._first = 0
+        self.stats = {'pages_fetched': 0, 'rows_mounted': 0}
+
+    def compose(self):
+        self._placeholder.display = False
+        yield self._placeholder
+
+    @property
+    def first_row(self) -> int:
+        """Index of the row at the top of the panel."""
+        return self._first
+
+    @property
+    def shown_ids(self) -> set[str]:
+        """Ids of the conversations in view."""
+        return {row.conv_id for row in self._rows if row.conv_id is not None}
+
+    @property
+    def pitch(self) -> int:
+        """Lines per row: the button plus the (collapsed) margin between buttons."""
+        return self._row_height + 1
+
+    @property
+    def rows_in_view(self) -> int:
+        """Rows that fit in the panel, counting one cut off at the bottom."""
+        return max(1, -(-self.content_region.height // self.pitch))
+
+    def show(self, key: Hashable, row_count: int, fetch: Callable[[int, int], list[dict]],
+             describe: Callable[[dict], str], selected: Optional[str] = None, label_lines: int = 1,
+             on_window: Optional[Callable[[list[dict]], None]] = None) -> None:
+        """Display `row_count` rows of list `key`; label_lines is the height of
+        every label. A different list is shown from the top."""
+        self._row_count, self._fetch, self._describe, self._selected = row_count, fetch, describe, selected
+        self._on_window = on_window or (lambda window: None)
+        self._row_height = label_lines + 2  # Button border
+        self._placeholder.display = False
+        if key != self._key:
+            self._key, self._first = key, 0
+        self._update_window()
+
+    def show_message(self, message: str) -> None:
+        """Show `message` instead of rows."""
+        self._row_count, self._key, self._first = 0, None, 0
+        self._placeholder.update(f"[dim]{message}[/dim]")
+        self._placeholder.display = True
+        self._update_window()
+
+    def refresh_rows(self) -> None:
+        """Fetch and relabel the rows in view, e.g. after a title changed."""
+        self._update_window()
+
+    def select(self, conv_id: Optional[str]) -> None:
+        """Highlight the row of `conv_id` (None for no row)."""
+        self._selected = conv_id
+        for row in self._rows:
+            row.set_class(row.conv_id is not None and row.conv_id == conv_id, "selected_history_button")
+
+    def scroll_to_row(self, row: int) -> None:
+        """Scroll so that `row` is at the top, or as close as the end of the list allows."""
+        whole_rows = max(1, (self.content_region.height - 1) // self.pitch)
+        first = max(0, min(row, self._row_count - whole_rows))
+        if first != self._first:
+            self._first = first
+            self._update_window()
+
+    # --- Window ---
+
+    def _update_window(self) -> None:
+        """Relabel the mounted rows from the conversations in view, mounting
+        more rows only when the panel grew."""
+        self._first = max(0, min(self._first, self._row_count - 1))
+        visible = max(0, min(self.rows_in_view, self._row_count - self._first))
+        window = self._fetch(self._first, visible) if visible else []
+        self.stats['pages_fetched'] += 1
+        while len(self._rows) < len(window):
+            row = HistoryRow(id=f"history_row_{len(self._rows)}")
+            self._rows.append(row)
+            self.mount(row)
+            self.stats['rows_mounted'] += 1
+        for row, metadata in zip(self._rows, window):
+            row.conv_id = metadata.get('id')
+            row.label = self._describe(metadata)
+            row.styles.height = self._row_height
+            row.set_class(row.conv_id == self._selected, "selected_history_button")
+            row.display = True
+        for row in self._rows[len(window):]:
+            row.conv_id = None
+            row.display = False
+        if window:
+            self._on_window(window)
+
+    # --- Actions and Textual hooks ---
+
+    def action_scroll_rows(self, rows: int) -> None:
+        self.scroll_to_row(self._first + rows)
+
+    def action_scroll_page(self, pages: int) -> None:
+        self.scroll_to_row(self._first + pages * max(1, self.rows_in_view - 1))
+
+    def action_scroll_home_row(self) -> None:
+        self.scroll_to_row(0)
+
+    def action_scroll_end_row(self) -> None:
+        self.scroll_to_row(self._row_count)
+
+    def on_mouse_scroll_down(self, event: events.MouseScrollDown) -> None:
+        event.stop()
+        self.action_scroll_rows(1)
+
+    def on_mouse_scroll_up(self, event: events.MouseScrollUp) -> None:
+        event.stop()
+        self.action_scroll_rows(-1)
+
+    def on_resize(self) -> None:
+        self._update_window()
@@ -0,0 +1,80 @@
+"""
+RenderCache - In-memory cache of rendered chat pages.
+A page is the markup of one greeting or user/model pair at a given box width.
+Flipping back to a page, resizing to a previous width or reopening a recent
+conversation reuses the markup instead of rendering the markdown again.
+"""
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class RenderCache:
+    """LRU cache keyed by (conversation id, pair index, content hash, box width).
+
+    Only the newest content of a (conversation, pair, width) slot is kept, so
+    the frames of a streaming reply replace each other instead of filling the
+    cache. Entries are evicted least recently used first once their strings
+    take more than `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes  # None/0 = unbounded
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[str, str, int]] = OrderedDict()  # slot -> (hash, markup, size)
+        self._bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def content_hash(*parts) -> str:
+        """Hash of everything that determines a page's markup."""
+        return hashlib.sha1(repr(parts).encode('utf-8', 'surrogatepass')).hexdigest()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def contains(self, conv_id: Hashable, index: int, content_hash: str, box_width: int) -> bool:
+        """Whether `get` would hit, without counting a lookup."""
+        with self._lock:
+            entry = self._entries.get((conv_id, index, box_width))
+            return entry is not None and entry[0] == content_hash
+
+    def get(self, conv_id: Hashable, index: int, content_hash: str, box_width: int) -> Optional[str]:
+        slot = (conv_id, index, box_width)
+        with self._lock:
+            entry = self._entries.get(slot)
+            if entry is None or entry[0] != content_hash:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(slot)
+            self.stats['hits'] += 1
+            return entry[1]
+
+    def put(self, conv_id: Hashable, index: int, content_hash: str, box_width: int, markup: str) -> None:
+        slot = (conv_id, index, box_width)
+        size = sys.getsizeof(markup)
+        with self._lock:
+            old = self._entries.pop(slot, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if self.max_bytes and size > self.max_bytes:
+                return
+            self._entries[slot] = (content_hash, markup, size)
+            self._bytes += size
+            while self.max_bytes and self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.stats['evictions'] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
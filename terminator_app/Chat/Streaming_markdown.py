@@ -0,0 +1,121 @@
+"""
+StreamingMarkdown - Incremental markdown rendering for text that grows at the end.
+A reply is split into blocks (paragraphs, fenced code, images). Blocks that
+can no longer change are rendered once and kept; only the unfinished tail is
+rendered again when more text arrives, so the cost of a repaint does not
+grow with the length of the reply.
+"""
+import re
+from collections import OrderedDict
+from typing import Callable
+
+CODE_BLOCK_PATTERN = re.compile(r"```(\w+)?\n([\s\S]*?)```")
+FENCE_OPENER = re.compile(r"```\w*\n")
+FENCE_START = re.compile(r"```\w*")  # An opener still missing its newline
+BLOCK_SEPARATOR = "\n\n"
+
+
+class _RenderedPrefix:
+    """Finalized blocks of one text: the text they cover and their markup."""
+
+    def __init__(self, box_width: int):
+        self.box_width = box_width
+        self.source = ""
+        self.markups: list[str] = []
+
+
+class StreamingMarkdown:
+    """Renders markdown through `render_prose(text, width)` and
+    `render_code(lang, lines, width)`, reusing finalized blocks.
+
+    A code block opens with "```lang" and a newline at the start of a line;
+    other backticks are prose. A paragraph is final once a blank line follows
+    it, a code block once its closing fence arrives. The finalized prefixes of the last `max_texts`
+    texts are kept; a text that extends one of them (the next repaint of a
+    streaming reply, or the same message drawn again) only renders what
+    comes after it.
+    """
+
+    def __init__(self, render_prose: Callable[[str, int], str], render_code: Callable[[str, list, int], str],
+                 max_texts: int = 32):
+        self.render_prose = render_prose
+        self.render_code = render_code
+        self.max_texts = max_texts
+        self._prefixes: OrderedDict[tuple[int, str], _RenderedPrefix] = OrderedDict()  # (width, source) -> prefix
+        self.stats = {'blocks_rendered': 0, 'blocks_reused': 0}
+
+    def render(self, content: str, box_width: int) -> str:
+        key, prefix = self._find_prefix(content, box_width)
+        self.stats['blocks_reused'] += len(prefix.markups)
+        self._advance(prefix, content)
+        if prefix.source and (key is None or key[1] != prefix.source):
+            if key is not None:
+                del self._prefixes[key]  # Superseded by the longer prefix
+            self._prefixes[(box_width, prefix.source)] = prefix
+            while len(self._prefixes) > self.max_texts:
+                self._prefixes.popitem(last=False)
+        elif key is not None:
+            self._prefixes.move_to_end(key)
+        return BLOCK_SEPARATOR.join(prefix.markups + self._render_tail(content, len(prefix.source), box_width))
+
+    def _find_prefix(self, content: str, box_width: int) -> tuple:
+        """The key and value of the longest kept prefix of `content`, or (None, a new prefix)."""
+        best = None
+        for key in self._prefixes:
+            if (key[0] == box_width and content.startswith(key[1])
+                    and (best is None or len(key[1]) > len(best[1]))):
+                best = key
+        if best is None:
+            return None, _RenderedPrefix(box_width)
+        return best, self._prefixes[best]
+
+    def _advance(self, prefix: _RenderedPrefix, content: str) -> None:
+        """Render the blocks of `content` completed since `prefix` was stored."""
+        pos = len(prefix.source)
+        while True:
+            fence, match = self._find_fence(content, pos)
+            prose_end = len(content) if fence == -1 else fence
+            cut = content.rfind(BLOCK_SEPARATOR, pos, prose_end)
+            if cut != -1:
+                self._add_prose(prefix, content[pos:cut])
+                pos = cut + len(BLOCK_SEPARATOR)
+            if match is None:
+                break
+            # Prose directly before a complete code block is complete too
+            self._add_prose(prefix, content[pos:fence])
+            prefix.markups.append(self.render_code(match.group(1) or "", match.group(2).splitlines(), prefix.box_width))
+            self.stats['blocks_rendered'] += 1
+            pos = match.end()
+        if pos != len(prefix.source):
+            prefix.source = content[:pos]
+
+    @staticmethod
+    def _find_fence(content: str, pos: int) -> tuple:
+        """The first code fence from `pos` that starts a block: (start, match)
+        for a complete block, (start, None) for one whose end (or opening
+        newline) has not arrived yet, (-1, None) if there is none."""
+        start = content.find("```", pos)
+        while start != -1:
+            if start == 0 or content[start - 1] == "\n":
+                if FENCE_OPENER.match(content, start):
+                    return start, CODE_BLOCK_PATTERN.match(content, start)
+                if FENCE_START.fullmatch(content, start):
+                    return start, None
+            start = content.find("```", start + 3)
+        return -1, None
+
+    def _add_prose(self, prefix: _RenderedPrefix, text: str) -> None:
+        for paragraph in text.split(BLOCK_SEPARATOR):
+            if paragraph.strip():
+                prefix.markups.append(self.render_prose(paragraph, prefix.box_width))
+                self.stats['blocks_rendered'] += 1
+
+    def _render_tail(self, content: str, start: int, box_width: int) -> list[str]:
+        """Render the unfinished end of a text, from `start`. It holds at most
+        one paragraph, unless an unclosed code fence starts in it."""
+        fence, _ = self._find_fence(content, start)
+        prose, rest = (content[start:], "") if fence == -1 else (content[start:fence], content[fence:])
+        markups = [self.render_prose(p, box_width) for p in prose.split(BLOCK_SEPARATOR) if p.strip()]
+        if rest.strip():
+            markups.append(self.render_prose(rest, box_width))
+        return markups
@@ -1,13 +1,23 @@
+import asyncio
+from contextlib import aclosing
+import json
 import os
 
-from terminator_app.config import Config
+from terminator_app.config import Config, UserConfig
 
 # try:
 from terminator_app.Models import GoogleModel as gm
 from terminator_app.Models import LMStudioModel as lm
 from terminator_app.Interfaces.ModelInterface import ModelInterface
 from terminator_app.Data import load
+from terminator_app.Data.ResponseCache import ResponseCache
 from terminator_app.config import Prompts
+from terminator_app.Controller.Session_pool import SessionPool
+from terminator_app.Controller.Context_window import ContextWindow, estimate_tokens
+from terminator_app.Controller.Single_flight import SingleFlight
+from terminator_app.Controller.Title_queue import TitleQueue
+from terminator_app.Controller.Worker_pool import Priority, WorkerPool
+from terminator_app.Models.token_channel import TokenChannel
 # except ImportError:
 #     from Interfaces.ModelInterface import ModelInterface
 #     from config import Prompts
@@ -23,18 +33,40 @@ class AIController:
     # Prompt templates
     TITLE_PROMPT_TEMPLATE = Prompts.TITLE_PROMPT_TEMPLATE
 
-    def __init__(self, model_class: type[ModelInterface], model_config: dict):
+    def __init__(self, model_class: type[ModelInterface], model_config: dict, data_manager=None):
         """
         Initialize the AIController with a specific model class and configuration.
 
         Args:
             model_class (type[ModelInterface]): The class of the model to instantiate.
             model_config (dict): Configuration parameters for the model.
+            data_manager (DataManager): Shared conversation cache. Falls back to reading the history file.
         """
         self.model_class = model_class or lm.LMStudioModel or gm.GoogleModel
         self.model_config = model_config or {"model_name": "openai/gpt-oss-20b", "config":{"contextLength": 12000}} or {"api_key": GENAI_API_KEY}
         self.model = self.model_class(**self.model_config)
-        self.sessions = {}
+        self.sessions = SessionPool()
+        self.data_manager = data_manager
+        # conv_id -> (pairs converted, [(backend-native messages, token estimate, message count)] per pair)
+        self._history_cache: dict[str, tuple[int, list]] = {}
+        self._history_lock = threading.Lock()
+        self._windows: dict[str, ContextWindow] = {}  # Context usage of each live session
+        self._summarizing: set[str] = set()
+        self._in_flight = SingleFlight()  # Identical concurrent requests share one backend call
+        # Background work (responses, titles, summaries) runs on one bounded pool
+        self.worker_pool = WorkerPool()
+        self.backend = type(self.model).__name__
+        self.title_queue = TitleQueue(
+            self._generate_titles,
+            save=data_manager.update_conversation_titles if data_manager is not None else None,
+            schedule=lambda fn, on_cancel: self.worker_pool.submit(
+                fn, priority=Priority.TITLES, backend=self.backend, on_cancel=on_cancel
+            ),
+        )
+        self.response_cache = (
+            ResponseCache(Config.RESPONSE_CACHE_PATH, UserConfig.CACHE_DURATION, UserConfig.CACHE_MAX_BYTES)
+            if UserConfig.CACHE_RESPONSES else None
+        )
 
     @staticmethod
     def flatten_conversation_messages(messages: list) -> list:
@@ -43,15 +75,15 @@ class AIController:
             return []
         flat_msgs = []
         for pair in messages[1:]:  # Skip greeting at index 0
-            if isinstance(pair, dict) and 'user' in pair and 'model' in pair:
-                if pair['user']:
-                    flat_msgs.append(pair['user'])
-                if pair['model']:
-                    flat_msgs.append(pair['model'])
-            else:
-                flat_msgs.append(pair)
+            flat_msgs.extend(AIController._flatten_pair(pair))
         return flat_msgs
 
+    @staticmethod
+    def _flatten_pair(pair) -> list:
+        if isinstance(pair, dict) and 'user' in pair and 'model' in pair:
+            return [msg for msg in (pair['user'], pair['model']) if msg]
+        return [pair]
+
     def open_session(self, conv_id: str, new: bool = False):
         """Open a new session or load an existing one.
 
@@ -62,71 +94,329 @@ class AIController:
         if conv_id in self.sessions and not new:
             return
 
-        history = self.deserialize_history(conv_id) if not new else None
-        self.sessions[conv_id] = self.model.create_chat(history)
+        if new:
+            self.sessions.put(conv_id, self.model.create_chat(None))
+            self._windows[conv_id] = ContextWindow()
+        else:
+            self._create_session(conv_id)
+
+    def _get_session(self, conv_id: str):
+        """The live session for a conversation, rebuilt from stored history if
+        it was evicted from the pool (or never opened)."""
+        session = self.sessions.get(conv_id)
+        if session is None:
+            # Pairs still waiting for a reply are left out: the prompt being
+            # answered is sent by the caller
+            session = self._create_session(conv_id, skip_pending=True)
+        return session
+
+    def _create_session(self, conv_id: str, skip_pending: bool = False):
+        """Create a session holding as many of the most recent pairs as fit
+        its context window (UserConfig.MAX_CONTEXT_TOKENS/MAX_CONTEXT_MESSAGES)."""
+        converted = self._converted_pairs(conv_id)
+        summary = self._summary(conv_id, len(converted))
+        if summary:
+            # Summarized pairs are replaced by the summary
+            converted = converted[summary['upto']:]
+        pairs = [entry for pair, entry in converted if not (skip_pending and self._is_pending(pair))]
+        window = ContextWindow()
+        start = window.select([tokens for _, tokens, _ in pairs], [count for _, _, count in pairs])
+        history = [msg for native, _, _ in pairs[start:] for msg in native or []]
+        if summary:
+            summary_msgs = self._summary_messages(summary['text'])
+            window.add(sum(estimate_tokens(msg['parts'][0]['text']) for msg in summary_msgs), len(summary_msgs))
+            history = (self.model.deserialize_history(summary_msgs) or []) + history
+        session = self.model.create_chat(history or None)
+        self.sessions.put(conv_id, session)
+        self._windows[conv_id] = window
+        return session
 
     # Databse -> what the model understands
-    def deserialize_history(self, conv_id: str) -> list | None:
-        """Loads a list of standard dictionaries into the chat history, flattening pairs."""
-        conversation_history = load.DataLoader.load_conversation_history(Config.CONVERSATION_HISTORY_PATH)
-        loaded_history = load.DataLoader.get_conversation_by_id(conversation_history, conv_id)
+    def deserialize_history(self, conv_id: str, skip_pending: bool = False) -> list | None:
+        """Loads a list of standard dictionaries into the chat history, flattening pairs.
+        With `skip_pending`, pairs still waiting for a model reply are left out."""
+        pairs = self._converted_pairs(conv_id)
+        if not pairs:
+            return None
+        return [
+            msg
+            for pair, (native, _, _) in pairs
+            if not (skip_pending and self._is_pending(pair))
+            for msg in native or []
+        ]
+
+    def _converted_pairs(self, conv_id: str) -> list[tuple[dict, tuple]]:
+        """Every stored pair with its backend-native messages, token estimate
+        and message count. Only pairs not converted before are converted."""
+        if self.data_manager is not None:
+            loaded_history = self.data_manager.get_conversation_by_id(conv_id)
+        else:
+            conversation_history = load.DataLoader.load_conversation_history(Config.CONVERSATION_HISTORY_PATH)
+            loaded_history = load.DataLoader.get_conversation_by_id(conversation_history, conv_id)
 
         serialized_history = loaded_history.get("messages") if loaded_history else None
         if not serialized_history:
+            self._history_cache.pop(conv_id, None)
+            return []
+
+        with self._history_lock:
+            count, converted = self._history_cache.get(conv_id, (0, []))
+            if count > len(serialized_history):
+                # Conversation was cleared or truncated
+                count, converted = 0, []
+            # Reuse converted pairs; the last one is redone since it may have
+            # been streaming or regenerated when it was converted
+            reuse = max(0, count - 1)
+            converted = converted[:reuse] + [
+                self._convert_pair(pair) if index > 0 else ([], 0, 0)
+                for index, pair in enumerate(serialized_history[reuse:], start=reuse)
+            ]
+            self._history_cache[conv_id] = (len(serialized_history), converted)
+        return list(zip(serialized_history, converted))
+
+    def _convert_pair(self, pair) -> tuple[list, int, int]:
+        flat_msgs = self._flatten_pair(pair)
+        tokens = sum(
+            estimate_tokens(''.join(p.get('text', '') for p in msg.get('parts') or [] if isinstance(p, dict)))
+            for msg in flat_msgs if isinstance(msg, dict)
+        )
+        return self.model.deserialize_history(flat_msgs), tokens, len(flat_msgs)
+
+    @staticmethod
+    def _is_pending(pair) -> bool:
+        return isinstance(pair, dict) and bool(pair.get('ai_pending'))
+
+    # --- Rolling summary ---
+
+    def _summary(self, conv_id: str, pair_count: int) -> dict | None:
+        """The stored summary of a conversation, if it still matches its pairs."""
+        if not UserConfig.ROLLING_SUMMARY or self.data_manager is None:
             return None
+        conversation = self.data_manager.get_conversation_by_id(conv_id) or {}
+        summary = conversation.get('summary')
+        if not isinstance(summary, dict) or not summary.get('text'):
+            return None
+        if not 1 < summary.get('upto', 0) <= pair_count:
+            return None  # Conversation was truncated since
+        return summary
+
+    @staticmethod
+    def _summary_messages(text: str) -> list[dict]:
+        """The summary as a user/model exchange in database format."""
+        return [
+            {'role': 'user', 'parts': [{'text': Prompts.SUMMARY_CONTEXT_TEMPLATE.format(summary=text)}]},
+            {'role': 'model', 'parts': [{'text': Prompts.SUMMARY_ACKNOWLEDGEMENT}]},
+        ]
+
+    def summarize_in_background(self, conv_id: str) -> None:
+        """Fold older pairs into the conversation's summary in the background,
+        once SUMMARY_BATCH_PAIRS of them are not yet summarized."""
+        if not UserConfig.ROLLING_SUMMARY or self.data_manager is None:
+            return
+        with self._history_lock:
+            if conv_id in self._summarizing:
+                return
+            self._summarizing.add(conv_id)
+
+        def _done():
+            with self._history_lock:
+                self._summarizing.discard(conv_id)
+
+        def _run():
+            try:
+                self._summarize(conv_id)
+            finally:
+                _done()
+
+        try:
+            # A summary dropped from a full queue is retried after a later reply
+            self.worker_pool.submit(
+                _run, priority=Priority.INDEXING, backend=self.backend, key=('summary', conv_id), on_cancel=_done
+            )
+        except RuntimeError as e:
+            print(f"Error: Could not schedule summary: {e}")
+            _done()
 
-        flat_msgs = AIController.flatten_conversation_messages(serialized_history)
+    def _summarize(self, conv_id: str) -> bool:
+        conversation = self.data_manager.get_conversation_by_id(conv_id)
+        if not conversation:
+            return False
+        messages = conversation.get('messages', [])
+        summary = self._summary(conv_id, len(messages)) or {'text': '', 'upto': 1}
+        end = len(messages) - max(1, UserConfig.SUMMARY_KEEP_RECENT_PAIRS)
+        if end - summary['upto'] < UserConfig.SUMMARY_BATCH_PAIRS:
+            return False
 
-        return self.model.deserialize_history(flat_msgs)
+        flat_msgs = self.flatten_conversation_messages([None] + messages[summary['upto']:end])
+        prompt = Prompts.SUMMARY_PROMPT_TEMPLATE.format(
+            summary=summary['text'] or "(none)",
+            conversation_text=self._build_conversation_text(flat_msgs),
+        )
+        text = self.get_static_response(prompt)
+        if self._is_error_response(text):
+            return False
+        self.data_manager.update_conversation_summary(conv_id, {'text': text.strip(), 'upto': end})
+        # Drop the live session; the next turn rebuilds it from summary + recent pairs
+        self.sessions.pop(conv_id)
+        return True
 
     def get_response(self, conv_id: str, prompt: str, streaming: bool = False) -> str:
         """Get a response from the model for a given conversation ID."""
         try:
-            session = self.sessions.get(conv_id)
-            if not session:
-                raise ValueError(f"Session {conv_id} does not exist.")
+            session, window = self._prepare_turn(conv_id, prompt)
 
             # Use the model's send_message method instead of the Chat object
             if streaming:
-                return session.send_message_stream(prompt)
-            return session.send_message(prompt)
+                return self._count_response(conv_id, session.send_message_stream(prompt), window)
+            response = session.send_message(prompt)
+            window.add(estimate_tokens(response if isinstance(response, str) else getattr(response, 'text', '')))
+            self.summarize_in_background(conv_id)
+            return response
         except Exception as e:
             return self._handle_error(e)
 
+    def supports_async_streaming(self) -> bool:
+        """Whether chat responses can be streamed with `aget_response`."""
+        return UserConfig.ASYNC_STREAMING and hasattr(self.model, 'asend_message_stream')
+
+    async def aget_response(self, conv_id: str, prompt: str):
+        """Async counterpart of get_response(streaming=True), for use on an
+        event loop. Yields coalesced text chunks; errors are raised to the caller."""
+        # Rebuilding a session may read the conversation from disk
+        session, window = await asyncio.to_thread(self._prepare_turn, conv_id, prompt)
+        chunks = []
+        stream = TokenChannel.acoalesce(self.model.asend_message_stream(prompt, session=session))
+        async with aclosing(stream):
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        window.add(estimate_tokens(''.join(chunks)))
+        self.summarize_in_background(conv_id)
+
+    def _prepare_turn(self, conv_id: str, prompt: str) -> tuple[object, ContextWindow]:
+        """The session to send `prompt` to, with the prompt counted in its window."""
+        session = self._get_session(conv_id)
+        window = self._windows.setdefault(conv_id, ContextWindow())
+        prompt_tokens = estimate_tokens(prompt)
+        if not window.fits(prompt_tokens):
+            # Over budget: start over from stored history, keeping the most recent pairs
+            session = self._create_session(conv_id, skip_pending=True)
+            window = self._windows[conv_id]
+        window.add(prompt_tokens)
+        return session, window
+
+    def _count_response(self, conv_id: str, stream, window: ContextWindow):
+        """Pass a response stream through as coalesced text chunks, adding the
+        reply to the window once it ends."""
+        if not isinstance(stream, TokenChannel):
+            stream = TokenChannel.from_iterable(stream)
+        chunks = []
+        for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+        window.add(estimate_tokens(''.join(chunks)))
+        self.summarize_in_background(conv_id)
+
     def get_static_response(self, prompt: str) -> str:
-        """Get a single response without maintaining conversation history."""
+        """Get a single response without maintaining conversation history.
+        Served from the response cache when the same request was answered before,
+        and shared with an identical request that is still running."""
         try:
-            response = self.model.generate_content(prompt)
-            return response
+            key = self._cache_key(prompt)
+            if self.response_cache is not None:
+                cached = self.response_cache.get(key)
+                if cached is not None:
+                    return cached
+
+            def _generate():
+                response = self.model.generate_content(prompt)
+                if self.response_cache is not None and isinstance(response, str) and response:
+                    self.response_cache.put(key, response)
+                return response
+
+            return self._in_flight.do(('static', key), _generate)
         except Exception as e:
             return self._handle_error(e)
 
+    def _cache_key(self, prompt: str) -> str:
+        # Everything in the model config but credentials shapes the answer
+        params = {k: v for k, v in self.model_config.items() if k not in ('api_key', 'model_name')}
+        return ResponseCache.make_key(self.backend, self.model_config.get('model_name'), prompt, params)
+
     def generate_title_from_conversation(self, conv: dict, callback=None) -> str:
-        """Generate a concise title based on the conversation's messages."""
-        def _generate_title():
-            try:
-                messages = conv.get('messages', [])
-                flat_msgs = self.flatten_conversation_messages(messages)
-                if not flat_msgs:
-                    return "New Conversation"
-
-                conversation_text = self._build_conversation_text(flat_msgs[:6])
-                prompt = self.TITLE_PROMPT_TEMPLATE.format(conversation_text=conversation_text)
-                response_text = self.get_static_response(prompt)
-                return response_text.strip()
-            except Exception as e:
-                return self._handle_title_error(e, default="Untitled Conversation")
+        """Generate a concise title based on the conversation's messages.
 
+        With a callback, the conversation is queued and titled together with
+        other untitled conversations; the titles are saved through the
+        DataManager before `callback(conv_id, title)` is called.
+        """
         if callback:
-            thread = threading.Thread(target=lambda: callback(conv.get('id'), _generate_title()), daemon=True)
-            thread.start()
+            self.title_queue.submit(conv, callback)
             return "Generating..."
-        return _generate_title()
+        return self._generate_title(conv)
+
+    def _generate_title(self, conv: dict) -> str:
+        try:
+            messages = conv.get('messages', [])
+            flat_msgs = self.flatten_conversation_messages(messages)
+            if not flat_msgs:
+                return "New Conversation"
+
+            conversation_text = self._build_conversation_text(flat_msgs[:6])
+            prompt = self.TITLE_PROMPT_TEMPLATE.format(conversation_text=conversation_text)
+            response_text = self.get_static_response(prompt)
+            # A failed request leaves the title unset, so it is requested again later
+            return "" if self._is_error_response(response_text) else response_text.strip()
+        except Exception as e:
+            return self._handle_title_error(e, default="Untitled Conversation")
+
+    def _generate_titles(self, conversations: list[dict]) -> dict[str, str]:
+        """Title several conversations with one prompt asking for a JSON object.
+        Conversations missing from the answer are titled one by one. If the
+        request fails or no title can be read from the answer, no title is
+        set; the conversations are titled again when next requested."""
+        if len(conversations) == 1:
+            return {conversations[0]['id']: self._generate_title(conversations[0])}
+
+        sections = []
+        for number, conv in enumerate(conversations, start=1):
+            flat_msgs = self.flatten_conversation_messages(conv.get('messages', []))
+            sections.append(f"Conversation {number}:\n{self._build_conversation_text(flat_msgs[:6], max_chars=200)}")
+        prompt = Prompts.BATCH_TITLE_PROMPT_TEMPLATE.format(conversations="\n\n".join(sections))
+        response = self.get_static_response(prompt)
+        parsed = {} if self._is_error_response(response) else self._parse_titles(response, len(conversations))
+        if not parsed:
+            print("Error: Batch title generation failed; titles will be retried")
+            return {}
+
+        titles = {}
+        for number, conv in enumerate(conversations, start=1):
+            titles[conv['id']] = parsed.get(number) or self._generate_title(conv)
+        return titles
+
+    @staticmethod
+    def _is_error_response(text: str) -> bool:
+        """Whether get_static_response returned nothing or an error message."""
+        return not text or text.startswith(Prompts.ERROR_UNEXPECTED_RESPONSE_TEMPLATE.partition('{')[0])
+
+    @staticmethod
+    def _parse_titles(response: str, count: int) -> dict[int, str]:
+        """Conversation number -> title from a JSON object in the model's answer."""
+        start, end = response.find('{'), response.rfind('}')
+        try:
+            data = json.loads(response[start:end + 1]) if 0 <= start < end else {}
+        except ValueError:
+            return {}
+        titles = {}
+        for key, title in data.items() if isinstance(data, dict) else ():
+            if str(key).isdigit() and 1 <= int(key) <= count and isinstance(title, str) and title.strip():
+                titles[int(key)] = title.strip()
+        return titles
 
-    def _build_conversation_text(self, messages: list[dict]) -> str:
-        """Build a formatted conversation text from messages."""
+    def _build_conversation_text(self, messages: list[dict], max_chars: int | None = None) -> str:
+        """Build a formatted conversation text from messages, each cut to `max_chars`."""
         return "\n".join(
-            f"{msg.get('role', '')}: {' '.join(p.get('text', '') for p in msg.get('parts', []))}"
+            f"{msg.get('role', '')}: {' '.join(p.get('text', '') for p in msg.get('parts', []))[:max_chars]}"
             for msg in messages
         )
 
@@ -1,17 +1,20 @@
 from typing import Optional
 from datetime import datetime
 from textual.widgets import Static
-from textual.containers import VerticalScroll
 import threading
 
 try:
     from terminator_app.interfaces import ConversationDict
     from terminator_app.Chat.Chat_ui_renderer import ChatUIRenderer
+    from terminator_app.Chat.Chat_list_view import ChatListView
     from terminator_app.Chat.Chat_data_manager import ChatDataManager
+    from terminator_app.Controller.Worker_pool import Priority
 except ImportError:
     from interfaces import ConversationDict
     from Chat.Chat_ui_renderer import ChatUIRenderer
+    from Chat.Chat_list_view import ChatListView
     from Chat.Chat_data_manager import ChatDataManager
+    from Controller.Worker_pool import Priority
 
 
 
@@ -27,19 +30,21 @@ class ChatController:
         self.debug_mode = debug_mode
         self._message_lock = threading.Lock()  # Thread-safe lock for add_message
     
-    def display_conversation_at_index(self, conv: ConversationDict, chat_panel: Static, chat_scroll: VerticalScroll) -> None:
+    def display_conversation_at_index(self, conv: ConversationDict, chat_panel: Static, chat_scroll: ChatListView) -> None:
         """Display conversation for mixed format: greeting at index 0, user/model pairs at index 1+."""
         self.ui_renderer.display_conversation_at_index(conv, chat_panel, chat_scroll)
 
     def view_page(self, increment_or_special: int | str, conv: ConversationDict, input_controller=None, app_instance=None) -> bool:
         new_index = self.ui_renderer.view_page(increment_or_special, conv)
         if input_controller and app_instance and new_index != -1:
-            self.chat_data_manager.start_auto_response(conv, new_index, input_controller, app_instance)
+            self.chat_data_manager.start_auto_response(
+                conv, new_index, input_controller, app_instance, priority=Priority.AUTOCOMPLETE
+            )
         return True if new_index != -1 else False
     
-    def write_conversation_to_history(self, conv: ConversationDict) -> bool:
+    def write_conversation_to_history(self, conv: ConversationDict, index: int = None) -> bool:
         """Write conversation to history using DataManager. Returns True if successful."""
-        return self.chat_data_manager.write_conversation_to_history(conv)
+        return self.chat_data_manager.write_conversation_to_history(conv, index)
     
     def generate_new_conversation_id(self) -> str:
         """Generate a unique conversation ID based on timestamp."""
@@ -63,17 +68,19 @@ class ChatController:
         
         return None
 
-    def refresh_conversation_async(self, conv: ConversationDict, chat_panel: Static, chat_scroll: VerticalScroll, display_method=None):
+    def refresh_conversation_async(self, conv: ConversationDict, chat_panel: Static, chat_scroll: ChatListView, display_method=None):
         """
-        Show loading screen in main thread, then run display_method in a background thread and update chat panel using call_from_thread.
+        Show loading screen in main thread, then run display_method once the app has processed pending messages (call_later).
+        A page in the render cache is displayed right away instead.
         """
+        if display_method and self.ui_renderer.is_page_cached(conv, chat_panel, chat_scroll):
+            display_method(conv, chat_panel, chat_scroll)
+            return
         # Show loading screen immediately in main thread
         self.ui_renderer.show_loading_screen(chat_panel, chat_scroll)
-        def run_display():
-            app = chat_panel.app if hasattr(chat_panel, 'app') else None
-            if display_method and app:
-                app.call_from_thread(display_method, conv, chat_panel, chat_scroll)
-        t = threading.Thread(target=run_display)
-        t.start()
+        # A UI hop only: kept off the model worker pool so busy streams cannot delay it
+        app = chat_panel.app if hasattr(chat_panel, 'app') else None
+        if display_method and app:
+            app.call_later(display_method, conv, chat_panel, chat_scroll)
 
 
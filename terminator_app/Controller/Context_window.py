@@ -0,0 +1,66 @@
+"""
+ContextWindow - Token and message budget for one AI session.
+Tracks how much history a live session carries and picks which trailing
+pairs of a conversation fit when the session has to be rebuilt.
+"""
+from typing import Optional
+try:
+    from terminator_app.config import UserConfig
+except ImportError:
+    from config import UserConfig
+
+# Rough estimate without a tokenizer: ~4 characters per token, plus a few
+# tokens of role/formatting overhead per message
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of one message."""
+    return len(text or "") // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+class ContextWindow:
+    """Running token/message totals of a session, checked against limits.
+
+    When a turn would go over a limit the session is rebuilt with only the
+    most recent pairs, filled up to `refill` of each limit. The headroom means
+    a rebuild happens every few turns rather than on every turn once a
+    conversation is long.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, max_messages: Optional[int] = None, refill: float = 0.75):
+        self.max_tokens = UserConfig.MAX_CONTEXT_TOKENS if max_tokens is None else max_tokens
+        self.max_messages = UserConfig.MAX_CONTEXT_MESSAGES if max_messages is None else max_messages
+        self.refill = refill
+        self.tokens = 0
+        self.messages = 0
+
+    def fits(self, tokens: int, messages: int = 1) -> bool:
+        """Whether `messages` more messages of `tokens` tokens stay within limits."""
+        if self.max_tokens and self.tokens + tokens > self.max_tokens:
+            return False
+        if self.max_messages and self.messages + messages > self.max_messages:
+            return False
+        return True
+
+    def add(self, tokens: int, messages: int = 1) -> None:
+        self.tokens += tokens
+        self.messages += messages
+
+    def select(self, pair_tokens: list[int], pair_messages: list[int]) -> int:
+        """Index of the first pair to keep so the kept pairs fill the window
+        up to the refill target. Resets the totals to the kept pairs."""
+        token_budget = self.max_tokens * self.refill if self.max_tokens else float('inf')
+        message_budget = self.max_messages * self.refill if self.max_messages else float('inf')
+        tokens = messages = 0
+        start = len(pair_tokens)
+        # Walk back from the newest pair; stops as soon as the budget is spent
+        while start > 0:
+            if tokens + pair_tokens[start - 1] > token_budget or messages + pair_messages[start - 1] > message_budget:
+                break
+            start -= 1
+            tokens += pair_tokens[start]
+            messages += pair_messages[start]
+        self.tokens, self.messages = tokens, messages
+        return start
@@ -1,11 +1,15 @@
-from textual.widgets import Button, Static
-from textual.containers import VerticalScroll
+import threading
+from rich.markup import escape
 try:
     from terminator_app.config import Config
     from terminator_app.interfaces import ConversationDict
+    from terminator_app.Chat.History_list_view import HistoryListView
+    from terminator_app.Data.ChangeEvents import ChangeEvent, MessageAppended, PendingChanged, TitleChanged
 except ImportError:
     from config import Config
     from interfaces import ConversationDict
+    from Chat.History_list_view import HistoryListView
+    from Data.ChangeEvents import ChangeEvent, MessageAppended, PendingChanged, TitleChanged
 
 class HistoryController:
     """Handles all history panel interactions and state."""
@@ -17,43 +21,128 @@ class HistoryController:
         self.AI_controller = AI_controller
         self.debug_mode = debug_mode
         self.selected_button_id = None
-        self.button_map = {}  # Map conv_id to button widget for direct updates
+        self.search_query = ""
+        self.search_hits = {}  # Map conv_id to matching pair indices for the current query
+        self.similar_to = None  # conv_id whose similar conversations are shown, if any
+        # DataManager changes not yet applied to the panel
+        self._changes_lock = threading.Lock()
+        self._changed_ids: set[str] = set()
+        self._relist = False
+        # Untitled conversations whose title was requested; failed requests are
+        # made again on the next repopulation, not on every scroll
+        self._titles_lock = threading.Lock()
+        self._titles_requested: set[str] = set()
+        self._titles_failed: set[str] = set()
 
-    async def populate_history_panel(self, history_container: VerticalScroll) -> None:
-        """Update history panel buttons efficiently without recreating everything."""
-        history_container.loading = True
-        
-        # Get fresh conversation history from DataManager
-        conversation_history = self.data_manager.get_all_conversations()
-        
-        if not conversation_history:
-            await self._clear_all_buttons(history_container)
-            history_container.mount(Static("[dim]No conversation history available[/dim]"))
-            history_container.loading = False
-            return
-        
-        # Remove deleted conversations
-        current_ids = {conv.get('id') for conv in conversation_history}
-        await self._remove_deleted_buttons(current_ids)
-        
-        # Update or create buttons
-        for conv in conversation_history:
-            conv_id = conv.get('id', 'N/A')
-            timestamp = conv.get('timestamp', 'N/A')
-            needs_title = not conv.get('title') and len(conv.get('messages', [])) > 1
-            title = "Generating title..." if needs_title else conv.get('title', 'New Conversation')
-            
-            button = self.button_map.get(conv_id)
-            if button:
-                self._update_button(button, conv_id, timestamp, title)
+    def set_search_query(self, query: str) -> None:
+        """Filter the history panel to conversations matching `query`."""
+        self.search_query = query.strip()
+        self.similar_to = None
+
+    def toggle_similar(self, conv_id: str) -> bool:
+        """Show conversations similar to `conv_id`, or go back to the full list.
+        Returns True while similar conversations are shown."""
+        self.similar_to = None if self.similar_to or not conv_id else conv_id
+        return self.similar_to is not None
+
+    def note_change(self, event: ChangeEvent) -> bool:
+        """DataManager subscriber, called on any thread. Records what `event`
+        changes in the panel; returns True if the panel needs a repaint."""
+        if isinstance(event, PendingChanged):
+            return False
+        filtered = bool(self.search_query or self.similar_to)
+        with self._changes_lock:
+            if isinstance(event, MessageAppended) or (isinstance(event, TitleChanged) and not filtered):
+                # Only the row's label changes: its title, or "Generating title..."
+                self._changed_ids.add(event.conv_id)
             else:
-                button = self._create_button(history_container, conv_id, timestamp, title)
-            
-            if needs_title:
-                self._start_title_generation(conv, button, timestamp)
-        
-        history_container.loading = False
-    
+                # Conversations were added or removed, or a title the search may match changed
+                self._relist = True
+        return True
+
+    def apply_changes(self, history_container: HistoryListView) -> bool:
+        """Relabel the rows in view that changed since the last call. Returns
+        True if the whole panel must be repopulated instead."""
+        with self._changes_lock:
+            changed, self._changed_ids = self._changed_ids, set()
+            relist, self._relist = self._relist, False
+        if relist:
+            return True
+        if changed & history_container.shown_ids:
+            history_container.refresh_rows()
+        return False
+
+    async def populate_history_panel(self, history_container: HistoryListView) -> None:
+        """Point the history panel at the current list of conversations.
+        Only the rows in view are fetched from the DataManager and mounted."""
+        with self._titles_lock:
+            self._titles_requested -= self._titles_failed
+            self._titles_failed.clear()
+        snippets = {}
+        self.search_hits = {}
+        if self.similar_to:
+            conversations, snippets = self._filter_by_similarity(self._all_metadata())
+        elif self.search_query:
+            conversations, snippets = self._filter_by_search(self._all_metadata())
+        else:
+            conversations = None
+
+        if conversations is None:
+            count, fetch = self.data_manager.get_conversation_count(), self.data_manager.get_conversation_page
+        else:
+            count, fetch = len(conversations), lambda start, n: conversations[start:start + n]
+
+        if not count:
+            if self.similar_to:
+                message = "No similar conversations"
+            elif self.search_query:
+                message = "No matching conversations"
+            else:
+                message = "No conversation history available"
+            history_container.show_message(message)
+            return
+
+        def describe(metadata: dict) -> str:
+            return self._row_label(metadata, snippets)
+
+        key = (self.similar_to, self.search_query)
+        history_container.show(key, count, fetch, describe, self.selected_button_id,
+                               label_lines=2 if snippets else 1, on_window=self._request_titles)
+
+    def _all_metadata(self) -> list[dict]:
+        """Metadata of every conversation, newest first."""
+        return self.data_manager.get_conversation_page(0, self.data_manager.get_conversation_count())
+
+    def _row_label(self, metadata: dict, snippets: dict) -> str:
+        """Label of a history row."""
+        conv_id = metadata.get('id', 'N/A')
+        title = "Generating title..." if self._needs_title(metadata) else metadata.get('title', 'New Conversation')
+        if snippets.get(conv_id):
+            title = f"{title}\n[dim]{escape(snippets[conv_id])}[/dim]"
+        return title
+
+    def _needs_title(self, metadata: dict) -> bool:
+        return not metadata.get('title') and self.data_manager.get_message_count(metadata) > 1
+
+    def _request_titles(self, window: list[dict]) -> None:
+        """Request titles for the untitled conversations that came into view,
+        once per conversation."""
+        # Bodies of untitled conversations may still be loading; the panel
+        # is refreshed again once they are
+        if not self.data_manager.is_loaded():
+            return
+        for metadata in window:
+            conv_id = metadata.get('id')
+            if not conv_id or not self._needs_title(metadata):
+                continue
+            with self._titles_lock:
+                if conv_id in self._titles_requested:
+                    continue
+                self._titles_requested.add(conv_id)
+            conversation = self.data_manager.get_conversation_by_id(conv_id)
+            if conversation:
+                self._start_title_generation(conversation)
+
     def handle_History_button_press(self, button_id: str, button_prefix: str, input_field) -> bool:
         # Return early if no button ID provided
         if not button_id:
@@ -72,55 +161,47 @@ class HistoryController:
             conv_id = button_id.replace(button_prefix, "")
             self.selected_button_id = conv_id
             self.chat_controller.switch_conversation(conv_id, None)
-            # Move to the end of the conversation
-            self.chat_controller.view_page('end', self.chat_controller.current_conversation, self.input_controller, input_field.app)
+            if self.search_hits.get(conv_id):
+                # Open the first pair matching the search
+                current = self.chat_controller.ui_renderer.chat_position_index.get(conv_id, 0)
+                self.chat_controller.view_page(self.search_hits[conv_id][0] - current, self.chat_controller.current_conversation, self.input_controller, input_field.app)
+            else:
+                # Move to the end of the conversation
+                self.chat_controller.view_page('end', self.chat_controller.current_conversation, self.input_controller, input_field.app)
             self.input_controller.focus_to_chat_input(input_field)
             return True
         
         return False
-    async def _clear_all_buttons(self, history_container: VerticalScroll) -> None:
-        """Remove all buttons from history panel."""
-        for child in list(history_container.children):
-            await child.remove()
-        self.button_map.clear()
-    
-    async def _remove_deleted_buttons(self, current_ids: set) -> None:
-        """Remove buttons for conversations that no longer exist."""
-        for conv_id in list(self.button_map.keys()):
-            if conv_id not in current_ids:
-                if button := self.button_map.pop(conv_id, None):
-                    await button.remove()
-    
-    def _update_button(self, button: Button, conv_id: str, timestamp: str, title: str) -> None:
-        """Update existing button label and selection state."""
-        button.label = f"{title}"
-        button.set_class(conv_id == self.selected_button_id, "selected_history_button")
-    
-    def _create_button(self, history_container: VerticalScroll, conv_id: str, timestamp: str, title: str) -> Button:
-        """Create and mount a new button."""
-        button = Button(
-            f"{title}",
-            id=f"{Config.CONVERSATION_BUTTON_PREFIX}{conv_id}",
-            classes=Config.CONVERSATION_BUTTON_CLASS
-        )
-        button.set_class(conv_id == self.selected_button_id, "selected_history_button")
-        history_container.mount(button, before=0)
-        self.button_map[conv_id] = button
-        return button
-    
-    def _start_title_generation(self, conv: ConversationDict, button: Button, timestamp: str) -> None:
+    def _filter_by_search(self, conversation_history: list) -> tuple[list, dict]:
+        """Conversations whose messages or title match the search query, in
+        history order, plus a snippet of the first matching message for each."""
+        results = self.data_manager.search(self.search_query)
+        self.search_hits = {result['id']: result['pairs'] for result in results}
+        snippets = {result['id']: result.get('snippet') for result in results}
+        query = self.search_query.lower()
+        matching = [
+            conv for conv in conversation_history
+            if conv.get('id') in self.search_hits or query in (conv.get('title') or '').lower()
+        ]
+        return matching, snippets
+
+    def _filter_by_similarity(self, conversation_history: list) -> tuple[list, dict]:
+        """Conversations similar to `similar_to`, most similar first."""
+        results = self.data_manager.find_similar_conversations(self.similar_to)
+        by_id = {conv.get('id'): conv for conv in conversation_history}
+        similar = [(by_id[cid], score) for cid, score in results if cid in by_id]
+        labels = {conv['id']: f"{score:.0%} similar" for conv, score in similar}
+        return [conv for conv, _ in similar], labels
+
+    def _start_title_generation(self, conv: ConversationDict) -> None:
         """Start background title generation for a conversation."""
         def on_title_ready(cid, title):
-            try:
-                # Update title via DataManager
-                self.data_manager.update_conversation_title(cid, title)
-                
-                # Update button label only if still mounted
-                if button and hasattr(button, 'is_mounted') and button.is_mounted:
-                    button.label = f"{title}"
-            except Exception as e:
-                if self.debug_mode:
-                    print(f"Error updating title for {cid}: {e}")
-        
-        # Pass callback directly - button and timestamp are captured by closure
+            # The title queue has already saved the title through the DataManager,
+            # whose TitleChanged event relabels the row
+            if not title:
+                with self._titles_lock:
+                    self._titles_failed.add(cid)
+            if self.debug_mode:
+                print(f"[DEBUG] Title generated for {cid}: {title}")
+
         self.AI_controller.generate_title_from_conversation(conv, callback=on_title_ready)
\ No newline at end of file
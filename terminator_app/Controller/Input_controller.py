@@ -1,3 +1,4 @@
+from contextlib import aclosing
 from time import time
 from textual.widgets import Input
 import threading
@@ -6,9 +7,11 @@ from typing import List, Union
 try:
     from terminator_app.config import Config
     from terminator_app.interfaces import ConversationDict, UserModelPairDict, MessageDict
+    from terminator_app.Controller.Worker_pool import Priority
 except ImportError:
     from config import Config
     from interfaces import ConversationDict, UserModelPairDict, MessageDict
+    from Controller.Worker_pool import Priority
 
 
 class InputController():
@@ -90,7 +93,7 @@ class InputController():
         conversation['messages'].append(pair)
         idx = len(conversation['messages']) - 1
         print(f"User input received: {user_input} (index {idx})")
-        self.chat_controller.write_conversation_to_history(conversation)
+        self.chat_controller.write_conversation_to_history(conversation, idx)
         return idx, gen_id
 
 
@@ -98,22 +101,33 @@ class AIResponseHandler:
     def __init__(self, parent) -> None:
         self.parent = parent
 
-    def start_ai_response_thread(self, prompt_idx_tuple, conversation, app_instance, gen_id: str = None) -> None:
-        thread = threading.Thread(
-            target=self._get_ai_response_thread,
-            args=(prompt_idx_tuple, conversation, app_instance, gen_id),
-            daemon=True
+    def start_ai_response_thread(self, prompt_idx_tuple, conversation, app_instance, gen_id: str = None,
+                                 priority: Priority = Priority.CHAT) -> None:
+        """Stream the response from a Textual async worker when async
+        streaming is enabled; otherwise run it on the AI controller's worker
+        pool. Either way it waits for a pool slot with `priority`, so it counts
+        against the backend's concurrency limit. A response for the same pair
+        that is still queued is cancelled."""
+        ai_controller = self.parent.AI_controller
+        key = ('response', conversation.get('id'), prompt_idx_tuple[1])
+        ai_controller.worker_pool.cancel(key)
+        if ai_controller.supports_async_streaming() and hasattr(app_instance, 'run_worker'):
+            app_instance.run_worker(
+                self._get_ai_response_async(prompt_idx_tuple, conversation, app_instance, gen_id, priority, key),
+                group="ai_response", exit_on_error=False,
+            )
+            return
+        ai_controller.worker_pool.submit(
+            self._get_ai_response_thread, prompt_idx_tuple, conversation, app_instance, gen_id,
+            priority=priority, backend=ai_controller.backend, key=key,
         )
-        thread.start()
 
     def _get_ai_response_thread(self, prompt_idx_tuple, conversation: ConversationDict, app_instance, gen_id: str) -> None:
         print(f"Starting AI streaming thread (Ticket: {gen_id})...")
         prompt, idx = prompt_idx_tuple
         
         # 1. Build Context
-        messages = conversation.get('messages', [])
-        context_parts = self._get_context_from_previous_messages(messages, idx)
-        full_prompt = ('\n'.join(context_parts) + '\n' + prompt) if context_parts else prompt
+        full_prompt = self._build_prompt(conversation, prompt, idx)
 
         # 2. Init Visuals: Create an empty "Model" bubble immediately
         if not self._init_streaming_message(conversation, idx, gen_id):
@@ -146,11 +160,63 @@ class AIResponseHandler:
 
         # 4. Finalize: Save to Disk ONLY ONCE at the end
         self._finalize_message(conversation, idx, gen_id)
-        self._refresh_ui(app_instance)
+        self._refresh_ui(app_instance, immediate=True)
+        self._report_frames(app_instance)
         self._unlock_input(app_instance)
 
+    async def _get_ai_response_async(self, prompt_idx_tuple, conversation: ConversationDict, app_instance, gen_id: str,
+                                     priority: Priority = Priority.CHAT, key=None) -> None:
+        """Same flow as _get_ai_response_thread, running on the app's event
+        loop while holding a worker pool slot: fragments arrive from the
+        model's async stream instead of a worker thread."""
+        ai_controller = self.parent.AI_controller
+        try:
+            async with ai_controller.worker_pool.slot(priority, backend=ai_controller.backend, key=key):
+                await self._stream_ai_response(prompt_idx_tuple, conversation, app_instance, gen_id)
+        except RuntimeError as e:
+            # Dropped from the pool's queue (or the pool shut down) before it started
+            print(f"Error: AI response not started: {e}")
+
+    async def _stream_ai_response(self, prompt_idx_tuple, conversation: ConversationDict, app_instance, gen_id: str) -> None:
+        prompt, idx = prompt_idx_tuple
+        full_prompt = self._build_prompt(conversation, prompt, idx)
+
+        if not self._init_streaming_message(conversation, idx, gen_id):
+            return # Stale ticket, abort
+        self._refresh_ui(app_instance)
+
+        conv_id = conversation.get('id')
+        accumulated_text = ""
+
+        try:
+            async with aclosing(self.parent.AI_controller.aget_response(conv_id, full_prompt)) as stream:
+                async for chunk in stream:
+                    if not self._validate_ticket(conversation, idx, gen_id):
+                        print("Stream aborted: Stale ticket.")
+                        return
+
+                    accumulated_text += chunk
+                    self._update_streaming_text(conversation, idx, accumulated_text)
+                    self._refresh_ui(app_instance)
+
+        except Exception as e:
+            accumulated_text += f"\n[Error: {str(e)}]"
+            self._update_streaming_text(conversation, idx, accumulated_text)
+            self._refresh_ui(app_instance)
+
+        self._finalize_message(conversation, idx, gen_id)
+        self._refresh_ui(app_instance, immediate=True)
+        self._report_frames(app_instance)
+        self._reset_placeholder(app_instance)
+
     # --- HELPER METHODS ---
 
+    def _build_prompt(self, conversation, prompt: str, idx: int) -> str:
+        """Prepend earlier user messages that never got a reply."""
+        messages = conversation.get('messages', [])
+        context_parts = self._get_context_from_previous_messages(messages, idx)
+        return ('\n'.join(context_parts) + '\n' + prompt) if context_parts else prompt
+
     def _init_streaming_message(self, conversation, idx, gen_id):
         """Creates the empty model message structure in memory."""
         import datetime
@@ -191,7 +257,7 @@ class AIResponseHandler:
                 msg['ai_pending'] = False
         
         # SAVE TO DISK NOW (Once per response)
-        self.parent.chat_controller.write_conversation_to_history(conversation)
+        self.parent.chat_controller.write_conversation_to_history(conversation, idx)
 
     def _get_context_from_previous_messages(self, messages, idx: int) -> List[str]:
         context_parts = []
@@ -204,12 +270,18 @@ class AIResponseHandler:
                     context_parts.append(user_text)
         return context_parts
 
-    def _refresh_ui(self, app_instance) -> None:
-        app_instance.call_from_thread(app_instance.refresh_data, where='inputModel')
-        app_instance.call_from_thread(app_instance.refresh_data, where='chat')
+    def _refresh_ui(self, app_instance, immediate: bool = False) -> None:
+        """Mark the chat dirty; the render scheduler repaints it with the next
+        frame (right away when `immediate`). Safe from any thread."""
+        app_instance.render_scheduler.request('chat', immediate=immediate)
+
+    def _report_frames(self, app_instance) -> None:
+        if self.parent.debug_mode:
+            print(f"[RENDER] {app_instance.render_scheduler.stats}")
 
     def _unlock_input(self, app_instance) -> None:
-        def reset_placeholder() -> None:
-            input_field = app_instance.query_one(f"#chat_input_container", Input)
-            input_field.placeholder = "Type your message here..."
-        app_instance.call_from_thread(reset_placeholder)
\ No newline at end of file
+        app_instance.call_from_thread(self._reset_placeholder, app_instance)
+
+    def _reset_placeholder(self, app_instance) -> None:
+        input_field = app_instance.query_one(f"#chat_input_container", Input)
+        input_field.placeholder = "Type your message here..."
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+RenderScheduler - Frame-rate-limited UI repaints.
+Streaming code marks regions of the UI dirty as often as it likes; a single
+scheduler thread repaints them on the UI thread at most `max_fps` times per
+second, merging everything requested in between into one frame.
+"""
+import threading
+import time
+from typing import Callable, Optional
+try:
+    from terminator_app.config import UserConfig
+except ImportError:
+    from config import UserConfig
+
+
+class RenderScheduler:
+    """Coalesces repaint requests into frames.
+
+    `request(*regions)` may be called from any thread. Dirty regions are
+    collected until the next frame is due, then `paint(regions)` runs through
+    `dispatch` (the app's `call_from_thread`). `immediate=True` skips the
+    wait, e.g. for the final frame when a stream ends. `stats['coalesced']`
+    counts requests folded into an already pending frame, i.e. frames that
+    were never drawn.
+    """
+
+    def __init__(self, paint: Callable[[set], None], dispatch: Callable, max_fps: Optional[float] = None):
+        self.paint = paint
+        self.dispatch = dispatch
+        max_fps = UserConfig.RENDER_MAX_FPS if max_fps is None else max_fps
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+        self._cond = threading.Condition()
+        self._dirty: set[str] = set()
+        self._immediate = False
+        self._last_frame = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'requests': 0, 'frames': 0, 'coalesced': 0, 'failed': 0}
+
+    def request(self, *regions: str, immediate: bool = False) -> None:
+        """Mark `regions` dirty; they are repainted with the next frame."""
+        with self._cond:
+            self.stats['requests'] += 1
+            if self._dirty:
+                self.stats['coalesced'] += 1
+            self._dirty.update(regions)
+            self._immediate = self._immediate or immediate
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._dirty:
+                    self._cond.wait()
+                # Let more requests pile up until the frame is due
+                while not self._immediate:
+                    delay = self._last_frame + self.interval - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                regions, self._dirty = self._dirty, set()
+                self._immediate = False
+                self._last_frame = time.monotonic()
+                self.stats['frames'] += 1
+            try:
+                # Blocks until painted, so slow frames coalesce more requests
+                self.dispatch(self.paint, regions)
+            except Exception as e:
+                self.stats['failed'] += 1
+                print(f"Error: Repaint failed: {e}")
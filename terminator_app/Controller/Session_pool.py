@@ -0,0 +1,82 @@
+"""
+SessionPool - Bounded cache of live AI chat sessions.
+Keeps at most MAX_OPEN_SESSIONS sessions, evicting by LRU or FIFO and closing
+sessions idle for longer than SESSION_TIMEOUT_MINUTES. An evicted session is
+rebuilt from stored history by AIController the next time it is needed.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+try:
+    from terminator_app.config import UserConfig
+except ImportError:
+    from config import UserConfig
+
+
+class SessionPool:
+    """Session cache keyed by conversation id.
+
+    Entries are kept in eviction order: the first entry is evicted first.
+    With "lru" an access moves the entry to the end; with "fifo" only
+    insertion order counts. Evicting only drops the pool's reference, so a
+    response still streaming from an evicted session finishes normally.
+    """
+
+    def __init__(self, max_sessions: Optional[int] = None, timeout_minutes: Optional[float] = None,
+                 strategy: Optional[str] = None):
+        self.max_sessions = UserConfig.MAX_OPEN_SESSIONS if max_sessions is None else max_sessions
+        if timeout_minutes is None:
+            timeout_minutes = UserConfig.SESSION_TIMEOUT_MINUTES
+        self.timeout = 60 * timeout_minutes if timeout_minutes else 0  # 0/None = never expire
+        self.strategy = (strategy or UserConfig.SESSION_EVICTION_STRATEGY).lower()
+        if self.strategy not in ("lru", "fifo"):
+            raise ValueError(f"Unknown session eviction strategy: {self.strategy}")
+        self._sessions: OrderedDict[str, list] = OrderedDict()  # conv_id -> [session, last_used]
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def __contains__(self, conv_id: str) -> bool:
+        with self._lock:
+            self._expire_idle()
+            return conv_id in self._sessions
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def get(self, conv_id: str):
+        """The live session for `conv_id`, or None (counted as a miss)."""
+        with self._lock:
+            self._expire_idle()
+            entry = self._sessions.get(conv_id)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            entry[1] = time.monotonic()
+            if self.strategy == "lru":
+                self._sessions.move_to_end(conv_id)
+            return entry[0]
+
+    def put(self, conv_id: str, session) -> None:
+        """Add or replace a session, evicting others to stay within the limit."""
+        with self._lock:
+            self._sessions.pop(conv_id, None)
+            self._sessions[conv_id] = [session, time.monotonic()]
+            self._expire_idle()
+            while self.max_sessions and len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def pop(self, conv_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(conv_id, None)
+
+    def _expire_idle(self) -> None:
+        if not self.timeout:
+            return
+        cutoff = time.monotonic() - self.timeout
+        for conv_id in [cid for cid, (_, last_used) in self._sessions.items() if last_used < cutoff]:
+            del self._sessions[conv_id]
+            self.stats['expirations'] += 1
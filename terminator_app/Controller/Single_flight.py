@@ -0,0 +1,64 @@
+"""
+SingleFlight - Coalesces identical concurrent requests.
+While a request is running, callers asking for the same key wait for it
+instead of starting another backend call.
+"""
+import threading
+from typing import Callable, Hashable, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Registry of in-flight requests keyed by what determines their result.
+
+    `do()` runs `fn` on the calling thread, or waits for the identical call
+    already running; every waiter gets the same result (or exception). Keys
+    are forgotten as soon as the call finishes; nothing is cached.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self.stats = {'calls': 0, 'shared': 0}
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: Hashable, fn: Callable):
+        call, leader = self._join(key)
+        if leader:
+            self._execute(key, call, fn)
+        else:
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _join(self, key: Hashable) -> tuple[_Call, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats['calls'] += 1
+            else:
+                self.stats['shared'] += 1
+            return call, leader
+
+    def _execute(self, key: Hashable, call: _Call, fn: Callable) -> None:
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+        finally:
+            # Unregister before waking waiters so later callers start a new call
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
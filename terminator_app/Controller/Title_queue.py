@@ -0,0 +1,115 @@
+"""
+TitleQueue - Batches title generation for untitled conversations.
+Requests are collected and titled several at a time by one background task,
+so opening the app with many untitled conversations costs a few model calls
+instead of one thread and one call per conversation.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+try:
+    from terminator_app.config import UserConfig
+except ImportError:
+    from config import UserConfig
+
+
+class TitleQueue:
+    """Queue of conversations waiting for a title, keyed by conversation id.
+
+    `generate` titles a batch of conversations ({id: title}); `save` writes
+    all titles of a batch at once. Each batch runs as one call of
+    `schedule(fn, on_cancel)`, a function running `fn` in the background (a
+    new thread by default) that calls `on_cancel()` instead if `fn` will
+    never run; the next batch is scheduled when one finishes. A batch that
+    could not be scheduled is scheduled again by the next `submit()`. A
+    conversation already queued or being titled only gets the new callback
+    added. Callbacks are called in the background with (conv_id, title).
+    """
+
+    def __init__(self, generate: Callable[[list[dict]], dict[str, str]],
+                 save: Optional[Callable[[dict[str, str]], bool]] = None,
+                 batch_size: Optional[int] = None, gather_delay: float = 0.1,
+                 schedule: Optional[Callable[[Callable, Callable], object]] = None):
+        self._generate = generate
+        self._save = save
+        self._schedule = schedule or (lambda fn, on_cancel: threading.Thread(target=fn, daemon=True).start())
+        self.batch_size = batch_size or UserConfig.TITLE_BATCH_SIZE
+        self.gather_delay = gather_delay  # Wait for more requests before each batch
+        self._lock = threading.Lock()
+        self._queued: OrderedDict[str, tuple[dict, list]] = OrderedDict()
+        self._in_progress: dict[str, list] = {}
+        self._scheduled = False
+        self.stats = {'requests': 0, 'batches': 0, 'titled': 0}
+
+    def submit(self, conversation: dict, callback: Optional[Callable] = None) -> None:
+        conv_id = conversation.get('id')
+        if not conv_id:
+            return
+        callbacks = [callback] if callback else []
+        with self._lock:
+            self.stats['requests'] += 1
+            if conv_id in self._in_progress:
+                self._in_progress[conv_id].extend(callbacks)
+                return
+            if conv_id in self._queued:
+                self._queued[conv_id][1].extend(callbacks)
+            else:
+                self._queued[conv_id] = (conversation, callbacks)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._schedule_batch()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._queued) + len(self._in_progress)
+
+    def _run_batch(self) -> None:
+        if self.gather_delay:
+            # Let requests made in the same refresh join this batch
+            time.sleep(self.gather_delay)
+        with self._lock:
+            batch = [self._queued.popitem(last=False) for _ in range(min(self.batch_size, len(self._queued)))]
+            for conv_id, (_, callbacks) in batch:
+                self._in_progress[conv_id] = callbacks
+        try:
+            if batch:
+                self._process([conversation for _, (conversation, _) in batch])
+        finally:
+            with self._lock:
+                self._scheduled = bool(self._queued)
+            if self._scheduled:
+                self._schedule_batch()
+
+    def _schedule_batch(self) -> None:
+        try:
+            self._schedule(self._run_batch, self._batch_dropped)
+        except Exception as e:
+            print(f"Error: Could not schedule title generation: {e}")
+            self._batch_dropped()
+
+    def _batch_dropped(self) -> None:
+        """The scheduled batch will never run; the next submit schedules one again."""
+        with self._lock:
+            self._scheduled = False
+
+    def _process(self, conversations: list[dict]) -> None:
+        try:
+            titles = self._generate(conversations)
+        except Exception as e:
+            print(f"Error: Title generation failed: {e}")
+            titles = {}
+        self.stats['batches'] += 1
+        generated = {conv_id: title for conv_id, title in titles.items() if title}
+        if generated and self._save:
+            self._save(generated)
+        self.stats['titled'] += len(generated)
+        with self._lock:
+            callbacks = [(conv['id'], self._in_progress.pop(conv['id'], [])) for conv in conversations]
+        for conv_id, conv_callbacks in callbacks:
+            for callback in conv_callbacks:
+                try:
+                    callback(conv_id, titles.get(conv_id, ""))
+                except Exception as e:
+                    print(f"Error: Title callback failed: {e}")
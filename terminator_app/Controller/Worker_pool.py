@@ -0,0 +1,277 @@
+"""
+WorkerPool - Bounded, priority-aware pool for background work.
+Chat responses, auto-completions, title generation and indexing share a fixed
+set of worker threads. Queued work runs highest priority first, and each
+model backend gets its own concurrency limit so background requests cannot
+pile onto a local model that is answering the user.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Callable, Hashable, Optional
+try:
+    from terminator_app.config import UserConfig
+except ImportError:
+    from config import UserConfig
+
+
+class Priority(IntEnum):
+    """Lower runs first."""
+    CHAT = 0
+    AUTOCOMPLETE = 1
+    TITLES = 2
+    INDEXING = 3  # Indexing and other background upkeep (summaries)
+
+
+class Task:
+    """A unit of work in the pool. `cancel()` removes it from the queue; a
+    running task only gets `cancelled` set, which it may check to stop early.
+    `on_cancel()` is called when the task is removed before it started (it
+    will never run), so callers can release whatever they reserved for it."""
+
+    def __init__(self, fn: Callable, args: tuple, priority: Priority, backend: Optional[str], key: Optional[Hashable],
+                 on_cancel: Optional[Callable[[], None]] = None):
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.backend = backend
+        self.key = key
+        self.on_cancel = on_cancel
+        self.cancelled = False
+        self.started = False
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.submitted_at = time.monotonic()
+        self._pool: Optional["WorkerPool"] = None
+
+    def cancel(self) -> bool:
+        """Cancel the task. Returns True if it had not started yet."""
+        return self._pool.cancel_task(self) if self._pool else False
+
+
+class WorkerPool:
+    """Fixed worker threads (started on demand) pulling from a priority queue.
+
+    A queued task is eligible when its backend is below its limit
+    (UserConfig.BACKEND_CONCURRENCY). Background work (TITLES and below)
+    leaves one worker, and one slot of every backend allowing more than one
+    request, free for chat. When the queue is full, the lowest-priority
+    queued task is dropped (its `on_cancel` is called) to make room for more
+    important work; otherwise `submit()` raises RuntimeError.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 backend_limits: Optional[dict[str, int]] = None):
+        self.max_workers = max_workers or UserConfig.WORKER_POOL_SIZE
+        self.max_queue = UserConfig.WORKER_QUEUE_SIZE if max_queue is None else max_queue
+        self.backend_limits = dict(UserConfig.BACKEND_CONCURRENCY if backend_limits is None else backend_limits)
+        self._cond = threading.Condition()
+        self._queue: list[tuple[int, int, Task]] = []  # (priority, sequence, task)
+        self._sequence = itertools.count()
+        self._workers: list[threading.Thread] = []
+        self._idle = 0
+        self._running: dict[Optional[str], int] = {}
+        self._active: set[Task] = set()
+        self._running_total = 0
+        self._shutdown = False
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'cancelled': 0, 'rejected': 0}
+        self._waits = {priority: [0, 0.0, 0.0] for priority in Priority}  # count, total, max (seconds)
+
+    def submit(self, fn: Callable, *args, priority: Priority = Priority.CHAT, backend: Optional[str] = None,
+               key: Optional[Hashable] = None, on_cancel: Optional[Callable[[], None]] = None) -> Task:
+        """Queue `fn(*args)`. `key` identifies the task for `cancel()`;
+        `on_cancel()` is called if the task is cancelled or dropped unstarted."""
+        task = Task(fn, args, Priority(priority), backend, key, on_cancel)
+        task._pool = self
+        dropped = None
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Worker pool is shut down")
+            if self.max_queue and len(self._queue) >= self.max_queue:
+                lowest = max(self._queue)
+                if lowest[0] <= task.priority:
+                    self.stats['rejected'] += 1
+                    raise RuntimeError("Worker queue is full")
+                self._queue.remove(lowest)
+                self._mark_cancelled(lowest[2])
+                dropped = lowest[2]
+            self._queue.append((task.priority, next(self._sequence), task))
+            self.stats['submitted'] += 1
+            if self._idle == 0 and len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._cond.notify_all()
+        if dropped:
+            self._cancelled([dropped])
+        return task
+
+    def cancel(self, key: Hashable) -> int:
+        """Cancel every task submitted with `key`. Returns how many were still queued."""
+        with self._cond:
+            queued = [entry for entry in self._queue if entry[2].key == key]
+            for entry in queued:
+                self._queue.remove(entry)
+                self._mark_cancelled(entry[2])
+            for task in self._active:
+                if task.key == key:
+                    task.cancelled = True
+        self._cancelled([task for _, _, task in queued])
+        return len(queued)
+
+    def cancel_task(self, task: Task) -> bool:
+        with self._cond:
+            queued = any(entry[2] is task for entry in self._queue)
+            if queued:
+                self._queue[:] = [entry for entry in self._queue if entry[2] is not task]
+                self._mark_cancelled(task)
+            else:
+                task.cancelled = True
+        if queued:
+            self._cancelled([task])
+        return queued
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.CHAT, backend: Optional[str] = None,
+                   key: Optional[Hashable] = None):
+        """Hold a worker and a `backend` slot while async work runs on the
+        event loop, queued with `priority` like any other task. Yields the
+        holding Task. Raises RuntimeError if it is dropped or cancelled before
+        it starts."""
+        loop = asyncio.get_running_loop()
+        acquired = loop.create_future()
+        release = threading.Event()
+
+        def resolve(started: bool) -> None:
+            if not acquired.done():
+                acquired.set_result(started)
+
+        def hold() -> None:
+            loop.call_soon_threadsafe(resolve, True)
+            release.wait()
+
+        task = self.submit(hold, priority=priority, backend=backend, key=key,
+                           on_cancel=lambda: loop.call_soon_threadsafe(resolve, False))
+        try:
+            if not await acquired:
+                raise RuntimeError("Cancelled before it started")
+            yield task
+        finally:
+            release.set()
+            task.cancel()
+
+    def metrics(self) -> dict:
+        """Queue depth per priority, running tasks per backend, wait times and counters."""
+        with self._cond:
+            queued = {priority.name.lower(): 0 for priority in Priority}
+            for priority, _, _ in self._queue:
+                queued[Priority(priority).name.lower()] += 1
+            waits = {
+                priority.name.lower(): {'count': count, 'avg': total / count if count else 0.0, 'max': longest}
+                for priority, (count, total, longest) in self._waits.items()
+            }
+            return {
+                'workers': len(self._workers),
+                'running': self._running_total,
+                'running_per_backend': {str(b): n for b, n in self._running.items() if n},
+                'queued': queued,
+                'wait_seconds': waits,
+                **self.stats,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Cancel queued tasks and stop the workers once they are idle."""
+        with self._cond:
+            self._shutdown = True
+            dropped = [task for _, _, task in self._queue]
+            for task in dropped:
+                self._mark_cancelled(task)
+            self._queue.clear()
+            self._cond.notify_all()
+            workers = list(self._workers)
+        self._cancelled(dropped)
+        if wait:
+            for worker in workers:
+                if worker is not threading.current_thread():
+                    worker.join()
+
+    # --- Workers ---
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None:
+                    if self._shutdown:
+                        return
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+                    task = self._next_task()
+                task.started = True
+                self._active.add(task)
+                self._running[task.backend] = self._running.get(task.backend, 0) + 1
+                self._running_total += 1
+                self._record_wait(task)
+            try:
+                task.result = task.fn(*task.args)
+            except BaseException as e:
+                task.error = e
+                print(f"Error: Background task failed: {e}")
+            with self._cond:
+                self._active.discard(task)
+                self._running[task.backend] -= 1
+                self._running_total -= 1
+                self.stats['failed' if task.error else 'completed'] += 1
+                # A freed backend slot may unblock a queued task
+                self._cond.notify_all()
+            task.done.set()
+
+    def _next_task(self) -> Optional[Task]:
+        """Pop the highest-priority queued task that may start now."""
+        best = None
+        for entry in self._queue:
+            if (best is None or entry < best) and self._may_start(entry[2]):
+                best = entry
+        if best is None:
+            return None
+        self._queue.remove(best)
+        return best[2]
+
+    def _may_start(self, task: Task) -> bool:
+        background = task.priority >= Priority.TITLES
+        worker_limit = self.max_workers - 1 if background and self.max_workers > 1 else self.max_workers
+        if self._running_total >= worker_limit:
+            return False
+        limit = self.backend_limits.get(task.backend) if task.backend else None
+        if not limit:
+            return True
+        if background and limit > 1:
+            limit -= 1
+        return self._running.get(task.backend, 0) < limit
+
+    def _mark_cancelled(self, task: Task) -> None:
+        task.cancelled = True
+        self.stats['cancelled'] += 1
+        task.done.set()
+
+    @staticmethod
+    def _cancelled(tasks: list[Task]) -> None:
+        """Call the `on_cancel` of tasks removed unstarted, outside the pool lock."""
+        for task in tasks:
+            if task.on_cancel:
+                try:
+                    task.on_cancel()
+                except Exception as e:
+                    print(f"Error: Cancel callback failed: {e}")
+
+    def _record_wait(self, task: Task) -> None:
+        wait = time.monotonic() - task.submitted_at
+        entry = self._waits[task.priority]
+        entry[0] += 1
+        entry[1] += wait
+        entry[2] = max(entry[2], wait)
@@ -0,0 +1,68 @@
+"""
+ChangeEvents - Typed notifications of DataManager changes.
+Views subscribe to the changes they display and update only what a change
+touches, instead of re-reading every conversation after each action.
+"""
+import threading
+from typing import Callable, NamedTuple
+
+
+class ConversationAdded(NamedTuple):
+    conv_id: str
+
+
+class ConversationRemoved(NamedTuple):
+    conv_id: str
+
+
+class TitleChanged(NamedTuple):
+    conv_id: str
+    title: str
+
+
+class MessageAppended(NamedTuple):
+    conv_id: str
+    index: int  # Index of the new message/pair
+
+
+class PendingChanged(NamedTuple):
+    conv_id: str
+    index: int  # Index of the user/model pair
+    pending: bool  # The pair's new ai_pending state
+
+
+ChangeEvent = ConversationAdded | ConversationRemoved | TitleChanged | MessageAppended | PendingChanged
+
+
+class ChangeNotifier:
+    """Delivers change events to subscribers.
+
+    Callbacks run on the thread that made the change, possibly with the
+    DataManager lock held, so they must return quickly and never wait on
+    the UI thread: hand the work over (e.g. to the render scheduler) instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: list[tuple[Callable[[ChangeEvent], None], tuple[type, ...]]] = []
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None], *event_types: type) -> Callable[[], None]:
+        """Call `callback(event)` for events of `event_types` (all events if
+        none are given). Returns a function that unsubscribes."""
+        entry = (callback, event_types)
+        with self._lock:
+            self._subscribers = self._subscribers + [entry]
+
+        def unsubscribe() -> None:
+            with self._lock:
+                self._subscribers = [s for s in self._subscribers if s is not entry]
+        return unsubscribe
+
+    def publish(self, event: ChangeEvent) -> None:
+        for callback, event_types in self._subscribers:
+            if event_types and not isinstance(event, event_types):
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error: Change subscriber failed on {event}: {e}")
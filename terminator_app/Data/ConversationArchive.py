@@ -0,0 +1,162 @@
+"""
+ConversationArchive - Read-only, memory-mapped tier for old conversations.
+Archived conversations are encoded back to back in one file and located
+through a small offset index, so they cost no RAM until one is opened.
+"""
+import itertools
+import mmap
+import os
+from typing import Optional
+try:
+    from terminator_app.Data import load
+    from terminator_app.Data.codec import Codec, dumps_json
+except ImportError:
+    from Data import load
+    from Data.codec import Codec, dumps_json
+
+
+class ConversationArchive:
+    """Append-only archive file plus an offset index.
+
+    The index maps conversation id -> offset/length of its encoded blob and the
+    conversation metadata (title, timestamp, message count) used for listing.
+    Blobs are never modified: a conversation that changes again is removed from
+    the index (promoted back to the main store) and its bytes become dead space,
+    reclaimed by `compact()`. Callers serialize access (DataManager's lock).
+    """
+
+    def __init__(self, archive_path: str, index_path: str):
+        self._archive_path = archive_path
+        self._index_path = index_path
+        self._entries: dict[str, dict] = {}
+        self._stubs: dict[str, dict] = {}
+        self._dead_bytes = 0
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._load_index()
+
+    def __contains__(self, conv_id: str) -> bool:
+        return conv_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def dead_bytes(self) -> int:
+        return self._dead_bytes
+
+    @property
+    def live_bytes(self) -> int:
+        return sum(entry['length'] for entry in self._entries.values())
+
+    def stubs(self) -> list[dict]:
+        """Metadata of every archived conversation (no messages)."""
+        return list(self._stubs.values())
+
+    def stubs_page(self, start: int, stop: int) -> list[dict]:
+        """Metadata of archived conversations `start` to `stop`, most recently archived first."""
+        return list(itertools.islice(reversed(self._stubs.values()), start, stop))
+
+    def stub(self, conv_id: str) -> Optional[dict]:
+        return self._stubs.get(conv_id)
+
+    def read(self, conv_id: str) -> Optional[dict]:
+        """Decode one archived conversation from its slice of the mapped file."""
+        entry = self._entries.get(conv_id)
+        if entry is None:
+            return None
+        end = entry['offset'] + entry['length']
+        if self._map is None or len(self._map) < end:
+            self._remap()
+        return Codec.loads(self._map[entry['offset']:end])
+
+    @staticmethod
+    def encode(conversation: dict) -> bytes:
+        return dumps_json(conversation)
+
+    def append(self, items: list[tuple[dict, bytes]]) -> None:
+        """Append encoded conversations, given as (metadata, blob) pairs, and
+        persist the index. Blobs are made durable before the index points to them."""
+        if not items:
+            return
+        os.makedirs(os.path.dirname(self._archive_path), exist_ok=True)
+        with open(self._archive_path, 'ab') as f:
+            offset = f.tell()
+            for metadata, blob in items:
+                f.write(blob)
+                conv_id = metadata['id']
+                if conv_id in self._entries:
+                    self._dead_bytes += self._entries[conv_id]['length']
+                self._entries[conv_id] = {'offset': offset, 'length': len(blob), 'metadata': metadata}
+                self._stubs[conv_id] = dict(metadata)
+                offset += len(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        self._save_index()
+
+    def remove(self, conv_id: str) -> None:
+        """Drop a conversation from the index; its bytes become dead space."""
+        entry = self._entries.pop(conv_id, None)
+        if entry is None:
+            return
+        self._stubs.pop(conv_id, None)
+        self._dead_bytes += entry['length']
+        self._save_index()
+
+    def compact(self) -> None:
+        """Rewrite the archive without dead space."""
+        tmp_path = f"{self._archive_path}.tmp"
+        entries = {}
+        with open(tmp_path, 'wb') as f:
+            for conv_id, entry in self._entries.items():
+                if self._map is None or len(self._map) < entry['offset'] + entry['length']:
+                    self._remap()
+                entries[conv_id] = dict(entry, offset=f.tell())
+                f.write(self._map[entry['offset']:entry['offset'] + entry['length']])
+            f.flush()
+            os.fsync(f.fileno())
+        self._unmap()
+        os.replace(tmp_path, self._archive_path)
+        self._entries = entries
+        self._dead_bytes = 0
+        self._save_index()
+
+    def close(self) -> None:
+        self._unmap()
+
+    # --- Helpers ---
+
+    def _load_index(self) -> None:
+        try:
+            with open(self._index_path, 'rb') as f:
+                index = Codec.loads(f.read())
+        except Exception:
+            # Missing or unreadable index: nothing is archived
+            return
+        self._entries = index.get('entries', {})
+        self._dead_bytes = index.get('dead_bytes', 0)
+        self._stubs = {conv_id: dict(entry['metadata']) for conv_id, entry in self._entries.items()}
+
+    def _save_index(self) -> None:
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(Codec.for_path(self._index_path).dumps({'entries': self._entries, 'dead_bytes': self._dead_bytes}))
+        os.replace(tmp_path, self._index_path)
+
+    def _remap(self) -> None:
+        """(Re)map the archive file read-only, e.g. after it grew."""
+        self._unmap()
+        self._file = open(self._archive_path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _unmap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def metadata(conversation: dict) -> dict:
+        return load.DataLoader.conversation_metadata(conversation)
@@ -2,50 +2,533 @@
 DataManager - Single source of truth for conversation history data.
 Manages loading, saving, and accessing conversation data with thread safety.
 """
+import copy
 import threading
+from datetime import datetime, timedelta
+from functools import partial
 from typing import Optional
 try:
+    from terminator_app.config import Config, UserConfig
     from terminator_app.Data import load
-    from terminator_app.config import Config
+    from terminator_app.Data.ChangeEvents import (
+        ChangeNotifier, ConversationAdded, ConversationRemoved, MessageAppended, PendingChanged, TitleChanged,
+    )
+    from terminator_app.Data.ConversationArchive import ConversationArchive
+    from terminator_app.Data.Flusher import BackgroundFlusher
+    from terminator_app.Data.JsonStore import JsonStore
+    from terminator_app.Data.JournalStore import JournalStore
+    from terminator_app.Data.SearchIndex import SearchIndex
+    from terminator_app.Data.SemanticIndex import SemanticIndex, load_embedding_function
+    from terminator_app.Data.SQLiteStore import SQLiteStore
+    from terminator_app.Data.ShardedStore import ShardedStore
+    from terminator_app.Interfaces.StoreInterface import StoreInterface
 except ImportError:
-    from config import Config
+    from config import Config, UserConfig
     from Data import load
+    from Data.ChangeEvents import (
+        ChangeNotifier, ConversationAdded, ConversationRemoved, MessageAppended, PendingChanged, TitleChanged,
+    )
+    from Data.ConversationArchive import ConversationArchive
+    from Data.Flusher import BackgroundFlusher
+    from Data.JsonStore import JsonStore
+    from Data.JournalStore import JournalStore
+    from Data.SearchIndex import SearchIndex
+    from Data.SemanticIndex import SemanticIndex, load_embedding_function
+    from Data.SQLiteStore import SQLiteStore
+    from Data.ShardedStore import ShardedStore
+    from Interfaces.StoreInterface import StoreInterface
 
 class DataManager:
     """Centralized manager for conversation history data."""
     
-    def __init__(self):
+    def __init__(self, store: Optional[StoreInterface] = None, flush_interval: Optional[float] = None):
         self._conversation_history: list[dict] = []
         self._lock = threading.RLock()  # Use RLock instead of Lock for reentrant locking
         self._conversation_dict: dict[str, dict] = {}
+        # Change events; message counts and pending pairs as last published
+        self.events = ChangeNotifier()
+        self._known_counts: dict[str, int] = {}
+        self._known_pending: dict[str, set[int]] = {}
         self._history_path = Config.CONVERSATION_HISTORY_PATH
-        self.load_from_disk()
+        self._store = store or self._create_store(UserConfig.STORAGE_BACKEND)
+        # Old conversations live in a read-only archive, listed from its index
+        self._archive = ConversationArchive(Config.CONVERSATION_ARCHIVE_PATH, Config.CONVERSATION_ARCHIVE_INDEX_PATH)
+        # Full-text index, updated on every mutation; rebuilt after loading if stale
+        self._search_index = SearchIndex(Config.SEARCH_INDEX_PATH)
+        self._search_index_fresh = self._search_index.load()
+        self._semantic_index = self._create_semantic_index()
+
+        # Writes are queued and flushed in the background; 0 writes synchronously
+        if flush_interval is None:
+            flush_interval = UserConfig.FLUSH_INTERVAL
+        self._sync_writes = flush_interval <= 0
+        self._flusher = BackgroundFlusher(self._lock, flush_interval)
+
+        # Metadata-first startup: if the store can list conversations cheaply,
+        # start from that and parse the message bodies in the background.
+        self._loaded = threading.Event()
+        self._loaded_callbacks: list = []
+        self._deleted_while_loading: set[str] = set()
+        stubs = self._store.load_metadata()
+        if stubs is None:
+            self._set_history(self._store.load())
+            self._finish_loading()
+        else:
+            self._set_history(stubs)
+            threading.Thread(target=self._load_in_background, daemon=True).start()
+
+    def _create_store(self, backend: str) -> StoreInterface:
+        """Build the storage backend selected in UserConfig.STORAGE_BACKEND."""
+        if backend == "journal":
+            return JournalStore(
+                self._history_path,
+                Config.CONVERSATION_JOURNAL_PATH,
+                compact_threshold=UserConfig.JOURNAL_COMPACT_THRESHOLD,
+                compact_interval=UserConfig.JOURNAL_COMPACT_INTERVAL,
+            )
+        if backend == "sqlite":
+            store = SQLiteStore(Config.CONVERSATION_DB_PATH)
+            store.migrate_from_json(self._history_path, Config.CONVERSATION_JOURNAL_PATH)
+            return store
+        if backend == "sharded":
+            store = ShardedStore(Config.CONVERSATION_SHARD_PATH)
+            store.migrate_from_json(self._history_path, Config.CONVERSATION_JOURNAL_PATH)
+            return store
+        if backend == "json":
+            return JsonStore(self._history_path)
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    def _create_semantic_index(self) -> Optional[SemanticIndex]:
+        """Embedding index for "find similar", or None if disabled or NumPy is missing."""
+        if not UserConfig.SEMANTIC_SEARCH or not SemanticIndex.available():
+            return None
+        try:
+            embed = load_embedding_function(UserConfig.SEMANTIC_EMBEDDING)
+        except Exception as e:
+            print(f"Warning: Could not load embedding function {UserConfig.SEMANTIC_EMBEDDING!r}, using hashing: {e}")
+            embed = load_embedding_function("hashing")
+        index = SemanticIndex(Config.SEMANTIC_INDEX_PATH, embed, float16=UserConfig.SEMANTIC_FLOAT16)
+        index.load()
+        return index
 
     def load_from_disk(self) -> None:
         """Reload conversation history from disk."""
+        self.flush()
+        with self._lock:
+            self._set_history(self._store.load())
+
+    def _set_history(self, conversations: list[dict]) -> None:
         with self._lock:
-            self._conversation_history = load.DataLoader.load_conversation_history(self._history_path)
+            self._conversation_history = conversations
             # Build fast lookup dict
             self._conversation_dict = {
                 conv['id']: conv 
                 for conv in self._conversation_history 
                 if conv.get('id')
             }
+            self._known_counts = {
+                conv_id: self.get_message_count(conv) for conv_id, conv in self._conversation_dict.items()
+            }
+            self._known_pending = {}
+
+    def subscribe(self, callback, *event_types: type):
+        """Call `callback(event)` on every change of the given ChangeEvents
+        types (all if none given); see ChangeNotifier. Returns an unsubscribe function."""
+        return self.events.subscribe(callback, *event_types)
+
+    def _publish_messages(self, conversation: dict, index: Optional[int] = None) -> None:
+        """Publish MessageAppended/PendingChanged for what changed in a
+        conversation since the last call: new messages, and the pending state
+        of the pair at `index` (of every pair if None)."""
+        conv_id = conversation['id']
+        messages = conversation.get('messages', [])
+        before = self._known_counts.get(conv_id, len(messages))
+        self._known_counts[conv_id] = len(messages)
+        pending = self._known_pending.setdefault(conv_id, set())
+        pending.difference_update([i for i in pending if i >= len(messages)])
+        for i in range(before, len(messages)):
+            self.events.publish(MessageAppended(conv_id, i))
+        for i in (range(len(messages)) if index is None else [index]):
+            now_pending = isinstance(messages[i], dict) and bool(messages[i].get('ai_pending'))
+            if now_pending != (i in pending):
+                (pending.add if now_pending else pending.discard)(i)
+                self.events.publish(PendingChanged(conv_id, i, now_pending))
+
+    def _track(self, conversation: dict) -> None:
+        """Start publishing message changes of a conversation new to the cache."""
+        messages = conversation.get('messages', [])
+        self._known_counts[conversation['id']] = len(messages)
+        self._known_pending[conversation['id']] = {
+            i for i, message in enumerate(messages) if isinstance(message, dict) and message.get('ai_pending')
+        }
+
+    def _forget(self, conv_id: str) -> None:
+        self._known_counts.pop(conv_id, None)
+        self._known_pending.pop(conv_id, None)
+
+    def is_loaded(self) -> bool:
+        """False while message bodies are still being parsed in the background."""
+        return self._loaded.is_set()
+
+    def when_loaded(self, callback) -> bool:
+        """Call `callback()` on the loading thread once all message bodies are loaded.
+        Returns False (and drops the callback) if loading already finished."""
+        with self._lock:
+            if self._loaded.is_set():
+                return False
+            self._loaded_callbacks.append(callback)
+            return True
+
+    def _load_in_background(self) -> None:
+        try:
+            conversations = self._store.load()
+        except Exception as e:
+            print(f"Error: Failed to load conversation history: {e}")
+            conversations = []
+        with self._lock:
+            self._merge_loaded(conversations)
+        self._finish_loading()
+
+    def _merge_loaded(self, loaded: list[dict]) -> None:
+        """Fill the metadata stubs with the loaded conversations.
+
+        The stub dicts are kept (callers may already hold them) and changes made
+        while loading win over what was read from disk. `loaded` is updated in
+        place because the store keeps a reference to it.
+        """
+        for i, conv in enumerate(loaded):
+            current = self._conversation_dict.get(conv.get('id'))
+            if current is None:
+                continue
+            if 'messages' not in current:
+                for key, value in conv.items():
+                    current.setdefault(key, value)
+                current.pop('message_count', None)
+            loaded[i] = current
+        loaded[:] = [conv for conv in loaded if conv.get('id') not in self._deleted_while_loading]
+        loaded_ids = {conv.get('id') for conv in loaded}
+        loaded.extend(conv for conv in self._conversation_history if conv.get('id') not in loaded_ids)
+        self._deleted_while_loading.clear()
+        self._set_history(loaded)
+
+    def _finish_loading(self) -> None:
+        """Release writes queued while loading and notify waiters."""
+        with self._lock:
+            self._loaded.set()
+            callbacks, self._loaded_callbacks = self._loaded_callbacks, []
+        if self._sync_writes:
+            self._flusher.flush()
+        else:
+            self._flusher.start()
+        for callback in callbacks:
+            callback()
+        threading.Thread(target=self._sync_indexes, daemon=True).start()
+        if UserConfig.ARCHIVE_AFTER_DAYS is not None:
+            threading.Thread(
+                target=self.archive_old_conversations, args=(UserConfig.ARCHIVE_AFTER_DAYS,), daemon=True
+            ).start()
+
+    def _wait_for_messages(self, conv_id: str) -> None:
+        """Block until a conversation's messages are available.
+        Must not be called with the lock held: the loading thread needs it."""
+        if self._loaded.is_set():
+            return
+        conversation = self._conversation_dict.get(conv_id)
+        if conversation is not None and 'messages' not in conversation:
+            self._loaded.wait()
 
     def save_to_disk(self) -> bool:
-        """Save conversation history to disk."""
+        """Save the full conversation history to disk."""
         with self._lock:
-            return load.DataLoader.save_conversation_history(self._history_path, self._conversation_history)
+            self._flusher.discard(lambda key: True)
+            return self._persist(('all',), self._prepare_save_all)
+
+    def flush(self) -> bool:
+        """Write all queued changes now. Use when a change must be durable."""
+        if not self._loaded.is_set():
+            self._loaded.wait()
+        return self._flusher.flush()
+
+    def close(self) -> None:
+        """Flush pending writes and release the storage backend."""
+        self._loaded.wait()
+        self._flusher.stop()
+        self._store.close()
+        with self._lock:
+            self._archive.close()
+            self._search_index.save()
+        if self._semantic_index:
+            self._semantic_index.stop()
+            self._semantic_index.save()
+
+    def install_signal_handlers(self) -> None:
+        """Flush queued writes when the process receives SIGTERM/SIGHUP."""
+        self._flusher.install_signal_handlers()
+
+    def _persist(self, key: tuple, prepare) -> bool:
+        """Queue a write for the flusher. `prepare()` runs under the lock when
+        the queue is flushed: it copies what is to be written and returns the
+        store call, which runs outside the lock. In synchronous mode it is
+        written right away, unless the history is still loading (then it waits
+        for the load).
+
+        Keys are ('conv', id), ('msg', id, index), ('title', id), ('del', id) or
+        ('all',); a queued write with the same key is replaced.
+        """
+        if self._store.rewrites_all:
+            # Every write would re-serialize everything, so queue a single one
+            key, prepare = ('all',), self._prepare_save_all
+        self._flusher.submit(key, prepare)
+        if self._sync_writes and self._loaded.is_set():
+            return self._flusher.flush()
+        return True
+
+    def _persist_conversation(self, conversation: dict) -> bool:
+        conv_id = conversation['id']
+        # A full write of the conversation supersedes queued per-message writes
+        self._flusher.discard(lambda key: key[0] == 'msg' and key[1] == conv_id)
+        return self._persist(('conv', conv_id), lambda: partial(self._store.put_conversation, copy.deepcopy(conversation)))
+
+    def _persist_message(self, conversation: dict, index: int) -> bool:
+        conv_id = conversation['id']
+        if self._flusher.is_pending(('conv', conv_id)):
+            return True
+        def prepare():
+            if index >= len(conversation.get('messages', [])):
+                return lambda: False
+            return partial(self._store.put_message, conv_id, index, copy.deepcopy(conversation['messages'][index]))
+        return self._persist(('msg', conv_id, index), prepare)
+
+    def _prepare_save_all(self):
+        return partial(self._store.save_all, copy.deepcopy(self._conversation_history))
 
     def get_all_conversations(self) -> list[dict]:
-        """Get a copy of all conversations from memory cache."""
+        """Get a copy of all conversations from memory cache.
+        Archived conversations come first, as metadata only."""
         with self._lock:
-            return list(self._conversation_history)
+            archived = [conv for conv in self._archive.stubs() if conv['id'] not in self._conversation_dict]
+            return archived + self._conversation_history
+
+    def get_conversation_count(self) -> int:
+        """Number of conversations, archived ones included."""
+        with self._lock:
+            return len(self._conversation_history) + len(self._archive)
+
+    def get_conversation_page(self, start: int, count: int) -> list[dict]:
+        """Metadata (no messages) of `count` conversations from position
+        `start`, newest first as listed in the history panel: conversations
+        in the store, then archived ones. Message bodies are not loaded."""
+        with self._lock:
+            live = len(self._conversation_history)
+            stop = start + count
+            page = [
+                load.DataLoader.conversation_metadata(conv)
+                for conv in reversed(self._conversation_history[max(0, live - stop):max(0, live - start)])
+            ]
+            if stop > live:
+                page += [dict(stub) for stub in self._archive.stubs_page(max(0, start - live), stop - live)]
+            return page
 
     def get_conversation_by_id(self, conv_id: str) -> Optional[dict]:
-        """Get a conversation by ID from memory cache. Returns None if not found."""
+        """Get a conversation by ID from memory cache. Returns None if not found.
+        Messages of lazily loaded conversations are fetched on first access;
+        archived conversations are decoded from the archive on every call."""
+        self._wait_for_messages(conv_id)
+        with self._lock:
+            conversation = self._conversation_dict.get(conv_id)
+            if conversation is None:
+                return self._archive.read(conv_id)
+            if 'messages' not in conversation:
+                self._load_messages(conversation)
+            return conversation
+
+    def search(self, query: str, limit: Optional[int] = None, snippet_limit: int = 50) -> list[dict]:
+        """Full-text search over user and model messages, newest conversations first.
+
+        Returns [{'id': conv_id, 'pairs': [pair indices], 'snippet': str}, ...].
+        Only the first `snippet_limit` results get a snippet (read from the
+        message bodies); the rest have 'snippet': None.
+        """
+        terms = SearchIndex.tokenize(query)
+        with self._lock:
+            hits = self._search_index.search(query)
+            ordered = sorted(hits, key=self._conversation_timestamp, reverse=True)
+            if limit is not None:
+                ordered = ordered[:limit]
+            results = []
+            for rank, conv_id in enumerate(ordered):
+                snippet = self._snippet(conv_id, hits[conv_id][0], terms) if rank < snippet_limit else None
+                results.append({'id': conv_id, 'pairs': hits[conv_id], 'snippet': snippet})
+            return results
+
+    def _conversation_timestamp(self, conv_id: str) -> str:
+        conversation = self._conversation_dict.get(conv_id) or self._archive.stub(conv_id) or {}
+        return conversation.get('timestamp') or ''
+
+    def _snippet(self, conv_id: str, index: int, terms: list[str]) -> str:
+        conversation = self._conversation_dict.get(conv_id)
+        if conversation is None:
+            conversation = self._archive.read(conv_id)
+        elif 'messages' not in conversation:
+            if not self._loaded.is_set():
+                # Still being parsed; don't block the caller for a snippet
+                return ''
+            self._load_messages(conversation)
+        messages = (conversation or {}).get('messages', [])
+        if index >= len(messages):
+            return ''
+        return SearchIndex.snippet(SearchIndex.pair_text(messages[index]), terms)
+
+    def _sync_indexes(self) -> None:
+        """Bring the search indexes in line with the loaded history: index
+        conversations they are missing (everything if the full-text index was
+        stale) and drop ones that no longer exist. Runs once, in the
+        background, after loading."""
+        with self._lock:
+            rebuild = not self._search_index_fresh
+            current_ids = set(self._conversation_dict) | {stub['id'] for stub in self._archive.stubs()}
+            for conv_id in self._search_index.conversation_ids() - current_ids:
+                self._search_index.remove_conversation(conv_id)
+            if self._semantic_index:
+                for conv_id in self._semantic_index.conversation_ids() - current_ids:
+                    self._semantic_index.remove_conversation(conv_id)
+                self._semantic_index.start()
+        indexed = False
+        # One conversation per lock hold so the UI is not blocked meanwhile
+        for conv_id in current_ids:
+            with self._lock:
+                conversation = self._conversation_dict.get(conv_id)
+                needs_search = rebuild or not self._search_index.has_conversation(conv_id)
+                # In-memory pairs are cheap to re-check (unchanged ones are skipped by digest)
+                needs_semantic = self._semantic_index is not None and (
+                    not self._semantic_index.has_conversation(conv_id)
+                    or (conversation is not None and 'messages' in conversation)
+                )
+                if not needs_search and not needs_semantic:
+                    continue
+                if conversation is None:
+                    conversation = self._archive.read(conv_id)
+                elif 'messages' not in conversation:
+                    # Index a lazy conversation without keeping its messages in memory
+                    conversation = dict(conversation, messages=self._store.load_messages(conv_id))
+                if conversation is None:
+                    continue
+                if needs_search:
+                    self._search_index.index_conversation(conversation)
+                    indexed = True
+                if needs_semantic:
+                    self._semantic_index.submit_conversation(conversation)
         with self._lock:
-            return self._conversation_dict.get(conv_id)
+            self._search_index_fresh = True
+            if indexed:
+                self._search_index.save()
+
+    def find_similar_conversations(self, conv_id: str, k: int = 10) -> list[tuple[str, float]]:
+        """Conversations semantically closest to `conv_id`, as (id, similarity)
+        best first. Empty when semantic search is unavailable."""
+        if self._semantic_index is None:
+            return []
+        results = self._semantic_index.similar_conversations(conv_id, k)
+        with self._lock:
+            return [(cid, score) for cid, score in results if cid in self._conversation_dict or cid in self._archive]
+
+    def _index_conversation(self, conversation: dict) -> None:
+        self._search_index.index_conversation(conversation)
+        if self._semantic_index:
+            self._semantic_index.submit_conversation(conversation)
+
+    def _index_pair(self, conv_id: str, index: int, pair: dict) -> None:
+        self._search_index.index_pair(conv_id, index, pair)
+        if self._semantic_index and isinstance(pair, dict):
+            self._semantic_index.submit(conv_id, index, SearchIndex.pair_text(pair))
+
+    def _unindex_conversation(self, conv_id: str) -> None:
+        self._search_index.remove_conversation(conv_id)
+        if self._semantic_index:
+            self._semantic_index.remove_conversation(conv_id)
+
+    @staticmethod
+    def get_message_count(conversation: dict) -> int:
+        """Number of messages in a conversation, without loading lazy ones."""
+        if 'messages' in conversation:
+            return len(conversation['messages'])
+        return conversation.get('message_count', 0)
+
+    def _load_messages(self, conversation: dict) -> None:
+        """Fill in the messages of a conversation returned by a lazy store."""
+        conversation['messages'] = self._store.load_messages(conversation['id'])
+        conversation.pop('message_count', None)
+
+    def _promote(self, conv_id: str) -> Optional[dict]:
+        """Move an archived conversation back into the store so it can change."""
+        conversation = self._archive.read(conv_id)
+        if conversation is None:
+            return None
+        self._archive.remove(conv_id)
+        self._conversation_history.append(conversation)
+        self._conversation_dict[conv_id] = conversation
+        self._track(conversation)
+        self._persist_conversation(conversation)
+        return conversation
+
+    @staticmethod
+    def _last_activity(conversation: dict) -> Optional[datetime]:
+        """Most recent message timestamp, or the creation time for stubs."""
+        timestamps = [conversation.get('timestamp')]
+        for pair in conversation.get('messages', [])[-1:]:
+            timestamps += [(pair.get('user') or {}).get('timestamp'), (pair.get('model') or {}).get('timestamp')]
+        parsed = []
+        for timestamp in timestamps:
+            try:
+                parsed.append(datetime.fromisoformat(timestamp))
+            except (TypeError, ValueError):
+                continue
+        return max(parsed, default=None)
+
+    def archive_old_conversations(self, max_age_days: float) -> int:
+        """Move conversations idle for more than `max_age_days` into the archive.
+        Returns the number of conversations archived."""
+        self._loaded.wait()
+        cutoff = datetime.now() - timedelta(days=max_age_days)
+
+        def is_old(conv: dict) -> bool:
+            last_activity = self._last_activity(conv)
+            return last_activity is not None and last_activity < cutoff
+
+        with self._lock:
+            candidates = []
+            for conv in self._conversation_history:
+                # Stubs only carry the creation time; check their last message too
+                if not conv.get('id') or not is_old(conv):
+                    continue
+                if 'messages' not in conv:
+                    self._load_messages(conv)
+                    if not is_old(conv):
+                        continue
+                candidates.append(conv)
+            if not candidates:
+                return 0
+
+            # Blobs (and the index pointing at them) are durable before the
+            # conversations leave the store; a crash in between only leaves a
+            # duplicate that the store copy overrides.
+            try:
+                self._archive.append([(ConversationArchive.metadata(conv), self._archive.encode(conv)) for conv in candidates])
+            except Exception as e:
+                print(f"Error: Failed to archive conversations: {e}")
+                return 0
+            archived_ids = {conv['id'] for conv in candidates}
+            self._conversation_history[:] = [
+                conv for conv in self._conversation_history if conv.get('id') not in archived_ids
+            ]
+            for conv_id in archived_ids:
+                del self._conversation_dict[conv_id]
+                self._forget(conv_id)
+                self._flusher.discard(lambda key, conv_id=conv_id: len(key) > 1 and key[1] == conv_id)
+                self._persist(('del', conv_id), lambda conv_id=conv_id: partial(self._store.delete_conversation, conv_id))
+            if self._archive.dead_bytes > self._archive.live_bytes:
+                self._archive.compact()
+        return len(candidates)
 
     def add_conversation(self, conversation: dict) -> bool:
         """Add a new conversation."""
@@ -53,51 +536,158 @@ class DataManager:
             conv_id = conversation.get('id')
             if not conv_id or conv_id in self._conversation_dict:
                 return False
+            if conv_id in self._archive:
+                self._archive.remove(conv_id)
             
             self._conversation_history.append(conversation)
             self._conversation_dict[conv_id] = conversation
-            return self.save_to_disk()
+            self._index_conversation(conversation)
+            self._track(conversation)
+            self.events.publish(ConversationAdded(conv_id))
+            return self._persist_conversation(conversation)
 
     def update_conversation(self, conv_id: str, conversation: dict) -> bool:
         """Update an existing conversation."""
+        self._wait_for_messages(conv_id)
         with self._lock:
-            existing = self._conversation_dict.get(conv_id)
+            existing = self._get_mutable(conv_id)
             if not existing:
                 return False
             
             # Update in place
+            title = existing.get('title')
             existing.update(conversation)
-            return self.save_to_disk()
+            self._index_conversation(existing)
+            self._publish_messages(existing)
+            if existing.get('title') != title:
+                self.events.publish(TitleChanged(conv_id, existing.get('title')))
+            return self._persist_conversation(existing)
 
     def update_conversation_title(self, conv_id: str, title: str) -> bool:
         """Update a conversation's title."""
         with self._lock:
-            conversation = self._conversation_dict.get(conv_id)
+            conversation = self._conversation_dict.get(conv_id) or self._promote(conv_id)
             if not conversation:
                 return False
             
             conversation['title'] = title
-            return self.save_to_disk()
+            self.events.publish(TitleChanged(conv_id, title))
+            return self._persist(('title', conv_id), lambda: partial(self._store.update_title, conv_id, title))
+
+    def update_conversation_titles(self, titles: dict[str, str]) -> bool:
+        """Update the titles of several conversations ({id: title}) as one
+        write, replacing any queued title writes of those conversations."""
+        with self._lock:
+            updated = {}
+            for conv_id, title in titles.items():
+                conversation = self._conversation_dict.get(conv_id) or self._promote(conv_id)
+                if conversation:
+                    conversation['title'] = title
+                    updated[conv_id] = title
+            if not updated:
+                return False
+
+            for conv_id, title in updated.items():
+                self.events.publish(TitleChanged(conv_id, title))
+            self._flusher.discard(lambda key: key[0] == 'title' and key[1] in updated)
+            return self._persist(
+                ('titles',) + tuple(updated),
+                # Conversations deleted before the flush are left out
+                lambda: partial(self._store.update_titles, {
+                    conv_id: title for conv_id, title in updated.items() if conv_id in self._conversation_dict
+                }),
+            )
+
+    def update_conversation_summary(self, conv_id: str, summary: dict) -> bool:
+        """Store the rolling summary of a conversation ({'text', 'upto'}: pairs
+        before index `upto` are summarized)."""
+        self._wait_for_messages(conv_id)
+        with self._lock:
+            conversation = self._get_mutable(conv_id)
+            if not conversation:
+                return False
+
+            conversation['summary'] = summary
+            return self._persist_conversation(conversation)
 
     def add_message_to_conversation(self, conv_id: str, message: dict) -> bool:
         """Add a message to a conversation."""
+        self._wait_for_messages(conv_id)
         with self._lock:
-            conversation = self._conversation_dict.get(conv_id)
+            conversation = self._get_mutable(conv_id)
             if not conversation:
                 return False
             
             messages = conversation.get('messages', [])
             messages.append(message)
             conversation['messages'] = messages
-            return self.save_to_disk()
+            self._index_pair(conv_id, len(messages) - 1, message)
+            self._publish_messages(conversation, len(messages) - 1)
+            return self._persist_message(conversation, len(messages) - 1)
+
+    def save_conversation(self, conversation: dict, index: Optional[int] = None) -> bool:
+        """Insert or replace a conversation in the cache and persist it.
+
+        If `index` is given and the conversation is already stored, only the
+        message/pair at that index is written.
+        """
+        with self._lock:
+            conv_id = conversation.get('id')
+            if not conv_id:
+                return False
+
+            existing = self._conversation_dict.get(conv_id)
+            if existing is None:
+                if conv_id in self._archive:
+                    # Opened from the archive and changed: it lives in the store again
+                    self._archive.remove(conv_id)
+                self._conversation_history.append(conversation)
+                self._conversation_dict[conv_id] = conversation
+                self._index_conversation(conversation)
+                self._track(conversation)
+                self.events.publish(ConversationAdded(conv_id))
+                return self._persist_conversation(conversation)
+
+            if existing is not conversation:
+                self._conversation_dict[conv_id] = conversation
+                self._conversation_history[self._conversation_history.index(existing)] = conversation
+                self._index_conversation(conversation)
+                self._publish_messages(conversation)
+                if conversation.get('title') != existing.get('title'):
+                    self.events.publish(TitleChanged(conv_id, conversation.get('title')))
+                return self._persist_conversation(conversation)
+
+            messages = conversation.get('messages', [])
+            if index is not None and 0 <= index < len(messages):
+                self._index_pair(conv_id, index, messages[index])
+                self._publish_messages(conversation, index)
+                return self._persist_message(conversation, index)
+            self._index_conversation(conversation)
+            self._publish_messages(conversation)
+            return self._persist_conversation(conversation)
 
     def delete_conversation(self, conv_id: str) -> bool:
         """Delete a conversation."""
         with self._lock:
             conversation = self._conversation_dict.get(conv_id)
             if not conversation:
-                return False
+                if conv_id not in self._archive:
+                    return False
+                self._archive.remove(conv_id)
+                self._unindex_conversation(conv_id)
+                self.events.publish(ConversationRemoved(conv_id))
+                return True
             
             self._conversation_history.remove(conversation)
             del self._conversation_dict[conv_id]
-            return self.save_to_disk()
+            self._forget(conv_id)
+            self.events.publish(ConversationRemoved(conv_id))
+            if not self._loaded.is_set():
+                self._deleted_while_loading.add(conv_id)
+            self._flusher.discard(lambda key: len(key) > 1 and key[1] == conv_id)
+            self._unindex_conversation(conv_id)
+            return self._persist(('del', conv_id), lambda: partial(self._store.delete_conversation, conv_id))
+
+    def _get_mutable(self, conv_id: str) -> Optional[dict]:
+        """The cached conversation, promoting it from the archive if needed."""
+        return self.get_conversation_by_id(conv_id) if conv_id in self._conversation_dict else self._promote(conv_id)
@@ -0,0 +1,129 @@
+"""
+BackgroundFlusher - Write-behind queue for DataManager.
+Mutations are queued under a key; repeated mutations of the same key coalesce
+into one write, and a background thread flushes the queue once per interval.
+Only the snapshot of the data to write is taken under the DataManager lock;
+the file I/O runs outside it.
+"""
+import atexit
+import signal
+import threading
+from typing import Callable, Optional
+
+
+class BackgroundFlusher:
+    """Coalescing write queue drained by a background thread.
+
+    Queued entries are `prepare` callables that snapshot the current in-memory
+    state when the queue is flushed and return the write to perform, so a burst
+    of mutations to the same key costs a single write. Preparing runs under
+    `lock` (the DataManager lock); the writes run after it is released, in
+    submission order, and must not need it.
+    """
+
+    def __init__(self, lock: threading.RLock, interval: float = 1.0):
+        self._lock = lock
+        self._interval = interval
+        self._pending: dict[tuple, Callable[[], Callable[[], bool]]] = {}
+        self._write_lock = threading.Lock()  # Keeps flushes' writes in order
+        self._dirty = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'queued': 0, 'coalesced': 0, 'flushes': 0, 'writes': 0, 'failures': 0}
+
+    def start(self) -> None:
+        """Start the background thread and flush on interpreter exit."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop the background thread and flush whatever is still queued."""
+        self._stopped.set()
+        self._dirty.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def submit(self, key: tuple, prepare: Callable[[], Callable[[], bool]]) -> None:
+        """Queue a write. A pending write with the same key is replaced in place."""
+        with self._lock:
+            if key in self._pending:
+                self.stats['coalesced'] += 1
+            self._pending[key] = prepare
+            self.stats['queued'] += 1
+            self._dirty.set()
+
+    def discard(self, match: Callable[[tuple], bool]) -> None:
+        """Drop pending writes whose key matches (e.g. superseded by a delete)."""
+        with self._lock:
+            for key in [key for key in self._pending if match(key)]:
+                del self._pending[key]
+                self.stats['coalesced'] += 1
+
+    def is_pending(self, key: tuple) -> bool:
+        with self._lock:
+            return key in self._pending
+
+    def flush(self) -> bool:
+        """Run all queued writes now. Returns False if any of them failed."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._dirty.clear()
+            if not pending:
+                return True
+            self.stats['flushes'] += 1
+            writes = []
+            for key, prepare in pending.items():
+                try:
+                    writes.append((key, prepare()))
+                except Exception as e:
+                    print(f"Error: Failed to flush {key}: {e}")
+                    writes.append((key, None))
+            # Taken before the lock is released, so a later flush cannot
+            # overtake this one with newer snapshots
+            self._write_lock.acquire()
+        try:
+            ok = True
+            for key, write in writes:
+                self.stats['writes'] += 1
+                try:
+                    success = write is not None and write()
+                except Exception as e:
+                    print(f"Error: Failed to flush {key}: {e}")
+                    success = False
+                if not success:
+                    self.stats['failures'] += 1
+                    ok = False
+            return ok
+        finally:
+            self._write_lock.release()
+
+    def install_signal_handlers(self, signals: Optional[tuple] = None) -> None:
+        """Flush before the process is terminated by one of `signals`
+        (SIGTERM and SIGHUP by default). Must be called from the main thread."""
+        if signals is None:
+            signals = tuple(s for s in (getattr(signal, 'SIGTERM', None), getattr(signal, 'SIGHUP', None)) if s)
+        for signum in signals:
+            previous = signal.getsignal(signum)
+
+            def handler(received, frame, previous=previous):
+                self.stop()
+                if callable(previous):
+                    previous(received, frame)
+                else:
+                    raise SystemExit(128 + received)
+
+            signal.signal(signum, handler)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._dirty.wait()
+            if self._stopped.is_set():
+                break
+            # Let the burst settle so it coalesces into one write
+            self._stopped.wait(self._interval)
+            self.flush()
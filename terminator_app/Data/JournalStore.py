@@ -0,0 +1,332 @@
+"""
+JournalStore - Append-only journal storage backend.
+Each mutation appends one small record to a journal file; a background thread
+periodically compacts the journal into the JSON snapshot.
+"""
+import os
+import threading
+from typing import Optional
+try:
+    from terminator_app.Data import load
+    from terminator_app.Data.codec import Codec, dumps_json, loads_json
+    from terminator_app.Interfaces.StoreInterface import StoreInterface
+except ImportError:
+    from Data import load
+    from Data.codec import Codec, dumps_json, loads_json
+    from Interfaces.StoreInterface import StoreInterface
+
+
+class JournalStore(StoreInterface):
+    """Snapshot + append-only journal.
+
+    The snapshot is a regular history file (format picked by `Codec.for_path`),
+    so an existing `conversation_history.json` is picked up as-is. Records are idempotent (they set a
+    value rather than increment one), which makes replaying a journal prefix
+    that is already part of the snapshot harmless after a crash mid-compaction.
+    """
+
+    def __init__(self, snapshot_path: str, journal_path: str, lock: Optional[threading.RLock] = None,
+                 compact_threshold: int = 500, compact_interval: float = 300.0):
+        self._snapshot_path = snapshot_path
+        self._journal_path = journal_path
+        self._lock = lock or threading.RLock()
+        self._compact_threshold = compact_threshold
+        self._compact_interval = compact_interval
+        self._journal = None
+        self._pending_records = 0
+        self._epoch = 0  # Bumped whenever the snapshot is replaced
+        self._compact_requested = threading.Event()
+        self._closed = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+
+    def load(self) -> list[dict]:
+        """Load the snapshot, replay the journal tail and start the compactor.
+        Parsing happens outside the lock; only the swap-in holds it."""
+        conversations = load.DataLoader.load_conversation_history(self._snapshot_path)
+        if load.DataLoader.load_history_metadata(self._snapshot_path) is None:
+            load.DataLoader.save_history_metadata(self._snapshot_path, conversations)
+        index = {conv['id']: conv for conv in conversations if conv.get('id')}
+        replayed = self._replay_journal(lambda record: self._apply(conversations, index, record))
+        with self._lock:
+            self._close_journal()
+            self._pending_records = replayed
+            self._open_journal()
+            self._start_compactor()
+            return conversations
+
+    @classmethod
+    def read_history(cls, snapshot_path: str, journal_path: str) -> list[dict]:
+        """The conversations in a snapshot plus its journal, read without
+        writing to either: no metadata sidecar, no torn-tail truncation and
+        no compaction. For migrating to another store; errors are raised."""
+        source = cls(snapshot_path, journal_path)
+        conversations = source._read_snapshot()
+        index = {conv['id']: conv for conv in conversations if conv.get('id')}
+        if os.path.exists(journal_path):
+            source._replay_journal(lambda record: cls._apply(conversations, index, record),
+                                   end=os.path.getsize(journal_path))
+        return conversations
+
+    def load_metadata(self) -> Optional[list[dict]]:
+        """Conversation metadata from the snapshot sidecar plus the journal tail,
+        or None if the sidecar is missing or older than the snapshot."""
+        stubs = load.DataLoader.load_history_metadata(self._snapshot_path)
+        if stubs is None:
+            return None
+        index = {stub['id']: stub for stub in stubs if stub.get('id')}
+        self._replay_journal(lambda record: self._apply_metadata(stubs, index, record))
+        return stubs
+
+    def save_all(self, conversations: list[dict]) -> bool:
+        """Write a fresh snapshot synchronously and empty the journal."""
+        with self._lock:
+            try:
+                self._write_snapshot(Codec.for_path(self._snapshot_path).dumps(conversations))
+                load.DataLoader.save_history_metadata(self._snapshot_path, conversations)
+                self._close_journal()
+                open(self._journal_path, 'w').close()
+                self._open_journal()
+            except Exception as e:
+                print(f"Error: Failed to write conversation snapshot: {e}")
+                return False
+            self._epoch += 1
+            self._pending_records = 0
+            return True
+
+    def put_conversation(self, conversation: dict) -> bool:
+        conv_id = conversation.get('id')
+        if not conv_id:
+            return False
+        return self._append({'op': 'put', 'conv': conversation})
+
+    def put_message(self, conv_id: str, index: int, message: dict) -> bool:
+        return self._append({'op': 'msg', 'id': conv_id, 'index': index, 'message': message})
+
+    def update_title(self, conv_id: str, title: str) -> bool:
+        return self._append({'op': 'title', 'id': conv_id, 'title': title})
+
+    def delete_conversation(self, conv_id: str) -> bool:
+        return self._append({'op': 'del', 'id': conv_id})
+
+    def compact(self) -> bool:
+        """Fold the journal into the snapshot.
+
+        Only the journal position is taken under the lock. The new snapshot is
+        built from the files on disk (the current snapshot plus the journal up
+        to that position), so neither serialization nor the write holds the
+        lock and mutations keep appending to the journal meanwhile. Records
+        written after that position are carried over.
+        """
+        with self._lock:
+            if self._journal is None:
+                return False
+            self._journal.flush()
+            mark = self._journal.tell()
+            epoch = self._epoch
+
+        try:
+            conversations = self._read_snapshot()
+            index = {conv['id']: conv for conv in conversations if conv.get('id')}
+            self._replay_journal(lambda record: self._apply(conversations, index, record), end=mark)
+            data = Codec.for_path(self._snapshot_path).dumps(conversations)
+            metadata = [load.DataLoader.conversation_metadata(conv) for conv in conversations]
+        except Exception as e:
+            print(f"Error: Failed to compact conversation journal: {e}")
+            return False
+
+        tmp_path = f"{self._snapshot_path}.compact.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            print(f"Error: Failed to compact conversation journal: {e}")
+            return False
+
+        with self._lock:
+            if epoch != self._epoch or self._journal is None:
+                # save_all() or load() replaced the snapshot while we were writing
+                os.remove(tmp_path)
+                return False
+            try:
+                os.replace(tmp_path, self._snapshot_path)
+                load.DataLoader.save_history_metadata(self._snapshot_path, metadata=metadata)
+                self._truncate_journal(mark)
+            except Exception as e:
+                print(f"Error: Failed to compact conversation journal: {e}")
+                return False
+            self._epoch += 1
+            return True
+
+    def close(self) -> None:
+        """Stop the compactor, fold the journal into the snapshot and close files."""
+        self._closed.set()
+        self._compact_requested.set()
+        if self._compactor and self._compactor.is_alive():
+            self._compactor.join()
+        if self._pending_records:
+            self.compact()
+        with self._lock:
+            self._close_journal()
+
+    # --- Journal helpers ---
+
+    def _append(self, record: dict) -> bool:
+        """Append one record to the journal. Cost is proportional to the record only."""
+        with self._lock:
+            if self._journal is None:
+                return False
+            try:
+                self._journal.write(dumps_json(record) + b'\n')
+                self._journal.flush()
+            except Exception as e:
+                print(f"Error: Failed to append to conversation journal: {e}")
+                return False
+            self._pending_records += 1
+            if self._pending_records >= self._compact_threshold:
+                self._compact_requested.set()
+            return True
+
+    def _replay_journal(self, apply, end: Optional[int] = None) -> int:
+        """Feed journal records to `apply`. Returns the number replayed.
+        With `end`, only the records before that offset are read (the journal
+        may be growing) and a torn tail is left alone."""
+        if not os.path.exists(self._journal_path):
+            return 0
+        replayed = 0
+        good_offset = 0
+        with open(self._journal_path, 'rb') as f:
+            for raw in f:
+                if end is not None and good_offset >= end:
+                    break
+                try:
+                    if not raw.endswith(b'\n'):
+                        raise ValueError("incomplete record")
+                    record = loads_json(raw)
+                except ValueError:
+                    # Torn write from a crash: drop it and everything after it
+                    break
+                apply(record)
+                good_offset += len(raw)
+                replayed += 1
+        if end is None and good_offset != os.path.getsize(self._journal_path):
+            with open(self._journal_path, 'r+b') as f:
+                f.truncate(good_offset)
+        return replayed
+
+    @staticmethod
+    def _apply(conversations: list[dict], index: dict[str, dict], record: dict) -> None:
+        """Apply a single journal record to a loaded history."""
+        op = record.get('op')
+        if op == 'put':
+            conv = record.get('conv') or {}
+            conv_id = conv.get('id')
+            existing = index.get(conv_id)
+            if existing is not None:
+                conversations[conversations.index(existing)] = conv
+            else:
+                conversations.append(conv)
+            index[conv_id] = conv
+            return
+
+        conv = index.get(record.get('id'))
+        if conv is None:
+            return
+        if op == 'msg':
+            messages = conv.setdefault('messages', [])
+            position = record.get('index', len(messages))
+            if position < len(messages):
+                messages[position] = record.get('message')
+            elif position == len(messages):
+                messages.append(record.get('message'))
+        elif op == 'title':
+            conv['title'] = record.get('title')
+        elif op == 'del':
+            conversations.remove(conv)
+            del index[record.get('id')]
+
+    @staticmethod
+    def _apply_metadata(stubs: list[dict], index: dict[str, dict], record: dict) -> None:
+        """Apply a single journal record to conversation metadata only."""
+        op = record.get('op')
+        if op == 'put':
+            stub = load.DataLoader.conversation_metadata(record.get('conv') or {})
+            existing = index.get(stub.get('id'))
+            if existing is not None:
+                stubs[stubs.index(existing)] = stub
+            else:
+                stubs.append(stub)
+            index[stub.get('id')] = stub
+            return
+
+        stub = index.get(record.get('id'))
+        if stub is None:
+            return
+        if op == 'msg':
+            stub['message_count'] = max(stub.get('message_count', 0), record.get('index', 0) + 1)
+        elif op == 'title':
+            stub['title'] = record.get('title')
+        elif op == 'del':
+            stubs.remove(stub)
+            del index[record.get('id')]
+
+    def _truncate_journal(self, mark: int) -> None:
+        """Drop the first `mark` bytes of the journal, keeping the tail."""
+        self._journal.flush()
+        with open(self._journal_path, 'rb') as f:
+            f.seek(mark)
+            tail = f.read()
+        tmp_path = f"{self._journal_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(tail)
+        self._close_journal()
+        os.replace(tmp_path, self._journal_path)
+        self._open_journal()
+        self._pending_records = tail.count(b'\n')
+
+    def _read_snapshot(self) -> list[dict]:
+        """The conversations in the snapshot file. Unlike DataLoader, errors
+        are raised: compacting over an unreadable snapshot would lose it."""
+        if not os.path.exists(self._snapshot_path):
+            return []
+        with open(self._snapshot_path, 'rb') as f:
+            data = f.read()
+        return Codec.loads(data) if data.strip() else []
+
+    def _write_snapshot(self, data: bytes) -> None:
+        tmp_path = f"{self._snapshot_path}.tmp"
+        os.makedirs(os.path.dirname(self._snapshot_path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._snapshot_path)
+
+    def _open_journal(self) -> None:
+        os.makedirs(os.path.dirname(self._journal_path), exist_ok=True)
+        self._journal = open(self._journal_path, 'ab')
+
+    def _close_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    # --- Background compaction ---
+
+    def _start_compactor(self) -> None:
+        if self._compactor and self._compactor.is_alive():
+            return
+        self._closed.clear()
+        self._compactor = threading.Thread(target=self._compaction_loop, daemon=True)
+        self._compactor.start()
+
+    def _compaction_loop(self) -> None:
+        """Compact when the threshold is hit, or periodically if anything is pending."""
+        while not self._closed.is_set():
+            self._compact_requested.wait(self._compact_interval)
+            self._compact_requested.clear()
+            if self._closed.is_set():
+                break
+            if self._pending_records:
+                self.compact()
@@ -0,0 +1,49 @@
+"""
+JsonStore - Legacy storage backend.
+Keeps the whole history in a single JSON file and rewrites it on every change.
+"""
+try:
+    from terminator_app.Data import load
+    from terminator_app.Interfaces.StoreInterface import StoreInterface
+except ImportError:
+    from Data import load
+    from Interfaces.StoreInterface import StoreInterface
+
+
+class JsonStore(StoreInterface):
+    """Whole-file JSON store. Every mutation re-serializes the full history."""
+
+    rewrites_all = True
+
+    def __init__(self, history_path: str):
+        self._history_path = history_path
+        self._conversations: list[dict] = []
+
+    def load(self) -> list[dict]:
+        conversations = load.DataLoader.load_conversation_history(self._history_path)
+        if load.DataLoader.load_history_metadata(self._history_path) is None:
+            load.DataLoader.save_history_metadata(self._history_path, conversations)
+        self._conversations = conversations
+        return self._conversations
+
+    def load_metadata(self) -> list[dict] | None:
+        return load.DataLoader.load_history_metadata(self._history_path)
+
+    def save_all(self, conversations: list[dict]) -> bool:
+        self._conversations = conversations
+        if not load.DataLoader.save_conversation_history(self._history_path, conversations):
+            return False
+        load.DataLoader.save_history_metadata(self._history_path, conversations)
+        return True
+
+    def put_conversation(self, conversation: dict) -> bool:
+        return self.save_all(self._conversations)
+
+    def put_message(self, conv_id: str, index: int, message: dict) -> bool:
+        return self.save_all(self._conversations)
+
+    def update_title(self, conv_id: str, title: str) -> bool:
+        return self.save_all(self._conversations)
+
+    def delete_conversation(self, conv_id: str) -> bool:
+        return self.save_all(self._conversations)
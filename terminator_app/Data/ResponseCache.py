@@ -0,0 +1,134 @@
+"""
+ResponseCache - Persistent cache of static model generations.
+One file per response, named by the hash of everything that determines the
+answer (backend, model, prompt, generation parameters), so a repeated prompt
+such as a title request is answered without calling the model.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+try:
+    from terminator_app.Data.codec import dumps_json, loads_json
+except ImportError:
+    from Data.codec import dumps_json, loads_json
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache with TTL expiry and a size-bounded LRU.
+
+    Entries older than `ttl` seconds are treated as missing and removed. When
+    the files exceed `max_bytes`, the least recently used are deleted. Recency
+    survives restarts through the file modification time, which a hit updates.
+    """
+
+    SUFFIX = ".json"
+
+    def __init__(self, cache_dir: str, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self._dir = cache_dir
+        self.ttl = ttl  # None/0 = never expire
+        self.max_bytes = max_bytes  # None/0 = unbounded
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()  # key -> size, least recently used first
+        self._bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        self._scan()
+
+    @staticmethod
+    def make_key(backend: str, model: Optional[str], prompt: str, params: Optional[dict] = None) -> str:
+        """Hash of a request. `params` must be JSON-serializable."""
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        material = dumps_json({'backend': backend, 'model': model, 'prompt': prompt_hash, 'params': params or {}})
+        return hashlib.sha256(material).hexdigest()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def get(self, key: str) -> Optional[str]:
+        """The cached response, or None on a miss or expired entry."""
+        with self._lock:
+            if key not in self._entries:
+                self.stats['misses'] += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    entry = loads_json(f.read())
+            except (OSError, ValueError):
+                self._drop(key)
+                self.stats['misses'] += 1
+                return None
+            if self.ttl and time.time() - entry.get('created', 0) > self.ttl:
+                self._drop(key)
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self.stats['hits'] += 1
+            return entry.get('response')
+
+    def put(self, key: str, response: str) -> bool:
+        data = dumps_json({'created': time.time(), 'response': response})
+        with self._lock:
+            try:
+                os.makedirs(self._dir, exist_ok=True)
+                tmp_path = f"{self._path(key)}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, self._path(key))
+            except OSError as e:
+                print(f"Error: Failed to write response cache: {e}")
+                return False
+            self._bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._bytes += len(data)
+            self._evict()
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    # --- Helpers ---
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._dir, key + self.SUFFIX)
+
+    def _scan(self) -> None:
+        """Rebuild the LRU order from the files on disk."""
+        try:
+            names = [name for name in os.listdir(self._dir) if name.endswith(self.SUFFIX)]
+        except OSError:
+            return
+        files = []
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(self._dir, name))
+            except OSError:
+                continue
+            files.append((stat.st_mtime, name[:-len(self.SUFFIX)], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self.max_bytes and self._bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+            self.stats['evictions'] += 1
+
+    def _drop(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
@@ -0,0 +1,239 @@
+"""
+SQLiteStore - Row-based storage backend.
+Keeps conversations and their user/model pairs as rows in a local SQLite
+database, so reads and writes only touch the rows involved.
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Optional
+try:
+    from terminator_app.Data.JournalStore import JournalStore
+    from terminator_app.Interfaces.StoreInterface import StoreInterface
+except ImportError:
+    from Data.JournalStore import JournalStore
+    from Interfaces.StoreInterface import StoreInterface
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    timestamp TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS messages (
+    conv_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    timestamp TEXT,
+    body TEXT NOT NULL,
+    PRIMARY KEY (conv_id, idx)  -- Doubles as the index on conversation id
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations(timestamp);
+CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(timestamp);
+"""
+
+# Conversation keys that get their own column (or table) instead of `extra`
+_COLUMN_KEYS = ('id', 'title', 'timestamp', 'messages', 'message_count')
+
+
+class SQLiteStore(StoreInterface):
+    """SQLite row store. Conversations are loaded lazily: `load()` only reads
+    the conversations table and messages are fetched per conversation."""
+
+    def __init__(self, db_path: str, lock: Optional[threading.RLock] = None):
+        self._db_path = db_path
+        self._lock = lock or threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def load(self) -> list[dict]:
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT c.id, c.title, c.timestamp, c.extra, "
+                "(SELECT COUNT(*) FROM messages m WHERE m.conv_id = c.id) "
+                "FROM conversations c ORDER BY c.rowid"
+            ).fetchall()
+            conversations = []
+            for conv_id, title, timestamp, extra, message_count in rows:
+                conv = json.loads(extra)
+                conv.update({'id': conv_id, 'title': title, 'timestamp': timestamp, 'message_count': message_count})
+                conversations.append(conv)
+            return conversations
+
+    def load_messages(self, conv_id: str) -> list[dict]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT body FROM messages WHERE conv_id = ? ORDER BY idx", (conv_id,)
+            ).fetchall()
+            return [json.loads(body) for (body,) in rows]
+
+    def save_all(self, conversations: list[dict]) -> bool:
+        """Replace the stored conversations. Messages of conversations that were
+        never loaded into memory are left untouched."""
+        with self._lock:
+            try:
+                conn = self._connect()
+                with conn:
+                    keep = [conv['id'] for conv in conversations if conv.get('id')]
+                    conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (id TEXT PRIMARY KEY)")
+                    conn.execute("DELETE FROM keep_ids")
+                    conn.executemany("INSERT OR IGNORE INTO keep_ids VALUES (?)", [(i,) for i in keep])
+                    conn.execute("DELETE FROM messages WHERE conv_id NOT IN (SELECT id FROM keep_ids)")
+                    conn.execute("DELETE FROM conversations WHERE id NOT IN (SELECT id FROM keep_ids)")
+                    for conv in conversations:
+                        if conv.get('id'):
+                            self._write_conversation(conn, conv)
+                return True
+            except sqlite3.Error as e:
+                print(f"Error: Failed to save conversations to SQLite: {e}")
+                return False
+
+    def put_conversation(self, conversation: dict) -> bool:
+        if not conversation.get('id'):
+            return False
+        with self._lock:
+            try:
+                conn = self._connect()
+                with conn:
+                    self._write_conversation(conn, conversation)
+                return True
+            except sqlite3.Error as e:
+                print(f"Error: Failed to save conversation to SQLite: {e}")
+                return False
+
+    def put_message(self, conv_id: str, index: int, message: dict) -> bool:
+        with self._lock:
+            try:
+                conn = self._connect()
+                with conn:
+                    self._write_message(conn, conv_id, index, message)
+                return True
+            except sqlite3.Error as e:
+                print(f"Error: Failed to save message to SQLite: {e}")
+                return False
+
+    def update_title(self, conv_id: str, title: str) -> bool:
+        with self._lock:
+            try:
+                conn = self._connect()
+                with conn:
+                    conn.execute("UPDATE conversations SET title = ? WHERE id = ?", (title, conv_id))
+                return True
+            except sqlite3.Error as e:
+                print(f"Error: Failed to update title in SQLite: {e}")
+                return False
+
+    def update_titles(self, titles: dict[str, str]) -> bool:
+        with self._lock:
+            try:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        "UPDATE conversations SET title = ? WHERE id = ?",
+                        [(title, conv_id) for conv_id, title in titles.items()],
+                    )
+                return True
+            except sqlite3.Error as e:
+                print(f"Error: Failed to update titles in SQLite: {e}")
+                return False
+
+    def delete_conversation(self, conv_id: str) -> bool:
+        with self._lock:
+            try:
+                conn = self._connect()
+                with conn:
+                    conn.execute("DELETE FROM messages WHERE conv_id = ?", (conv_id,))
+                    conn.execute("DELETE FROM conversations WHERE id = ?", (conv_id,))
+                return True
+            except sqlite3.Error as e:
+                print(f"Error: Failed to delete conversation from SQLite: {e}")
+                return False
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Migration ---
+
+    def migrate_from_json(self, history_path: str, journal_path: Optional[str] = None) -> int:
+        """One-shot import of a legacy JSON history (plus its journal tail, if any).
+
+        Only runs once per database; the source files are left in place.
+        Returns the number of conversations imported.
+        """
+        with self._lock:
+            conn = self._connect()
+            if conn.execute("SELECT value FROM meta WHERE key = 'migrated_from_json'").fetchone():
+                return 0
+            imported = 0
+            if os.path.exists(history_path):
+                try:
+                    conversations = JournalStore.read_history(history_path, journal_path or f"{history_path}.journal")
+                except Exception as e:
+                    # Not marked as migrated, so it is tried again on the next start
+                    print(f"Error: Failed to read conversation history for migration: {e}")
+                    return 0
+                existing = {row[0] for row in conn.execute("SELECT id FROM conversations")}
+                new = [conv for conv in conversations if conv.get('id') and conv['id'] not in existing]
+                with conn:
+                    for conv in new:
+                        self._write_conversation(conn, conv)
+                imported = len(new)
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated_from_json', ?)", (history_path,))
+            return imported
+
+    # --- Helpers ---
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self._db_path), exist_ok=True)
+            # Access is serialized by self._lock, so the connection can be shared across threads
+            self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def _write_conversation(self, conn: sqlite3.Connection, conv: dict) -> None:
+        """Upsert the conversation row and, if its messages are loaded, its message rows."""
+        extra = {k: v for k, v in conv.items() if k not in _COLUMN_KEYS}
+        conn.execute(
+            "INSERT INTO conversations (id, title, timestamp, extra) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET title = excluded.title, "
+            "timestamp = excluded.timestamp, extra = excluded.extra",
+            (conv['id'], conv.get('title'), conv.get('timestamp'), json.dumps(extra)),
+        )
+        if 'messages' not in conv:
+            return
+        messages = conv['messages']
+        conn.execute("DELETE FROM messages WHERE conv_id = ? AND idx >= ?", (conv['id'], len(messages)))
+        for index, message in enumerate(messages):
+            self._write_message(conn, conv['id'], index, message)
+
+    def _write_message(self, conn: sqlite3.Connection, conv_id: str, index: int, message: dict) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO messages (conv_id, idx, timestamp, body) VALUES (?, ?, ?, ?)",
+            (conv_id, index, _message_timestamp(message), json.dumps(message)),
+        )
+
+
+def _message_timestamp(message: dict) -> Optional[str]:
+    """Timestamp of a message or user/model pair (the user side for pairs)."""
+    if not isinstance(message, dict):
+        return None
+    if 'timestamp' in message:
+        return message.get('timestamp')
+    for side in ('user', 'model'):
+        part = message.get(side)
+        if isinstance(part, dict) and part.get('timestamp'):
+            return part['timestamp']
+    return None
@@ -0,0 +1,234 @@
+"""
+SearchIndex - Incremental full-text index over conversation messages.
+An inverted index from token to the conversation pairs containing it, kept
+up to date by DataManager on every mutation and persisted next to the history.
+"""
+import bisect
+import os
+import re
+from typing import Optional
+try:
+    from terminator_app.Data.codec import Codec
+except ImportError:
+    from Data.codec import Codec
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Shorter trailing terms match whole tokens only; prefixes like "a" expand to too much
+MIN_PREFIX = 2
+
+
+class SearchIndex:
+    """Inverted index: token -> conversation id -> pair indices.
+
+    Only user/model pairs are indexed (the greeting at index 0 is skipped).
+    The tokens of every indexed pair are kept so a pair can be re-indexed
+    without its old text. Callers serialize access (DataManager's lock).
+
+    Persistence: `save()` writes the index; the first change after a save
+    creates a `<path>.dirty` marker, so a crash before the next save is
+    detected on load and the index is rebuilt instead of trusted.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._dirty_path = f"{path}.dirty"
+        self._postings: dict[str, dict[str, set[int]]] = {}
+        self._docs: dict[str, dict[int, frozenset[str]]] = {}
+        self._vocabulary: list[str] = []
+        self._vocabulary_stale = False
+        self._dirty = False
+
+    # --- Tokenizing ---
+
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        return TOKEN_PATTERN.findall(text.lower())
+
+    @staticmethod
+    def pair_text(pair: dict) -> str:
+        """User and model text of a message pair."""
+        texts = []
+        for role in ('user', 'model'):
+            message = pair.get(role) or {}
+            texts.extend(part.get('text', '') for part in message.get('parts', []) if isinstance(part, dict))
+        return '\n'.join(text for text in texts if text)
+
+    @staticmethod
+    def snippet(text: str, terms: list[str], width: int = 80) -> str:
+        """A window of `text` around the first occurrence of any of `terms`."""
+        lowered = text.lower()
+        positions = [pos for pos in (lowered.find(term) for term in terms) if pos >= 0]
+        start = max(0, min(positions, default=0) - width // 4)
+        snippet = ' '.join(text[start:start + width].split())
+        if start > 0:
+            snippet = '…' + snippet
+        if start + width < len(text):
+            snippet += '…'
+        return snippet
+
+    # --- Maintenance ---
+
+    def has_conversation(self, conv_id: str) -> bool:
+        return conv_id in self._docs
+
+    def conversation_ids(self) -> set[str]:
+        return set(self._docs)
+
+    def index_pair(self, conv_id: str, index: int, pair: dict) -> None:
+        """(Re)index one message pair."""
+        if index == 0 or not isinstance(pair, dict):
+            return
+        tokens = frozenset(self.tokenize(self.pair_text(pair)))
+        docs = self._docs.setdefault(conv_id, {})
+        old_tokens = docs.get(index, frozenset())
+        if tokens == old_tokens and index in docs:
+            return
+        for token in old_tokens - tokens:
+            self._remove_posting(token, conv_id, index)
+        for token in tokens - old_tokens:
+            self._add_posting(token, conv_id, index)
+        docs[index] = tokens
+        self._mark_dirty()
+
+    def index_conversation(self, conversation: dict) -> None:
+        """(Re)index every pair of a conversation, dropping pairs that no longer exist."""
+        conv_id = conversation.get('id')
+        if not conv_id:
+            return
+        messages = conversation.get('messages', [])
+        for index in [i for i in self._docs.get(conv_id, {}) if i >= len(messages)]:
+            self._remove_pair(conv_id, index)
+        self._docs.setdefault(conv_id, {})
+        for index, pair in enumerate(messages):
+            self.index_pair(conv_id, index, pair)
+        self._mark_dirty()
+
+    def remove_conversation(self, conv_id: str) -> None:
+        for index in list(self._docs.get(conv_id, {})):
+            self._remove_pair(conv_id, index)
+        if self._docs.pop(conv_id, None) is not None:
+            self._mark_dirty()
+
+    # --- Querying ---
+
+    def search(self, query: str) -> dict[str, list[int]]:
+        """Pairs containing every query term, as conversation id -> sorted pair
+        indices. The last term also matches as a prefix (search as you type)
+        once it is at least MIN_PREFIX characters long."""
+        terms = self.tokenize(query)
+        if not terms:
+            return {}
+        prefix = terms.pop() if len(terms[-1]) >= MIN_PREFIX else None
+
+        hits: Optional[dict[str, set[int]]] = None
+        for postings in sorted((self._postings.get(term, {}) for term in terms), key=len):
+            hits = self._intersect(hits, postings)
+            if not hits:
+                return {}
+        if prefix is not None:
+            hits = self._intersect(hits, self._prefix_postings(prefix, hits))
+        return {conv_id: sorted(indices) for conv_id, indices in (hits or {}).items()}
+
+    @staticmethod
+    def _intersect(hits: Optional[dict[str, set[int]]], postings: dict[str, set[int]]) -> dict[str, set[int]]:
+        if hits is None:
+            return {conv_id: set(indices) for conv_id, indices in postings.items()}
+        intersected = {}
+        for conv_id, indices in hits.items():
+            common = indices & postings[conv_id] if conv_id in postings else None
+            if common:
+                intersected[conv_id] = common
+        return intersected
+
+    def _prefix_postings(self, prefix: str, within: Optional[dict[str, set[int]]] = None) -> dict[str, set[int]]:
+        """Union of the postings of every token starting with `prefix`,
+        restricted to the conversations in `within` when given."""
+        if self._vocabulary_stale:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_stale = False
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + '\U0010ffff', lo=start)
+        if end - start == 1 and within is None:
+            return self._postings.get(self._vocabulary[start], {})
+        merged: dict[str, set[int]] = {}
+        for token in self._vocabulary[start:end]:
+            postings = self._postings.get(token, {})
+            conv_ids = postings.keys() if within is None else postings.keys() & within.keys()
+            for conv_id in conv_ids:
+                merged.setdefault(conv_id, set()).update(postings[conv_id])
+        return merged
+
+    # --- Persistence ---
+
+    def load(self) -> bool:
+        """Load the persisted index. Returns False if it is missing or may be
+        stale (the process died with unsaved changes); the index is then empty."""
+        if os.path.exists(self._dirty_path):
+            return False
+        try:
+            with open(self._path, 'rb') as f:
+                data = Codec.loads(f.read())
+        except Exception:
+            return False
+        self._postings, self._docs = {}, {}
+        for conv_id, pairs in data.get('docs', {}).items():
+            docs = self._docs.setdefault(conv_id, {})
+            for index, tokens in pairs.items():
+                docs[int(index)] = frozenset(tokens)
+                for token in tokens:
+                    self._postings.setdefault(token, {}).setdefault(conv_id, set()).add(int(index))
+        self._vocabulary_stale = True
+        return True
+
+    def save(self) -> bool:
+        """Write the index and clear the dirty marker."""
+        try:
+            data = {'docs': {
+                conv_id: {str(index): sorted(tokens) for index, tokens in pairs.items()}
+                for conv_id, pairs in self._docs.items()
+            }}
+            tmp_path = f"{self._path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(Codec.for_path(self._path).dumps(data))
+            os.replace(tmp_path, self._path)
+            if os.path.exists(self._dirty_path):
+                os.remove(self._dirty_path)
+            self._dirty = False
+            return True
+        except Exception as e:
+            print(f"Error: Failed to save search index: {e}")
+            return False
+
+    # --- Helpers ---
+
+    def _mark_dirty(self) -> None:
+        if self._dirty:
+            return
+        self._dirty = True
+        try:
+            with open(self._dirty_path, 'wb'):
+                pass
+        except OSError:
+            pass
+
+    def _add_posting(self, token: str, conv_id: str, index: int) -> None:
+        postings = self._postings.get(token)
+        if postings is None:
+            postings = self._postings[token] = {}
+            self._vocabulary_stale = True
+        postings.setdefault(conv_id, set()).add(index)
+
+    def _remove_posting(self, token: str, conv_id: str, index: int) -> None:
+        postings = self._postings.get(token)
+        if not postings or conv_id not in postings:
+            return
+        postings[conv_id].discard(index)
+        if not postings[conv_id]:
+            del postings[conv_id]
+            if not postings:
+                del self._postings[token]
+                self._vocabulary_stale = True
+
+    def _remove_pair(self, conv_id: str, index: int) -> None:
+        for token in self._docs.get(conv_id, {}).pop(index, frozenset()):
+            self._remove_posting(token, conv_id, index)
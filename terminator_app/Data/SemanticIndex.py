@@ -0,0 +1,340 @@
+"""
+SemanticIndex - Embedding index for "find similar conversations".
+Every user/model pair is embedded into one row of a contiguous matrix, so a
+similarity query is a single matrix-vector product. Embedding runs on a
+background thread, only for pairs that are new or whose text changed.
+"""
+import importlib
+import json
+import os
+import threading
+import zlib
+from typing import Callable, Optional
+try:
+    from terminator_app.Data.SearchIndex import SearchIndex
+except ImportError:
+    from Data.SearchIndex import SearchIndex
+
+# NumPy is optional; without it semantic search is disabled
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EmbeddingFunction = Callable[[list[str]], "np.ndarray"]
+
+
+class HashingEmbedder:
+    """Feature-hashing embedding of word unigrams and bigrams.
+    Needs no model download; similar wording gives similar vectors."""
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def __call__(self, texts: list[str]) -> "np.ndarray":
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = SearchIndex.tokenize(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            if not features:
+                continue
+            # crc32 is stable across runs, unlike hash()
+            hashes = np.fromiter((zlib.crc32(f.encode('utf-8')) for f in features), dtype=np.uint32, count=len(features))
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[row], hashes % self.dim, signs)
+        # Dampen repeated terms
+        return np.sign(vectors) * np.log1p(np.abs(vectors))
+
+
+def load_embedding_function(spec: str) -> EmbeddingFunction:
+    """"hashing" or "package.module:function" (called with a list of texts,
+    returning an (n, dim) array)."""
+    if spec == "hashing":
+        return HashingEmbedder()
+    module_name, _, attr = spec.partition(':')
+    embed = getattr(importlib.import_module(module_name), attr)
+    if not getattr(embed, 'name', None):
+        try:
+            embed.name = spec
+        except AttributeError:
+            pass
+    return embed
+
+
+class SemanticIndex:
+    """Pair embeddings in one row-normalized matrix, keyed by (conv id, pair index).
+
+    Rows are appended with capacity doubling and removed by moving the last
+    row into the hole, so the matrix stays contiguous. `submit()` queues a
+    pair's text; the worker thread skips texts whose digest is unchanged and
+    embeds the rest in batches.
+    """
+
+    BATCH_SIZE = 64
+
+    def __init__(self, path: str, embed: Optional[EmbeddingFunction] = None, float16: bool = False):
+        self._path = path
+        self._meta_path = f"{os.path.splitext(path)[0]}.json"
+        self._embed = embed or HashingEmbedder()
+        self._dtype = np.float16 if float16 else np.float32
+        self._lock = threading.RLock()
+        self._vectors = None
+        self._size = 0
+        self._keys: list[tuple[str, int]] = []
+        self._rows: dict[tuple[str, int], int] = {}
+        self._conv_pairs: dict[str, set[int]] = {}
+        # Row -> conversation code, for grouping scores per conversation
+        self._codes = np.zeros(0, dtype=np.int32) if np is not None else None
+        self._conv_codes: dict[str, int] = {}
+        self._code_ids: list[str] = []
+        self._digests: dict[tuple[str, int], int] = {}
+        self._pending: dict[tuple[str, int], str] = {}
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._dirty = False
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    # --- Maintenance ---
+
+    def submit(self, conv_id: str, index: int, text: str) -> None:
+        """Queue a pair for embedding unless its text is unchanged."""
+        if index == 0:
+            return
+        key = (conv_id, index)
+        with self._lock:
+            if self._digests.get(key) == self._digest(text) and key in self._rows:
+                self._pending.pop(key, None)
+                return
+            self._pending[key] = text
+            self._wakeup.set()
+
+    def submit_conversation(self, conversation: dict) -> None:
+        conv_id = conversation['id']
+        messages = conversation.get('messages', [])
+        with self._lock:
+            for index in [i for i in self._conv_pairs.get(conv_id, ()) if i >= len(messages)]:
+                self._remove_row((conv_id, index))
+            for index, pair in enumerate(messages):
+                if isinstance(pair, dict):
+                    self.submit(conv_id, index, SearchIndex.pair_text(pair))
+
+    def remove_conversation(self, conv_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._pending if key[0] == conv_id]:
+                del self._pending[key]
+            for index in list(self._conv_pairs.get(conv_id, ())):
+                self._remove_row((conv_id, index))
+
+    def has_conversation(self, conv_id: str) -> bool:
+        with self._lock:
+            return bool(self._conv_pairs.get(conv_id))
+
+    def conversation_ids(self) -> set[str]:
+        with self._lock:
+            return {conv_id for conv_id, pairs in self._conv_pairs.items() if pairs}
+
+    # --- Querying ---
+
+    def similar_conversations(self, conv_id: str, k: int = 10) -> list[tuple[str, float]]:
+        """Conversations most similar to `conv_id` (mean of its pair vectors),
+        as (conv id, cosine similarity) sorted best first."""
+        with self._lock:
+            rows = [self._rows[(conv_id, index)] for index in self._conv_pairs.get(conv_id, ())]
+            if not rows:
+                return []
+            query = self._vectors[rows].astype(np.float32).mean(axis=0)
+            return self._top_k(query, k, exclude=conv_id)
+
+    def similar_to_text(self, text: str, k: int = 10) -> list[tuple[str, float]]:
+        query = np.asarray(self._embed([text]), dtype=np.float32)[0]
+        with self._lock:
+            return self._top_k(query, k)
+
+    def _top_k(self, query: "np.ndarray", k: int, exclude: Optional[str] = None) -> list[tuple[str, float]]:
+        """Best pair score per conversation, top `k` conversations."""
+        norm = np.linalg.norm(query)
+        if self._size == 0 or norm == 0:
+            return []
+        query = (query / norm).astype(np.float32)
+        if self._dtype == np.float32:
+            scores = self._vectors[:self._size] @ query
+        else:
+            # float16 has no BLAS path; upcast in chunks to bound the temporary
+            scores = np.concatenate([
+                self._vectors[start:min(start + 65536, self._size)].astype(np.float32) @ query
+                for start in range(0, self._size, 65536)
+            ])
+        # Keep each conversation's best pair
+        best = np.full(len(self._code_ids), -np.inf, dtype=np.float32)
+        np.maximum.at(best, self._codes[:self._size], scores)
+        if exclude in self._conv_codes:
+            best[self._conv_codes[exclude]] = -np.inf
+        k = min(k, int(np.isfinite(best).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-best, k - 1)[:k]
+        top = top[np.argsort(-best[top])]
+        return [(self._code_ids[i], float(best[i])) for i in top]
+
+    # --- Worker ---
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait()
+            if self._stopped.is_set():
+                break
+            with self._lock:
+                batch = list(self._pending.items())[:self.BATCH_SIZE]
+                if len(batch) == len(self._pending):
+                    self._wakeup.clear()
+            if not batch:
+                continue
+            try:
+                vectors = np.asarray(self._embed([text for _, text in batch]), dtype=np.float32)
+            except Exception as e:
+                print(f"Error: Failed to compute embeddings: {e}")
+                with self._lock:
+                    for key, text in batch:
+                        if self._pending.get(key) is text:
+                            del self._pending[key]
+                continue
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+            with self._lock:
+                for (key, text), vector in zip(batch, vectors):
+                    # Skip pairs changed or removed while embedding
+                    if self._pending.get(key) is not text:
+                        continue
+                    del self._pending[key]
+                    try:
+                        self._set_row(key, vector)
+                    except Exception as e:
+                        # One bad row must not stop indexing for the session
+                        print(f"Error: Failed to store embedding for {key}: {e}")
+                        continue
+                    self._digests[key] = self._digest(text)
+
+    # --- Persistence ---
+
+    def load(self) -> bool:
+        """Load saved embeddings. Returns False if missing or made with a
+        different embedding function; the index is then empty."""
+        try:
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            if meta.get('embedding') != getattr(self._embed, 'name', None):
+                return False
+            vectors = np.load(self._path)
+        except Exception:
+            return False
+        keys = [(conv_id, index) for conv_id, index in meta['keys']]
+        with self._lock:
+            self._vectors = np.ascontiguousarray(vectors, dtype=self._dtype)
+            self._size = len(keys)
+            self._keys = keys
+            self._rows = {key: row for row, key in enumerate(keys)}
+            self._digests = {key: digest for key, digest in zip(keys, meta['digests'])}
+            self._conv_pairs, self._conv_codes, self._code_ids = {}, {}, []
+            self._codes = np.zeros(len(self._vectors), dtype=np.int32)
+            for row, (conv_id, index) in enumerate(keys):
+                self._conv_pairs.setdefault(conv_id, set()).add(index)
+                self._codes[row] = self._conv_code(conv_id)
+        return True
+
+    def save(self) -> bool:
+        with self._lock:
+            if not self._dirty:
+                return True
+            try:
+                tmp_path = f"{self._path}.tmp.npy"
+                vectors = self._vectors[:self._size] if self._vectors is not None else np.zeros((0, 0), dtype=self._dtype)
+                np.save(tmp_path, vectors)
+                os.replace(tmp_path, self._path)
+                meta = {
+                    'embedding': getattr(self._embed, 'name', None),
+                    'keys': [list(key) for key in self._keys],
+                    'digests': [self._digests.get(key) for key in self._keys],
+                }
+                with open(f"{self._meta_path}.tmp", 'w') as f:
+                    json.dump(meta, f)
+                os.replace(f"{self._meta_path}.tmp", self._meta_path)
+                self._dirty = False
+                return True
+            except Exception as e:
+                print(f"Error: Failed to save semantic index: {e}")
+                return False
+
+    # --- Helpers ---
+
+    def _conv_code(self, conv_id: str) -> int:
+        code = self._conv_codes.get(conv_id)
+        if code is None:
+            code = self._conv_codes[conv_id] = len(self._code_ids)
+            self._code_ids.append(conv_id)
+        return code
+
+    @staticmethod
+    def _digest(text: str) -> int:
+        return zlib.crc32(text.encode('utf-8'))
+
+    def _set_row(self, key: tuple[str, int], vector: "np.ndarray") -> None:
+        row = self._rows.get(key)
+        if row is None:
+            if self._vectors is None or (self._size == 0 and self._vectors.shape[1] != len(vector)):
+                # No matrix yet, or an empty one saved without a width
+                self._vectors = np.zeros((self.BATCH_SIZE, len(vector)), dtype=self._dtype)
+            elif self._size == len(self._vectors):
+                # An empty matrix loaded from disk has no rows to double
+                grown = np.zeros((max(self.BATCH_SIZE, 2 * len(self._vectors)), self._vectors.shape[1]), dtype=self._dtype)
+                grown[:self._size] = self._vectors[:self._size]
+                self._vectors = grown
+            if len(self._codes) < len(self._vectors):
+                self._codes = np.resize(self._codes, len(self._vectors))
+            row = self._size
+            # Write the vector first, so a failed write leaves no row behind
+            self._vectors[row] = vector
+            self._size += 1
+            self._keys.append(key)
+            self._rows[key] = row
+            self._conv_pairs.setdefault(key[0], set()).add(key[1])
+            self._codes[row] = self._conv_code(key[0])
+        else:
+            self._vectors[row] = vector
+        self._dirty = True
+
+    def _remove_row(self, key: tuple[str, int]) -> None:
+        row = self._rows.pop(key, None)
+        self._digests.pop(key, None)
+        if row is None:
+            return
+        self._conv_pairs[key[0]].discard(key[1])
+        last = self._size - 1
+        if row != last:
+            # Move the last row into the hole
+            moved = self._keys[last]
+            self._vectors[row] = self._vectors[last]
+            self._codes[row] = self._codes[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+        self._keys.pop()
+        self._size -= 1
+        self._dirty = True
@@ -0,0 +1,202 @@
+"""
+ShardedStore - One file per conversation plus a lightweight manifest.
+Startup only reads the manifest; a conversation's messages are read from its
+own file the first time it is opened, and saving it rewrites only that file.
+"""
+import os
+import re
+from typing import Optional
+try:
+    from terminator_app.Data import load
+    from terminator_app.Data.codec import Codec
+    from terminator_app.Data.JournalStore import JournalStore
+    from terminator_app.Interfaces.StoreInterface import StoreInterface
+except ImportError:
+    from Data import load
+    from Data.codec import Codec
+    from Data.JournalStore import JournalStore
+    from Interfaces.StoreInterface import StoreInterface
+
+
+MANIFEST_NAME = "manifest.json"
+
+
+class ShardedStore(StoreInterface):
+    """Per-conversation JSON files under `shard_dir`, indexed by `manifest.json`.
+
+    Manifest entries hold everything but the messages (id, title, timestamp,
+    message_count). Appending a message does not rewrite the manifest right
+    away; the count is refreshed on the next structural change or on close.
+    """
+
+    def __init__(self, shard_dir: str):
+        self._shard_dir = shard_dir
+        self._manifest_path = os.path.join(shard_dir, MANIFEST_NAME)
+        self._conversations: dict[str, dict] = {}  # As last written; messages are read on demand
+        self._manifest_dirty = False
+
+    def load(self) -> list[dict]:
+        manifest = self._read_json(self._manifest_path, default=[])
+        self._conversations = {entry['id']: entry for entry in manifest if entry.get('id')}
+        # Writes arrive as snapshots, so the caller gets its own copies
+        return [dict(entry) for entry in self._conversations.values()]
+
+    def load_messages(self, conv_id: str) -> list[dict]:
+        shard = self._read_json(self._shard_path(conv_id), default={})
+        return shard.get('messages', [])
+
+    def save_all(self, conversations: list[dict]) -> bool:
+        try:
+            self._remove_stale_shards({conv['id'] for conv in conversations if conv.get('id')})
+            self._conversations = {conv['id']: conv for conv in conversations if conv.get('id')}
+            for conv in self._conversations.values():
+                if 'messages' in conv:
+                    self._write_shard(conv)
+            self._write_manifest()
+            return True
+        except Exception as e:
+            print(f"Error: Failed to save conversation shards: {e}")
+            return False
+
+    def put_conversation(self, conversation: dict) -> bool:
+        conv_id = conversation.get('id')
+        if not conv_id:
+            return False
+        try:
+            self._conversations[conv_id] = conversation
+            if 'messages' in conversation:
+                self._write_shard(conversation)
+            self._write_manifest()
+            return True
+        except Exception as e:
+            print(f"Error: Failed to save conversation shard: {e}")
+            return False
+
+    def put_message(self, conv_id: str, index: int, message: dict) -> bool:
+        conversation = self._conversations.get(conv_id)
+        if conversation is None:
+            return False
+        try:
+            if 'messages' not in conversation:
+                conversation['messages'] = self.load_messages(conv_id)
+            messages = conversation['messages']
+            if index < len(messages):
+                messages[index] = message
+            elif index == len(messages):
+                messages.append(message)
+            else:
+                return False
+            self._write_shard(conversation)
+            self._manifest_dirty = True
+            return True
+        except Exception as e:
+            print(f"Error: Failed to save conversation shard: {e}")
+            return False
+
+    def update_title(self, conv_id: str, title: str) -> bool:
+        conversation = self._conversations.get(conv_id)
+        if conversation is None:
+            return False
+        conversation['title'] = title
+        try:
+            # Titles are read from the manifest, so the shard can stay as is
+            self._write_manifest()
+            return True
+        except Exception as e:
+            print(f"Error: Failed to save conversation title: {e}")
+            return False
+
+    def update_titles(self, titles: dict[str, str]) -> bool:
+        if not any(conv_id in self._conversations for conv_id in titles):
+            return False
+        for conv_id, title in titles.items():
+            if conv_id in self._conversations:
+                self._conversations[conv_id]['title'] = title
+        try:
+            self._write_manifest()
+            return True
+        except Exception as e:
+            print(f"Error: Failed to save conversation titles: {e}")
+            return False
+
+    def delete_conversation(self, conv_id: str) -> bool:
+        self._conversations.pop(conv_id, None)
+        try:
+            shard_path = self._shard_path(conv_id)
+            if os.path.exists(shard_path):
+                os.remove(shard_path)
+            self._write_manifest()
+            return True
+        except Exception as e:
+            print(f"Error: Failed to delete conversation shard: {e}")
+            return False
+
+    def close(self) -> None:
+        if self._manifest_dirty:
+            try:
+                self._write_manifest()
+            except Exception as e:
+                print(f"Error: Failed to write conversation manifest: {e}")
+
+    # --- Migration ---
+
+    def migrate_from_json(self, history_path: str, journal_path: Optional[str] = None) -> int:
+        """One-shot split of a legacy JSON history (plus its journal tail) into shards.
+
+        Runs only while no manifest exists; the source files are left in place.
+        Returns the number of conversations imported.
+        """
+        if os.path.exists(self._manifest_path) or not os.path.exists(history_path):
+            return 0
+        try:
+            conversations = JournalStore.read_history(history_path, journal_path or f"{history_path}.journal")
+        except Exception as e:
+            # No manifest is written, so it is tried again on the next start
+            print(f"Error: Failed to read conversation history for migration: {e}")
+            return 0
+        return len(conversations) if self.save_all(conversations) else 0
+
+    # --- Helpers ---
+
+    def _write_manifest(self) -> None:
+        manifest = [load.DataLoader.conversation_metadata(conv) for conv in self._conversations.values()]
+        self._write_json(self._manifest_path, manifest)
+        self._manifest_dirty = False
+
+    def _remove_stale_shards(self, keep_ids: set) -> None:
+        """Delete shard files of conversations that are no longer stored."""
+        if not os.path.isdir(self._shard_dir):
+            return
+        keep_files = {f"{self._shard_name(conv_id)}.json" for conv_id in keep_ids}
+        for filename in os.listdir(self._shard_dir):
+            if filename.endswith('.json') and filename != MANIFEST_NAME and filename not in keep_files:
+                os.remove(os.path.join(self._shard_dir, filename))
+
+    def _write_shard(self, conversation: dict) -> None:
+        shard = {k: v for k, v in conversation.items() if k != 'message_count'}
+        self._write_json(self._shard_path(conversation['id']), shard)
+
+    @staticmethod
+    def _shard_name(conv_id: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', conv_id)
+
+    def _shard_path(self, conv_id: str) -> str:
+        return os.path.join(self._shard_dir, f"{self._shard_name(conv_id)}.json")
+
+    @staticmethod
+    def _read_json(path: str, default):
+        try:
+            with open(path, 'rb') as f:
+                return Codec.loads(f.read())
+        except Exception:
+            # Missing, empty or corrupted file
+            return default
+
+    @staticmethod
+    def _write_json(path: str, data) -> None:
+        """Write JSON atomically so a crash never leaves a half-written shard."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(Codec.for_path(path).dumps(data))
+        os.replace(tmp_path, path)
@@ -0,0 +1,106 @@
+"""
+Serialization codecs for history files.
+Picks a serializer (JSON or MessagePack) and optional compression (gzip or
+zstd) by file extension or UserConfig. Reading never depends on the choice:
+the format is sniffed from the data, so legacy pretty-printed JSON still loads.
+"""
+import gzip
+import json
+from typing import Optional
+try:
+    from terminator_app.config import UserConfig
+except ImportError:
+    from config import UserConfig
+
+# Optional fast/compact backends, used when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+FORMAT_EXTENSIONS = {'.json': 'json', '.msgpack': 'msgpack', '.mpk': 'msgpack'}
+
+
+class Codec:
+    """Serializer + optional compression for one history file."""
+
+    def __init__(self, fmt: str = "json", compression: Optional[str] = None, pretty: bool = False):
+        if fmt == "msgpack" and msgpack is None:
+            print("Warning: msgpack is not installed, falling back to JSON")
+            fmt = "json"
+        if compression == "zstd" and zstandard is None:
+            print("Warning: zstandard is not installed, falling back to gzip")
+            compression = "gzip"
+        self.fmt = fmt
+        self.compression = compression
+        self.pretty = pretty
+
+    @classmethod
+    def for_path(cls, path: str) -> "Codec":
+        """Codec for `path`: UserConfig.HISTORY_CODEC, or the extension when set to "auto"."""
+        fmt, compression = "json", None
+        name = path.lower()
+        for ext, kind in COMPRESSION_EXTENSIONS.items():
+            if name.endswith(ext):
+                compression = kind
+                name = name[:-len(ext)]
+        for ext, kind in FORMAT_EXTENSIONS.items():
+            if name.endswith(ext):
+                fmt = kind
+        if UserConfig.HISTORY_CODEC != "auto":
+            fmt = UserConfig.HISTORY_CODEC
+        compression = UserConfig.HISTORY_COMPRESSION or compression
+        return cls(fmt, compression, pretty=UserConfig.HISTORY_PRETTY_JSON)
+
+    def dumps(self, obj) -> bytes:
+        if self.fmt == "msgpack":
+            data = msgpack.packb(obj, use_bin_type=True)
+        else:
+            data = dumps_json(obj, pretty=self.pretty)
+        if self.compression == "gzip":
+            return gzip.compress(data, compresslevel=6)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor().compress(data)
+        return data
+
+    @staticmethod
+    def loads(data: bytes):
+        """Decode data written by any codec (including legacy pretty JSON)."""
+        if data.startswith(GZIP_MAGIC):
+            data = gzip.decompress(data)
+        elif data.startswith(ZSTD_MAGIC):
+            if zstandard is None:
+                raise RuntimeError("History is zstd-compressed but zstandard is not installed")
+            data = zstandard.ZstdDecompressor().decompressobj().decompress(data)
+        if data.lstrip()[:1] in (b'[', b'{', b'"') or not data.strip():
+            return loads_json(data)
+        if msgpack is None:
+            raise RuntimeError("History is MessagePack-encoded but msgpack is not installed")
+        return msgpack.unpackb(data, raw=False)
+
+
+def dumps_json(obj, pretty: bool = False) -> bytes:
+    """Compact (or indented) JSON as bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def loads_json(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,6 +1,10 @@
 from textual.binding import Binding
 import json
 import os
+try:
+    from terminator_app.Data.codec import Codec
+except ImportError:
+    from Data.codec import Codec
 
 class DataLoader:
     def load_bindings(filepath: str) -> list[Binding]:
@@ -45,8 +49,8 @@ class DataLoader:
                 json.dump([], file)
             return []
         try:
-            with open(filepath, 'r') as file:
-                return json.load(file)
+            with open(filepath, 'rb') as file:
+                return Codec.loads(file.read())
         except Exception:
             # This catches empty files, corrupted JSON, AND permission errors
             # It's much safer than just checking file size.
@@ -56,12 +60,50 @@ class DataLoader:
     def save_conversation_history(filepath: str, conversation_history: list[dict]) -> bool:
         try:
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            with open(filepath, 'w') as f:
-                json.dump(conversation_history, f, indent=2)
+            data = Codec.for_path(filepath).dumps(conversation_history)
+            with open(filepath, 'wb') as f:
+                f.write(data)
             return True
         except Exception:
             return False
 
+    @staticmethod
+    def conversation_metadata(conversation: dict) -> dict:
+        """Everything but the messages of a conversation, plus a 'message_count'."""
+        metadata = {k: v for k, v in conversation.items() if k != 'messages'}
+        if 'messages' in conversation:
+            metadata['message_count'] = len(conversation['messages'])
+        return metadata
+
+    @staticmethod
+    def save_history_metadata(filepath: str, conversation_history: list[dict] = None, metadata: list[dict] = None) -> bool:
+        """Write the `<filepath>.meta` sidecar used for metadata-first startup.
+        Call right after `filepath` was written; the sidecar records its size and mtime."""
+        try:
+            if metadata is None:
+                metadata = [DataLoader.conversation_metadata(conv) for conv in conversation_history]
+            stat = os.stat(filepath)
+            meta_path = f"{filepath}.meta"
+            sidecar = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'conversations': metadata}
+            with open(meta_path, 'wb') as f:
+                f.write(Codec.for_path(meta_path).dumps(sidecar))
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def load_history_metadata(filepath: str) -> list[dict] | None:
+        """Read the `<filepath>.meta` sidecar. Returns None if it is missing or stale."""
+        try:
+            stat = os.stat(filepath)
+            with open(f"{filepath}.meta", 'rb') as f:
+                sidecar = Codec.loads(f.read())
+            if sidecar.get('size') != stat.st_size or sidecar.get('mtime_ns') != stat.st_mtime_ns:
+                return None
+            return sidecar.get('conversations')
+        except Exception:
+            return None
+
     @staticmethod
     def get_conversation_by_id(conversation_history: list[dict], conversation_id: str) -> dict | None:
         for conversation in conversation_history:
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 
 class ModelInterface(ABC):
@@ -16,6 +17,28 @@ class ModelInterface(ABC):
         """Generate content based on the provided input."""
         pass
 
+    async def agenerate_content(self, contents: str) -> str:
+        """Async counterpart of generate_content. By default it runs on a thread."""
+        return await asyncio.to_thread(self.generate_content, contents)
+
+    async def asend_message_stream(self, prompt: str, session=None):
+        """Async counterpart of send_message_stream, continuing `session` (as
+        returned by create_chat) when given. Yields text fragments. By default
+        the synchronous stream is consumed on a thread."""
+        source = session if session is not None else self
+        fragments = iter(await asyncio.to_thread(source.send_message_stream, prompt))
+        finished = object()
+        try:
+            while (fragment := await asyncio.to_thread(next, fragments, finished)) is not finished:
+                yield fragment
+        finally:
+            close = getattr(fragments, 'close', None)
+            if close is not None:
+                try:
+                    close()
+                except ValueError:
+                    pass  # Still being advanced on its thread (the consumer was cancelled)
+
     @abstractmethod
     def deserialize_history(self, flat_msgs: list) -> list | None:
         """Deserialize a flat list of messages into the model's history format."""
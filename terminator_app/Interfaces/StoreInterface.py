@@ -0,0 +1,66 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+class StoreInterface(ABC):
+    """Persistence backend used by DataManager.
+
+    The DataManager keeps the in-memory cache; a store only has to make the
+    individual mutations durable. Every mutation returns True on success.
+
+    Lazy stores return conversations from `load()` without a 'messages' key
+    (but with a 'message_count'); DataManager fetches the messages with
+    `load_messages()` the first time a conversation is accessed.
+    """
+
+    # True for stores that rewrite everything on each mutation; DataManager
+    # then coalesces queued mutations into a single save_all().
+    rewrites_all = False
+
+    @abstractmethod
+    def load(self) -> list[dict]:
+        """Load every conversation from storage."""
+        pass
+
+    @abstractmethod
+    def save_all(self, conversations: list[dict]) -> bool:
+        """Persist the full list of conversations, replacing what is stored."""
+        pass
+
+    @abstractmethod
+    def put_conversation(self, conversation: dict) -> bool:
+        """Insert or replace a whole conversation."""
+        pass
+
+    @abstractmethod
+    def put_message(self, conv_id: str, index: int, message: dict) -> bool:
+        """Insert or replace the message/pair at `index` of a conversation."""
+        pass
+
+    @abstractmethod
+    def update_title(self, conv_id: str, title: str) -> bool:
+        """Update the title of a conversation."""
+        pass
+
+    def update_titles(self, titles: dict[str, str]) -> bool:
+        """Update the titles of several conversations ({id: title}), in one
+        transaction where the store supports it."""
+        results = [self.update_title(conv_id, title) for conv_id, title in titles.items()]
+        return all(results)
+
+    @abstractmethod
+    def delete_conversation(self, conv_id: str) -> bool:
+        """Remove a conversation."""
+        pass
+
+    def load_metadata(self) -> Optional[list[dict]]:
+        """Quickly load conversation metadata (no messages) for a fast startup,
+        or None if the store cannot. DataManager then calls `load()` in the background."""
+        return None
+
+    def load_messages(self, conv_id: str) -> list[dict]:
+        """Load the messages of a single conversation (lazy stores only)."""
+        return []
+
+    def close(self) -> None:
+        """Flush pending work and release resources."""
+        pass
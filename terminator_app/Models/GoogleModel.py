@@ -62,6 +62,47 @@ class GoogleModel(ModelInterface):
         except APIError as e:
             raise RuntimeError(f"Google API error: {e}")
 
+    async def asend_message_stream(self, prompt: str, session=None):
+        """
+        Send a message and stream the response on the event loop.
+
+        Args:
+            prompt (str): The input prompt for the model.
+            session: Chat from create_chat whose history is continued; the new
+                turn is recorded in it afterwards.
+
+        Yields:
+            str: The model's response text chunks.
+        """
+        history = session.get_history(curated=True) if session is not None else None
+        chat = self.client.aio.chats.create(model=self.model_name, history=history)
+        try:
+            async for chunk in await chat.send_message_stream(prompt):
+                if chunk.text:
+                    yield chunk.text
+        except APIError as e:
+            raise RuntimeError(f"Google API error: {e}")
+        if session is not None:
+            turn = chat.get_history(curated=True)[len(history or []):]
+            if turn:
+                session.record_history(user_input=turn[0], model_output=turn[1:], is_valid=True)
+
+    async def agenerate_content(self, contents: str) -> str:
+        """
+        Generate content based on the provided input without blocking the event loop.
+
+        Args:
+            contents (str): The input content for the model.
+
+        Returns:
+            str: The generated content.
+        """
+        try:
+            response = await self.client.aio.models.generate_content(model=self.model_name, contents=contents)
+            return response.text
+        except APIError as e:
+            raise RuntimeError(f"Google API error: {e}")
+
     def generate_content(self, contents: str) -> str:
         """
         Generate content based on the provided input.
@@ -1,3 +1,4 @@
+import asyncio
 from collections import deque
 import threading
 from time import time
@@ -60,6 +61,16 @@ class LMStudioModel():
     
     def generate_content(self, contents: str) -> str:
         return self.extract_true_answer(self.client.complete(contents).parsed)
+
+    async def agenerate_content(self, contents: str) -> str:
+        # The SDK handle is synchronous; keep the event loop free meanwhile
+        return await asyncio.to_thread(self.generate_content, contents)
+
+    async def asend_message_stream(self, prompt: str, session=None):
+        """Stream a reply on the event loop, continuing `session` (a LocalConversation)."""
+        session = session or self.create_chat(None)
+        async for fragment in session.asend_message_stream(prompt):
+            yield fragment
     
     @staticmethod
     def extract_true_answer(raw_text: str) -> str:
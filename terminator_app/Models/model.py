@@ -1,8 +1,6 @@
-from collections import deque
+import asyncio
 from io import BytesIO
 import re
-import threading
-from time import time
 import unicodedata
 import PyPDF2
 import feedparser
@@ -10,12 +8,20 @@ import lmstudio as lms
 from lmstudio.history import Chat
 from pathlib import Path
 import requests
-import time
+import threading
 import webbrowser
+try:
+    from terminator_app.Models.token_channel import TokenChannel
+except ImportError:
+    from Models.token_channel import TokenChannel
 # --- Tools --- #
 
 # --- LocalConversation wrapper --- #
 
+class StreamClosed(Exception):
+    """Raised inside `act` to stop a generation whose stream was closed."""
+
+
 class LocalConversation:
     def __init__(self, system_prompt: str, model_client: lms.llm):
         self.chat = Chat(system_prompt)
@@ -40,31 +46,64 @@ class LocalConversation:
         # sanitize incoming message before adding to chat
         safe_msg = self._sanitize_msg(msg)
         self.add_user_message(safe_msg)
-        fragments = deque()
-        finished = threading.Event()
 
-        def on_fragment(fragment, *args, **kwargs):
-            fragments.append(fragment.content)
-
-        def run_act():
+        def run_act(put):
             self.model.act(
                 self.chat,
                 [self.create_file, self.search_online, self.search_arxiv, self.open_link],
                 on_message=self.chat.append,
-                on_prediction_fragment=on_fragment
+                on_prediction_fragment=lambda fragment, *args, **kwargs: put(fragment.content)
             )
-            finished.set()  # Signal when act is done
 
-        # Run act in a separate thread so we can yield as fragments come
-        t = threading.Thread(target=run_act)
-        t.start()
+        # act runs on the channel's producer thread; the consumer wakes up
+        # when text is due instead of polling, and gets it in larger chunks
+        return TokenChannel.run(run_act)
 
-        while not finished.is_set() or fragments:
-            while fragments:
-                yield fragments.popleft()
-            time.sleep(0.001)  # tiny sleep to prevent busy waiting
+    async def asend_message_stream(self, msg: str):
+        """Async counterpart of send_message_stream. `act` (with its
+        synchronous tools) runs on its own thread and hands fragments to the
+        event loop as they arrive, without polling. Closing the stream early
+        stops `act` at its next fragment, and the stream only finishes once
+        `act` has returned."""
+        safe_msg = self._sanitize_msg(msg)
+        self.add_user_message(safe_msg)
+        loop = asyncio.get_running_loop()
+        fragments: asyncio.Queue = asyncio.Queue()
+        act_done = loop.create_future()  # Result: the error act raised, or None
+        finished = object()
+        stopped = threading.Event()
+
+        def on_fragment(fragment, *args, **kwargs):
+            if stopped.is_set():
+                raise StreamClosed()
+            loop.call_soon_threadsafe(fragments.put_nowait, fragment.content)
+
+        def finish(error):
+            fragments.put_nowait(finished)
+            act_done.set_result(error)
 
-        t.join()
+        def run_act():
+            error = None
+            try:
+                self.model.act(
+                    self.chat,
+                    [self.create_file, self.search_online, self.search_arxiv, self.open_link],
+                    on_message=self.chat.append,
+                    on_prediction_fragment=on_fragment
+                )
+            except BaseException as e:
+                error = e
+            loop.call_soon_threadsafe(finish, error)
+
+        threading.Thread(target=run_act, daemon=True).start()
+        try:
+            while (fragment := await fragments.get()) is not finished:
+                yield fragment
+        finally:
+            stopped.set()
+            error = await asyncio.shield(act_done)
+        if error is not None and not isinstance(error, StreamClosed):
+            raise error
 
 
     def create_file(self, name: str, content: str):
@@ -0,0 +1,193 @@
+"""
+TokenChannel - Hands streamed text from a producer thread to a consumer.
+The producer blocks when the consumer falls behind (bounded buffer), and the
+consumer wakes on a condition instead of polling. Small fragments are
+coalesced into chunks by size and age, so consumers see fewer, larger chunks.
+Async streams produced on the event loop are chunked the same way by
+`TokenChannel.acoalesce`.
+"""
+import asyncio
+import threading
+import time
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Optional
+try:
+    from terminator_app.config import UserConfig
+except ImportError:
+    from config import UserConfig
+
+
+class TokenChannel:
+    """Iterable channel of text chunks.
+
+    `put()` adds a fragment, blocking while `max_pending_chars` are waiting;
+    `close()` ends the stream (optionally with an error, raised to the
+    consumer after the remaining text). Iterating yields a chunk as soon as
+    `flush_chars` are pending or the oldest pending fragment is
+    `flush_interval` seconds old. The first fragment is passed on at once so
+    the time to first token is not delayed.
+    """
+
+    def __init__(self, flush_interval: Optional[float] = None, flush_chars: Optional[int] = None,
+                 max_pending_chars: Optional[int] = None):
+        self.flush_interval = UserConfig.STREAM_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.flush_chars = UserConfig.STREAM_FLUSH_CHARS if flush_chars is None else flush_chars
+        self.max_pending_chars = UserConfig.STREAM_BUFFER_CHARS if max_pending_chars is None else max_pending_chars
+        self._cond = threading.Condition()
+        self._pending: list[str] = []
+        self._pending_chars = 0
+        self._oldest: Optional[float] = None  # When the oldest pending fragment arrived
+        self._closed = False
+        self._abandoned = False
+        self._error: Optional[BaseException] = None
+        self._delivered_first = False
+        self.stats = {'fragments': 0, 'chunks': 0, 'producer_waits': 0}
+
+    @classmethod
+    def from_iterable(cls, source: Iterable, **kwargs) -> "TokenChannel":
+        """Drain `source` (text or objects with a `.text`) on a thread into a new channel."""
+        def _drain(put):
+            for item in source:
+                if not put(item if isinstance(item, str) else getattr(item, 'text', '') or ''):
+                    break  # Consumer stopped reading
+        return cls.run(_drain, **kwargs)
+
+    @classmethod
+    def run(cls, produce: Callable[[Callable[[str], bool]], object], **kwargs) -> "TokenChannel":
+        """Call `produce(put)` on a thread; the channel closes when it returns or raises."""
+        channel = cls(**kwargs)
+
+        def _produce():
+            try:
+                produce(channel.put)
+            except BaseException as e:
+                channel.close(e)
+            else:
+                channel.close()
+
+        threading.Thread(target=_produce, daemon=True).start()
+        return channel
+
+    @classmethod
+    async def acoalesce(cls, source: AsyncIterable, **kwargs) -> AsyncIterator[str]:
+        """Chunk the fragments of an async stream (text or objects with a
+        `.text`) like a channel does, on the event loop and without a thread.
+        The source runs as a task feeding the channel; there is no producer
+        thread to pause, so `max_pending_chars` does not apply. An error from
+        the source is raised after the remaining text; closing this generator
+        early cancels the source."""
+        channel = cls(**{**kwargs, 'max_pending_chars': 0})
+        arrived = asyncio.Event()
+
+        async def pump():
+            try:
+                async for item in source:
+                    channel.put(item if isinstance(item, str) else getattr(item, 'text', '') or '')
+                    arrived.set()
+            except Exception as e:
+                channel.close(e)
+            else:
+                channel.close()
+            arrived.set()
+
+        task = asyncio.ensure_future(pump())
+        try:
+            while True:
+                with channel._cond:
+                    if channel._pending and (channel._closed or channel._due()):
+                        chunk = channel._take()
+                    elif channel._closed:
+                        if channel._error is not None:
+                            raise channel._error
+                        return
+                    else:
+                        chunk = None
+                        timeout = None
+                        if channel._pending and channel.flush_interval:
+                            timeout = max(0.0, channel._oldest + channel.flush_interval - time.monotonic())
+                        arrived.clear()
+                if chunk is not None:
+                    yield chunk
+                    continue
+                try:
+                    await asyncio.wait_for(arrived.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass  # The oldest pending text is due
+        finally:
+            if not task.done():
+                task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    # --- Producer side ---
+
+    def put(self, fragment: str) -> bool:
+        """Add a fragment. Returns False once the consumer has stopped reading."""
+        if not fragment:
+            return not self._abandoned
+        with self._cond:
+            while (self.max_pending_chars and self._pending_chars >= self.max_pending_chars
+                   and not self._abandoned):
+                self.stats['producer_waits'] += 1
+                self._cond.wait()
+            if self._abandoned:
+                return False
+            self._pending.append(fragment)
+            self._pending_chars += len(fragment)
+            self.stats['fragments'] += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._cond.notify_all()
+            return True
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        with self._cond:
+            self._closed = True
+            self._error = self._error or error
+            self._cond.notify_all()
+
+    # --- Consumer side ---
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            while (chunk := self.get()) is not None:
+                yield chunk
+        finally:
+            self.abandon()
+
+    def get(self) -> Optional[str]:
+        """The next chunk, blocking until one is due. None at the end of the stream."""
+        with self._cond:
+            while True:
+                if self._pending and (self._closed or self._due()):
+                    return self._take()
+                if self._closed:
+                    if self._error is not None:
+                        error, self._error = self._error, None
+                        raise error
+                    return None
+                timeout = None
+                if self._pending and self.flush_interval:
+                    timeout = max(0.0, self._oldest + self.flush_interval - time.monotonic())
+                self._cond.wait(timeout)
+
+    def abandon(self) -> None:
+        """Stop reading: unblocks the producer and makes further puts fail."""
+        with self._cond:
+            self._abandoned = True
+            self._cond.notify_all()
+
+    def _due(self) -> bool:
+        if not self._delivered_first:
+            return True
+        if self._pending_chars >= self.flush_chars:
+            return True
+        return not self.flush_interval or time.monotonic() - self._oldest >= self.flush_interval
+
+    def _take(self) -> str:
+        chunk = ''.join(self._pending)
+        self._pending.clear()
+        self._pending_chars = 0
+        self._oldest = None
+        self._delivered_first = True
+        self.stats['chunks'] += 1
+        self._cond.notify_all()  # Room for a blocked producer
+        return chunk
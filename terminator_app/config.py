@@ -23,6 +23,16 @@ class Config:
     CONVERSATION_HISTORY_PATH = os.path.join(
         BASE_DATA_PATH, "conversation_history.json"
     )
+    CONVERSATION_JOURNAL_PATH = os.path.join(
+        BASE_DATA_PATH, "conversation_history.journal"
+    )
+    CONVERSATION_DB_PATH = os.path.join(BASE_DATA_PATH, "conversation_history.db")
+    CONVERSATION_SHARD_PATH = os.path.join(BASE_DATA_PATH, "conversations")
+    CONVERSATION_ARCHIVE_PATH = os.path.join(BASE_DATA_PATH, "archive.bin")
+    CONVERSATION_ARCHIVE_INDEX_PATH = os.path.join(BASE_DATA_PATH, "archive_index.json")
+    SEARCH_INDEX_PATH = os.path.join(BASE_DATA_PATH, "search_index.json")
+    SEMANTIC_INDEX_PATH = os.path.join(BASE_DATA_PATH, "semantic_index.npy")
+    RESPONSE_CACHE_PATH = os.path.join(BASE_DATA_PATH, "response_cache")
     CLIPBOARD_IMAGE_SAVE_PATH = os.path.join(BASE_DATA_PATH, "clipboard_images")
 
     # Resource names for package access (for defaults)
@@ -75,12 +85,14 @@ class Config:
     # UI identifiers
     CONVERSATION_BUTTON_PREFIX = "terminator_button_conv_"
     NEW_CONVERSATION_BUTTON_ID = "terminator_button_new_conversation"
+    FIND_SIMILAR_BUTTON_ID = "terminator_button_find_similar"
 
     # UI Element IDs
     CHAT_PANEL_ID = "chat_panel"
     CHAT_SCROLL_ID = "chat_scroll"
     CHAT_INPUT_ID = "chat_input_container"
     HISTORY_CONTAINER_ID = "history_container"
+    HISTORY_SEARCH_ID = "history_search_input"
     MAIN_CONTAINER_ID = "main_container"
 
     # UI Classes
@@ -97,6 +109,10 @@ class Config:
 
 class Prompts:
     TITLE_PROMPT_TEMPLATE = """Based on this conversation, provide a very short title (3-5 words max):\n\n{conversation_text}\n\nTitle:"""
+    SUMMARY_PROMPT_TEMPLATE = """Update the summary of an ongoing conversation with the new messages below. Keep facts, decisions, names and open questions; drop small talk. Reply with the updated summary only.\n\nCurrent summary:\n{summary}\n\nNew messages:\n{conversation_text}\n\nUpdated summary:"""
+    SUMMARY_CONTEXT_TEMPLATE = "Summary of our conversation so far:\n{summary}"
+    SUMMARY_ACKNOWLEDGEMENT = "Understood, I'll keep that in mind."
+    BATCH_TITLE_PROMPT_TEMPLATE = """Provide a very short title (3-5 words max) for each of the conversations below. Reply with a JSON object mapping each conversation number to its title, like {{"1": "First title", "2": "Second title"}}, and nothing else.\n\n{conversations}\n\nJSON:"""
     DEBUG_AI_RESPONSE_TEMPLATE = "[DEBUG] AI response to: {prompt}"
     ERROR_API_RESPONSE_TEMPLATE = (
         "Error: Could not get a response from the model. {error}"
@@ -155,6 +171,16 @@ class UserConfig:
     # Even if you have 1000 messages, only send last N to API
     MAX_CONTEXT_MESSAGES = 50
 
+    # Approximate token budget for the history kept in a session (None = unlimited).
+    # Keep it below the model's context length to leave room for the reply.
+    MAX_CONTEXT_TOKENS = 8000
+
+    # Rolling summary: older pairs are folded into a summary in the background,
+    # and sessions get the summary plus the most recent pairs
+    ROLLING_SUMMARY = True
+    SUMMARY_KEEP_RECENT_PAIRS = 10  # Always sent verbatim
+    SUMMARY_BATCH_PAIRS = 10  # Summarize once this many older pairs are not yet summarized
+
     # Auto-complete incomplete conversations on load
     AUTO_COMPLETE_ON_LOAD = True
 
@@ -183,9 +209,25 @@ class UserConfig:
     # Enable streaming responses (show text as it's generated)
     STREAMING_ENABLED = False
 
+    # Stream chat responses with the models' async API on the UI event loop
+    # instead of a worker thread
+    ASYNC_STREAMING = True
+
     # Streaming chunk delay (seconds) - for visual effect
     STREAMING_DELAY = 0.05
 
+    # Streamed text is passed on in chunks: once this many characters are
+    # waiting or the oldest waiting text is this many seconds old
+    STREAM_FLUSH_CHARS = 256
+    STREAM_FLUSH_INTERVAL = 0.03
+
+    # The model thread pauses while this many characters wait to be read
+    STREAM_BUFFER_CHARS = 65536
+
+    # Maximum chat repaints per second while a response streams in
+    # (0 = repaint on every chunk)
+    RENDER_MAX_FPS = 20
+
     # ============================================================
     # Safety Settings
     # ============================================================
@@ -201,15 +243,22 @@ class UserConfig:
     # UI/UX Settings
     # ============================================================
 
-    # Messages per page in chat view
+    # Pages (greeting or user/model pair) moved by the Next/Previous buttons
     MESSAGES_PER_PAGE = 2
 
+    # Rendered pages the chat view keeps; pages scrolled further away are
+    # rendered again when they come back into view
+    CHAT_ROW_CACHE = 50
+
     # Auto-generate titles for conversations
     AUTO_GENERATE_TITLES = True
 
     # Maximum words in auto-generated titles
     TITLE_MAX_WORDS = 5
 
+    # Untitled conversations titled per model call
+    TITLE_BATCH_SIZE = 25
+
     # Show typing indicators
     SHOW_TYPING_INDICATOR = True
 
@@ -217,12 +266,83 @@ class UserConfig:
     # Performance & Caching
     # ============================================================
 
-    # Cache API responses (for debugging/development)
+    # Cache static generations (titles, summaries) on disk; chat replies are never
+    # cached. Opt-in: set to True to enable it
     CACHE_RESPONSES = False
 
-    # Response cache duration (seconds)
+    # Response cache duration (seconds, None = no expiry)
     CACHE_DURATION = 3600
 
+    # Size limit of the response cache; least recently used entries are removed first
+    CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+    # Memory for rendered chat pages kept for page flips, resizes and
+    # reopened conversations; least recently used pages are dropped first
+    RENDER_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+    # Worker threads shared by chat responses, auto-completion, titles and summaries
+    WORKER_POOL_SIZE = 4
+
+    # Maximum queued background tasks (0 = unbounded)
+    WORKER_QUEUE_SIZE = 256
+
+    # Concurrent requests per model backend (missing = limited only by the pool)
+    BACKEND_CONCURRENCY = {"LMStudioModel": 2, "GoogleModel": 4}
+
+    # ============================================================
+    # Storage
+    # ============================================================
+
+    # Conversation storage backend
+    # "journal" = JSON snapshot + append-only journal (one record per change)
+    # "sqlite" = SQLite database, one row per conversation and per message pair
+    #            (imports conversation_history.json on first use)
+    # "sharded" = one JSON file per conversation plus a small manifest
+    #             (splits conversation_history.json on first use)
+    # "json" = rewrite the whole JSON file on every change (legacy)
+    STORAGE_BACKEND = "journal"
+
+    # Compact the journal into the snapshot after this many records...
+    JOURNAL_COMPACT_THRESHOLD = 500
+
+    # ...or after this many seconds if anything is pending
+    JOURNAL_COMPACT_INTERVAL = 300
+
+    # Serialization of history files
+    # "auto" = by file extension (.json, .msgpack; add .gz/.zst for compression)
+    # "json" = compact JSON (orjson when installed)
+    # "msgpack" = MessagePack (requires msgpack)
+    # Any format is readable regardless of this setting.
+    HISTORY_CODEC = "auto"
+
+    # Compression for history files: None, "gzip" or "zstd" (requires zstandard)
+    HISTORY_COMPRESSION = None
+
+    # Indent JSON history files (larger and slower, but human-readable)
+    HISTORY_PRETTY_JSON = False
+
+    # Coalesce writes and flush them in the background every N seconds
+    # (0 = write synchronously on every change)
+    FLUSH_INTERVAL = 1.0
+
+    # Move conversations idle for this many days into the read-only archive,
+    # which is memory-mapped and only decoded when opened. Opt-in: set a
+    # number of days (e.g. 90) to enable it (None = never)
+    ARCHIVE_AFTER_DAYS = None
+
+    # "Find similar" conversations from embeddings of each message pair
+    # (requires numpy; embeddings are computed in the background)
+    SEMANTIC_SEARCH = True
+
+    # Embedding function for semantic search
+    # "hashing" = built-in feature hashing, no model download
+    # "package.module:function" = callable taking a list of texts and
+    #                             returning an (n, dim) array
+    SEMANTIC_EMBEDDING = "hashing"
+
+    # Keep embeddings as float16 (half the memory, slightly coarser scores)
+    SEMANTIC_FLOAT16 = False
+
     # ============================================================
     # Advanced Settings
     # ============================================================
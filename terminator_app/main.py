@@ -38,14 +38,18 @@ install_dependencies()
 
 from textual.app import App, ComposeResult
 from textual.widgets import Static, Input, Footer, Header, Button
-from textual.containers import Container, VerticalScroll, Horizontal
+from textual.containers import Container, Horizontal
 from textual import work
 
 
 from terminator_app.Data import load
 from terminator_app.Data.DataManager import DataManager
+from terminator_app.Data.ChangeEvents import TitleChanged
 from terminator_app.Controller import AI_Controller, Chat_controller, Input_controller, History_controller
-from terminator_app.config import Config
+from terminator_app.Controller.Render_scheduler import RenderScheduler
+from terminator_app.Chat.Chat_list_view import ChatListView
+from terminator_app.Chat.History_list_view import HistoryListView, HistoryRow
+from terminator_app.config import Config, UserConfig
 
 # Initialize user directories and copy default files
 Config.initialize_user_directories()
@@ -66,7 +70,7 @@ class Terminator(App):
         self.data_manager = DataManager()
             
         # Initialize controllers with dependency injection
-        self.AI_controller = AI_Controller.AIController(None, {})
+        self.AI_controller = AI_Controller.AIController(None, {}, data_manager=self.data_manager)
         self.chat_controller = Chat_controller.ChatController(
             self.data_manager,
             self.AI_controller,
@@ -84,7 +88,9 @@ class Terminator(App):
             self.AI_controller,
             self.debug_mode
         )
-        
+
+        # Streaming repaints go through the scheduler, at most RENDER_MAX_FPS per second
+        self.render_scheduler = RenderScheduler(self._paint_regions, self.call_from_thread)
 
         if self.debug_mode:
             print("[DEBUG] Debug mode enabled")
@@ -101,16 +107,18 @@ class Terminator(App):
                 id=Config.NEW_CONVERSATION_BUTTON_ID,
                 classes=Config.CONVERSATION_BUTTON_CLASS
             ),
-            VerticalScroll(
-                id=Config.HISTORY_CONTAINER_ID
+            Button(
+                "Find Similar",
+                id=Config.FIND_SIMILAR_BUTTON_ID,
+                classes=Config.CONVERSATION_BUTTON_CLASS
             ),
+            Input(placeholder="Search conversations...", id=Config.HISTORY_SEARCH_ID),
+            HistoryListView(id=Config.HISTORY_CONTAINER_ID),
             id=Config.HISTORY_PANEL_CONTAINER_ID
             ),
             Container(
-            VerticalScroll(
-                Static(id=Config.CHAT_PANEL_ID),
-                id=Config.CHAT_SCROLL_ID
-            ),
+            Static(id=Config.CHAT_PANEL_ID),
+            ChatListView(id=Config.CHAT_SCROLL_ID),
             Horizontal(
                 Button("Stop", id="input_button_stop", classes="input-action-button"),
                 Button("Regenerate", id="input_button_regenerate", classes="input-action-button"),
@@ -134,14 +142,18 @@ class Terminator(App):
 
         # Display initial conversation
         chat_panel = self.query_one(f"#{Config.CHAT_PANEL_ID}", Static)
-        chat_scroll = self.query_one(f"#{Config.CHAT_SCROLL_ID}",VerticalScroll)
+        chat_scroll = self.query_one(f"#{Config.CHAT_SCROLL_ID}", ChatListView)
 
         if self.chat_controller.view_page(0, self.chat_controller.current_conversation):
             self.chat_controller.display_conversation_at_index(self.chat_controller.current_conversation, chat_panel, chat_scroll)
 
-        # Set up button container reference (visible by default)
+        # Update the history panel and chat as conversations change
+        self.data_manager.subscribe(self._on_data_changed)
+
         # Populate history and focus input
         self._refresh_history_worker()
+        # History starts from metadata only; refresh once message bodies are parsed
+        self.data_manager.when_loaded(lambda: self.call_from_thread(self.refresh_data, where='history'))
         input_field = self.query_one(f"#{Config.CHAT_INPUT_ID}", Input)
 
         # Auto-complete incomplete conversation if needed
@@ -157,24 +169,40 @@ class Terminator(App):
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button clicks - delegate to history controller"""
         button_id = event.button.id
+        if isinstance(event.button, HistoryRow):
+            # History rows are reused as the list scrolls; route by the conversation shown
+            button_id = f"{Config.CONVERSATION_BUTTON_PREFIX}{event.button.conv_id}"
         input_field = self.query_one(f"#{Config.CHAT_INPUT_ID}", Input)
         
         # Let history controller handle the button press
         isHistory = button_id == f"{Config.NEW_CONVERSATION_BUTTON_ID}" or button_id.startswith(Config.CONVERSATION_BUTTON_PREFIX)
         if isHistory and self.history_controller.handle_History_button_press(button_id, Config.CONVERSATION_BUTTON_PREFIX, input_field):
-            # Refresh data first
-            self.refresh_data(where='all')
+            # Only the selection moves in the history panel; the chat shows the new conversation
+            self.query_one(f"#{Config.HISTORY_CONTAINER_ID}", HistoryListView).select(self.history_controller.selected_button_id)
+            self.refresh_data(where='chat')
             
             # Auto-complete if the switched conversation is incomplete
             if self.input_controller.auto_complete_conversation(self.chat_controller.current_conversation):
                 print("[INFO] Auto-completing switched conversation...")
                 input_field.placeholder = "⏳ Completing previous request (AUTO_COMPLETE_CONV)..."
         
-        if button_id == "input_next_button" and self.chat_controller.view_page(1, self.chat_controller.current_conversation, self.input_controller, self):
+        if button_id == Config.FIND_SIMILAR_BUTTON_ID:
+            showing = self.history_controller.toggle_similar(self.chat_controller.current_conversation.get('id'))
+            event.button.label = "Show All" if showing else "Find Similar"
+            self.refresh_data(where='history')
+
+        if button_id == "input_next_button" and self.chat_controller.view_page(UserConfig.MESSAGES_PER_PAGE, self.chat_controller.current_conversation, self.input_controller, self):
             self.refresh_data(where='chat')
-        if button_id == "input_previous_button" and self.chat_controller.view_page(-1, self.chat_controller.current_conversation, self.input_controller, self):
+        if button_id == "input_previous_button" and self.chat_controller.view_page(-UserConfig.MESSAGES_PER_PAGE, self.chat_controller.current_conversation, self.input_controller, self):
             self.refresh_data(where='chat')
 
+    def on_input_changed(self, event: Input.Changed) -> None:
+        """Filter the history panel as the search query changes"""
+        if event.input.id == Config.HISTORY_SEARCH_ID:
+            self.history_controller.set_search_query(event.value)
+            self.query_one(f"#{Config.FIND_SIMILAR_BUTTON_ID}", Button).label = "Find Similar"
+            self.refresh_data(where='history')
+
     def on_input_submitted(self, event: Input.Submitted) -> None:
         """Handle when user presses Enter in the input field"""
         user_input = event.value.strip()
@@ -204,10 +232,34 @@ class Terminator(App):
         """Refresh chat display after resize completes"""
         self.refresh_data(where='chat')
 
+    def _on_data_changed(self, event) -> None:
+        """DataManager change subscriber (any thread): repaint only what the change touches."""
+        regions = []
+        if self.history_controller.note_change(event):
+            regions.append('history')
+        # The chat shows no title, so only message changes of the open conversation repaint it
+        if not isinstance(event, TitleChanged) and event.conv_id == self.chat_controller.current_conversation.get('id'):
+            regions.append('chat')
+        if regions:
+            self.render_scheduler.request(*regions)
+
+    def _paint_regions(self, regions: set) -> None:
+        """Draw one render scheduler frame. The chat is redrawn in place,
+        without the loading screen refresh_data shows; the history panel only
+        relabels changed rows unless conversations were added or removed."""
+        if 'history' in regions:
+            history_container = self.query_one(f"#{Config.HISTORY_CONTAINER_ID}", HistoryListView)
+            if self.history_controller.apply_changes(history_container):
+                self._refresh_history_worker()
+        if 'chat' in regions:
+            chat_panel = self.query_one(f"#{Config.CHAT_PANEL_ID}", Static)
+            chat_scroll = self.query_one(f"#{Config.CHAT_SCROLL_ID}", ChatListView)
+            self.chat_controller.display_conversation_at_index(self.chat_controller.current_conversation, chat_panel, chat_scroll)
+
     @work(exclusive=True)
     async def _refresh_history_worker(self):
         """Worker to refresh history panel with proper async widget removal."""
-        history_container = self.query_one(f"#{Config.HISTORY_CONTAINER_ID}", VerticalScroll)
+        history_container = self.query_one(f"#{Config.HISTORY_CONTAINER_ID}", HistoryListView)
         await self.history_controller.populate_history_panel(history_container)
 
     def refresh_data(self, where='all'):
@@ -238,7 +290,11 @@ class Terminator(App):
 
 def main():
     app = Terminator(debug=debug_mode)
-    app.run()
+    app.data_manager.install_signal_handlers()
+    try:
+        app.run()
+    finally:
+        app.data_manager.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Run against the source tree, and keep the app's files out of the real home
+# directory: Config resolves its paths from HOME when it is first imported
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["HOME"] = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".home")
+
+from terminator_app.config import Config  # noqa: E402
+
+assert Config.USER_BASE_PATH.startswith(os.environ["HOME"]), Config.USER_BASE_PATH
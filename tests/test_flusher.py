@@ -0,0 +1,56 @@
+import threading
+
+from terminator_app.Data.DataManager import DataManager
+from terminator_app.Interfaces.StoreInterface import StoreInterface
+
+
+class SlowStore(StoreInterface):
+    """In-memory store whose conversation writes block until released."""
+
+    def __init__(self):
+        self.writing = threading.Event()
+        self.release = threading.Event()
+        self.written = {}
+
+    def load(self):
+        return []
+
+    def save_all(self, conversations):
+        return True
+
+    def put_conversation(self, conversation):
+        self.writing.set()
+        self.release.wait(5)
+        self.written[conversation['id']] = conversation
+        return True
+
+    def put_message(self, conv_id, index, message):
+        return True
+
+    def update_title(self, conv_id, title):
+        self.written[conv_id]['title'] = title
+        return True
+
+    def delete_conversation(self, conv_id):
+        return True
+
+
+def test_mutation_proceeds_while_a_slow_write_is_in_flight():
+    store = SlowStore()
+    manager = DataManager(store=store, flush_interval=60)
+    manager.add_conversation({'id': 'a', 'title': 'Old', 'messages': []})
+    flushing = threading.Thread(target=manager.flush)
+    flushing.start()
+    assert store.writing.wait(2)
+
+    renamed = threading.Event()
+    threading.Thread(target=lambda: (manager.update_conversation_title('a', 'New'), renamed.set())).start()
+    assert renamed.wait(2), "the title update waited for the write to finish"
+    store.release.set()
+    flushing.join(2)
+
+    # The write in flight used a snapshot taken before the rename
+    assert store.written['a']['title'] == 'Old'
+    assert manager.flush()
+    assert store.written['a']['title'] == 'New'
+    manager.close()
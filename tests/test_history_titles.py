@@ -0,0 +1,55 @@
+import asyncio
+
+from terminator_app.Controller.History_controller import HistoryController
+
+
+class Data:
+    def __init__(self, conversations):
+        self.conversations = conversations
+
+    def is_loaded(self):
+        return True
+
+    def get_message_count(self, metadata):
+        return len(metadata.get('messages', []))
+
+    def get_conversation_by_id(self, conv_id):
+        return next(conv for conv in self.conversations if conv['id'] == conv_id)
+
+    def get_conversation_count(self):
+        return len(self.conversations)
+
+    def get_conversation_page(self, start, count):
+        return self.conversations[start:start + count]
+
+
+class Titles:
+    def __init__(self):
+        self.requests = []
+
+    def generate_title_from_conversation(self, conv, callback=None):
+        self.requests.append((conv['id'], callback))
+
+
+class Panel:
+    def show(self, key, count, fetch, describe, selected, label_lines=1, on_window=None):
+        window = fetch(0, count)
+        [describe(metadata) for metadata in window]
+        on_window(window)
+
+
+def test_untitled_rows_are_requested_once_and_failures_on_repopulate():
+    conversations = [{'id': 'a', 'messages': [{}, {}]}, {'id': 'b', 'title': 'Titled', 'messages': [{}, {}]}]
+    titles = Titles()
+    controller = HistoryController(Data(conversations), None, None, titles)
+    panel = Panel()
+
+    asyncio.run(controller.populate_history_panel(panel))
+    controller._request_titles(conversations)  # Scrolled back into view
+    assert [conv_id for conv_id, _ in titles.requests] == ['a']
+
+    titles.requests[0][1]('a', '')  # The batch failed
+    controller._request_titles(conversations)
+    assert len(titles.requests) == 1  # Not retried on scroll...
+    asyncio.run(controller.populate_history_panel(panel))
+    assert [conv_id for conv_id, _ in titles.requests] == ['a', 'a']  # ...but on the next repopulation
@@ -0,0 +1,82 @@
+import threading
+
+from terminator_app.Data.JournalStore import JournalStore
+
+
+def conversation(conv_id, title="Untitled"):
+    return {'id': conv_id, 'title': title, 'messages': [{'user': {'parts': [{'text': 'hi'}]}}]}
+
+
+def open_store(tmp_path, lock=None):
+    store = JournalStore(str(tmp_path / "history.json"), str(tmp_path / "history.journal"), lock=lock,
+                         compact_threshold=10_000, compact_interval=3600)
+    return store, store.load()
+
+
+def test_journal_is_replayed_on_load(tmp_path):
+    store, _ = open_store(tmp_path)
+    store.put_conversation(conversation('a'))
+    store.put_conversation(conversation('b'))
+    store.put_message('a', 1, {'user': {'parts': [{'text': 'again'}]}})
+    store.update_title('a', 'Renamed')
+    store.delete_conversation('b')
+    store._close_journal()  # Simulate a crash: no compaction on close
+
+    _, conversations = open_store(tmp_path)
+    assert [conv['id'] for conv in conversations] == ['a']
+    assert conversations[0]['title'] == 'Renamed'
+    assert len(conversations[0]['messages']) == 2
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    store, _ = open_store(tmp_path)
+    store.put_conversation(conversation('a'))
+    store._close_journal()
+    journal = tmp_path / "history.journal"
+    intact = journal.stat().st_size
+    with open(journal, 'ab') as f:
+        f.write(b'{"op": "put", "conv": {"id": "b"')  # Crash mid-write
+
+    _, conversations = open_store(tmp_path)
+    assert [conv['id'] for conv in conversations] == ['a']
+    assert journal.stat().st_size == intact
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    store, _ = open_store(tmp_path)
+    store.put_conversation(conversation('a'))
+    store.update_title('a', 'Compacted')
+    assert store.compact()
+    assert (tmp_path / "history.journal").stat().st_size == 0
+    store.put_conversation(conversation('b'))  # Journaled after compaction
+    store._close_journal()
+
+    _, conversations = open_store(tmp_path)
+    assert [(conv['id'], conv['title']) for conv in conversations] == [('a', 'Compacted'), ('b', 'Untitled')]
+
+
+def test_compaction_does_not_serialize_under_the_lock(tmp_path, monkeypatch):
+    lock = threading.RLock()
+    store, _ = open_store(tmp_path, lock=lock)
+    store.put_conversation(conversation('a'))
+    from terminator_app.Data import JournalStore as module
+    dumps = module.Codec.dumps
+    lock_free = []
+
+    def probe():
+        if lock.acquire(timeout=0.5):
+            lock.release()
+            lock_free.append(True)
+        else:
+            lock_free.append(False)
+
+    def checked_dumps(self, obj):
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        return dumps(self, obj)
+
+    monkeypatch.setattr(module.Codec, 'dumps', checked_dumps)
+    assert store.compact()
+    assert lock_free[0]  # The snapshot was serialized while other threads could mutate
+    store.close()
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+from contextlib import aclosing
+
+from terminator_app.Models.model import LocalConversation
+
+
+class Fragment:
+    def __init__(self, content):
+        self.content = content
+
+
+class EndlessModel:
+    """Streams fragments until the callback stops it."""
+
+    def __init__(self):
+        self.returned = threading.Event()
+
+    def act(self, chat, tools, on_message=None, on_prediction_fragment=None):
+        try:
+            while True:
+                on_prediction_fragment(Fragment("x"))
+                threading.Event().wait(0.01)
+        finally:
+            self.returned.set()
+
+
+def test_closing_async_stream_stops_act():
+    model = EndlessModel()
+    conversation = LocalConversation("system", model)
+
+    async def main():
+        async with aclosing(conversation.asend_message_stream("hi")) as stream:
+            async for _ in stream:
+                break
+        # The stream only closes once act has stopped
+        assert model.returned.is_set()
+
+    asyncio.run(main())
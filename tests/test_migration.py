@@ -0,0 +1,39 @@
+import json
+import os
+
+from terminator_app.Data.ShardedStore import ShardedStore
+from terminator_app.Data.SQLiteStore import SQLiteStore
+
+
+def legacy_history(tmp_path):
+    """A legacy snapshot plus a journal with one record and a torn tail."""
+    history = tmp_path / "legacy" / "history.json"
+    history.parent.mkdir()
+    history.write_text(json.dumps([{'id': 'a', 'title': 'A', 'messages': [{}]}]))
+    journal = tmp_path / "legacy" / "history.json.journal"
+    record = {'op': 'put', 'conv': {'id': 'b', 'title': 'B', 'messages': [{}]}}
+    journal.write_bytes(json.dumps(record).encode() + b'\n{"op": "del"')
+    return history, journal
+
+
+def snapshot(directory):
+    return {name: (directory / name).read_bytes() for name in sorted(os.listdir(directory))}
+
+
+def test_sqlite_migration_leaves_legacy_files_untouched(tmp_path):
+    history, journal = legacy_history(tmp_path)
+    before = snapshot(history.parent)
+    store = SQLiteStore(str(tmp_path / "db" / "history.db"))
+    assert store.migrate_from_json(str(history), str(journal)) == 2
+    assert snapshot(history.parent) == before
+    assert sorted(conv['id'] for conv in store.load()) == ['a', 'b']
+    store.close()
+
+
+def test_sharded_migration_leaves_legacy_files_untouched(tmp_path):
+    history, journal = legacy_history(tmp_path)
+    before = snapshot(history.parent)
+    store = ShardedStore(str(tmp_path / "shards"))
+    assert store.migrate_from_json(str(history), str(journal)) == 2
+    assert snapshot(history.parent) == before
+    assert sorted(conv['id'] for conv in store.load()) == ['a', 'b']
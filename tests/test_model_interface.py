@@ -0,0 +1,33 @@
+import asyncio
+
+from terminator_app.Interfaces.ModelInterface import ModelInterface
+
+
+class SyncOnlyModel(ModelInterface):
+    """Implements only the synchronous API."""
+
+    def send_message(self, prompt):
+        return prompt
+
+    def send_message_stream(self, prompt):
+        yield from prompt.split()
+
+    def generate_content(self, contents):
+        return contents
+
+    def deserialize_history(self, flat_msgs):
+        return flat_msgs
+
+    def create_chat(self, history_data):
+        return self
+
+
+async def collect(stream):
+    return [fragment async for fragment in stream]
+
+
+def test_async_stream_falls_back_to_sync_stream():
+    model = SyncOnlyModel()
+    assert asyncio.run(collect(model.asend_message_stream("one two three"))) == ["one", "two", "three"]
+    session = SyncOnlyModel()
+    assert asyncio.run(collect(model.asend_message_stream("a b", session=session))) == ["a", "b"]
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from terminator_app.Data.SemanticIndex import SemanticIndex
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def conversation(conv_id, text):
+    return {
+        'id': conv_id,
+        'messages': [
+            {'model': {'parts': [{'text': 'Hello'}]}},
+            {'user': {'parts': [{'text': text}]}, 'model': {'parts': [{'text': text}]}},
+        ],
+    }
+
+
+def test_reloaded_empty_index_accepts_new_conversations(tmp_path):
+    path = str(tmp_path / "semantic_index.npy")
+    empty = SemanticIndex(path)
+    empty._dirty = True
+    assert empty.save()
+
+    index = SemanticIndex(path)
+    assert index.load()
+    index.start()
+    try:
+        index.submit_conversation(conversation('a', 'python list comprehension'))
+        index.submit_conversation(conversation('b', 'python list sorting'))
+        assert wait_until(lambda: index.conversation_ids() == {'a', 'b'})
+        assert [conv_id for conv_id, _ in index.similar_conversations('a')] == ['b']
+        # The worker is still alive for later batches
+        index.submit_conversation(conversation('c', 'baking bread'))
+        assert wait_until(lambda: index.has_conversation('c'))
+    finally:
+        index.stop()
+
+
+def test_failed_row_write_keeps_worker_running(tmp_path):
+    index = SemanticIndex(str(tmp_path / "semantic_index.npy"))
+    set_row = index._set_row
+
+    def fail_once(key, vector):
+        if key[0] == 'bad':
+            raise IndexError("boom")
+        set_row(key, vector)
+
+    index._set_row = fail_once
+    index.start()
+    try:
+        index.submit_conversation(conversation('bad', 'first'))
+        index.submit_conversation(conversation('good', 'second'))
+        assert wait_until(lambda: index.has_conversation('good'))
+        assert not index.has_conversation('bad')
+    finally:
+        index.stop()
@@ -0,0 +1,48 @@
+import pytest
+
+from terminator_app.Chat.Streaming_markdown import StreamingMarkdown
+
+
+def renderer():
+    return StreamingMarkdown(
+        render_prose=lambda text, width: f"<p {text.strip()!r}>",
+        render_code=lambda lang, lines, width: f"<code {lang} {lines!r}>",
+    )
+
+
+TEXTS = {
+    'inline fence': "Wrap it in ``` fences like this.\n\n```python\nprint(1)\n```\n\nDone.",
+    'fence without newline': "Try ```python print(1)``` inline.\n\nThen:\n\n```\nx = 1\n```\n\nEnd.",
+    'unclosed fence': "Start.\n\n```js\nconsole.log(1);\nstill going",
+    'multiple code blocks': "One:\n```py\na = 1\n```\nTwo:\n```\nb = 2\n```\n\nAfter ``` the end.\n\nBye.",
+    'fence right after a block': "```\na\n``````sh\nb\n```\n\nok",
+}
+
+
+@pytest.mark.parametrize("text", TEXTS.values(), ids=TEXTS.keys())
+def test_incremental_render_matches_whole_text(text):
+    streaming = renderer()
+    for end in range(1, len(text) + 1):
+        assert streaming.render(text[:end], 80) == renderer().render(text[:end], 80), text[:end]
+
+
+def test_inline_fence_does_not_hide_later_code_blocks():
+    markup = renderer().render(TEXTS['inline fence'], 80)
+    assert markup == "\n\n".join([
+        "<p 'Wrap it in ``` fences like this.'>",
+        "<code python ['print(1)']>",
+        "<p 'Done.'>",
+    ])
+
+
+def test_blocks_after_an_inline_fence_are_reused():
+    calls = []
+    streaming = StreamingMarkdown(
+        render_prose=lambda text, width: calls.append(text) or text,
+        render_code=lambda lang, lines, width: calls.append(lines) or "code",
+    )
+    text = TEXTS['inline fence']
+    streaming.render(text, 80)
+    calls.clear()
+    streaming.render(text + " More", 80)
+    assert calls == ["Done. More"]  # Only the growing last paragraph is rendered again
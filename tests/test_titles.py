@@ -0,0 +1,27 @@
+from terminator_app.config import UserConfig
+from terminator_app.Controller.AI_Controller import AIController
+
+
+class FailingModel:
+    def __init__(self, **config):
+        self.calls = 0
+
+    def generate_content(self, contents):
+        self.calls += 1
+        raise RuntimeError("backend unavailable")
+
+
+def conversation(conv_id):
+    return {'id': conv_id, 'messages': [{}, {'user': {'role': 'user', 'parts': [{'text': 'question'}]},
+                                             'model': {'role': 'model', 'parts': [{'text': 'answer'}]}}]}
+
+
+def test_failed_batch_sets_no_titles_and_makes_one_call(monkeypatch):
+    monkeypatch.setattr(UserConfig, 'CACHE_RESPONSES', False)
+    controller = AIController(FailingModel, {'model_name': 'test'})
+    titles = controller._generate_titles([conversation(f'c{i}') for i in range(5)])
+    assert titles == {}
+    assert controller.model.calls == 1
+    # A single conversation does not get the error message as its title either
+    assert controller._generate_titles([conversation('c0')]) == {'c0': ''}
+    controller.worker_pool.shutdown()
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from terminator_app.Models.token_channel import TokenChannel
+
+
+def test_first_fragment_is_passed_on_at_once():
+    channel = TokenChannel(flush_interval=60, flush_chars=100, max_pending_chars=0)
+    channel.put('Hel')
+    assert channel.get() == 'Hel'
+
+
+def test_flush_by_size():
+    channel = TokenChannel(flush_interval=60, flush_chars=4, max_pending_chars=0)
+    channel.put('a')
+    assert channel.get() == 'a'
+    for fragment in ['bc', 'de', 'f']:
+        channel.put(fragment)
+    # Four pending characters are enough; the oldest fragment is nowhere near due
+    assert channel.get() == 'bcdef'
+    channel.close()
+    assert channel.get() is None
+
+
+def test_flush_by_age():
+    channel = TokenChannel(flush_interval=0.05, flush_chars=100, max_pending_chars=0)
+    channel.put('a')
+    assert channel.get() == 'a'
+    channel.put('b')
+    started = time.monotonic()
+    assert channel.get() == 'b'
+    assert time.monotonic() - started >= 0.04
+
+
+def test_producer_waits_for_the_consumer():
+    channel = TokenChannel(flush_interval=0, flush_chars=1, max_pending_chars=4)
+    done = threading.Event()
+
+    def produce():
+        channel.put('abcd')
+        channel.put('efgh')  # Blocks until 'abcd' is read
+        done.set()
+
+    threading.Thread(target=produce, daemon=True).start()
+    assert not done.wait(0.1)
+    assert channel.get() == 'abcd'
+    assert done.wait(2)
+    assert channel.stats['producer_waits'] >= 1
+    assert channel.get() == 'efgh'
+
+
+def test_error_is_raised_after_the_remaining_text():
+    channel = TokenChannel.from_iterable(iter_then_raise(['a', 'b']), flush_interval=60,
+                                         flush_chars=100, max_pending_chars=0)
+    received = []
+    with pytest.raises(RuntimeError, match='lost'):
+        for chunk in channel:
+            received.append(chunk)
+    assert ''.join(received) == 'ab'
+
+
+def test_abandon_releases_the_producer():
+    channel = TokenChannel(flush_interval=0, flush_chars=1, max_pending_chars=2)
+    channel.put('ab')
+    results = []
+    producer = threading.Thread(target=lambda: results.append(channel.put('cd')), daemon=True)
+    producer.start()
+    channel.abandon()
+    producer.join(2)
+    assert results == [False]
+    assert channel.put('ef') is False
+
+
+def iter_then_raise(fragments):
+    yield from fragments
+    raise RuntimeError('connection lost')
+
+
+async def agen(fragments, delay=0, error=None):
+    for fragment in fragments:
+        await asyncio.sleep(delay)
+        yield fragment
+    if error:
+        raise error
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+def test_acoalesce_merges_async_fragments():
+    stream = TokenChannel.acoalesce(agen(['a', 'b', 'c', 'd', 'e']), flush_interval=60, flush_chars=2)
+    chunks = asyncio.run(collect(stream))
+    assert chunks[0] == 'a'
+    assert ''.join(chunks) == 'abcde'
+    assert len(chunks) < 5
+
+
+def test_acoalesce_flushes_by_age():
+    # Without the age flush, 'b' and 'c' would wait for the end of the stream
+    stream = TokenChannel.acoalesce(agen(['a', 'b', 'c'], delay=0.1), flush_interval=0.02, flush_chars=100)
+    assert asyncio.run(collect(stream)) == ['a', 'b', 'c']
+
+
+def test_acoalesce_raises_after_the_remaining_text():
+    async def main():
+        received = []
+        with pytest.raises(RuntimeError, match='lost'):
+            async for chunk in TokenChannel.acoalesce(agen(['a', 'b'], error=RuntimeError('lost')),
+                                                      flush_interval=60, flush_chars=100):
+                received.append(chunk)
+        return received
+
+    assert ''.join(asyncio.run(main())) == 'ab'
+
+
+def test_acoalesce_close_cancels_the_source():
+    async def main():
+        state = {'stopped': False}
+
+        async def source():
+            try:
+                while True:
+                    await asyncio.sleep(0.01)
+                    yield 'x'
+            finally:
+                state['stopped'] = True
+
+        stream = TokenChannel.acoalesce(source(), flush_interval=0, flush_chars=1)
+        assert await stream.__anext__() == 'x'
+        await stream.aclose()
+        return state['stopped']
+
+    assert asyncio.run(main())
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+import pytest
+
+from terminator_app.Controller.Title_queue import TitleQueue
+from terminator_app.Controller.Worker_pool import Priority, WorkerPool
+
+
+def blocked_pool(max_queue):
+    """A one-worker pool whose worker is busy until the returned event is set."""
+    pool = WorkerPool(max_workers=1, max_queue=max_queue, backend_limits={})
+    release, started = threading.Event(), threading.Event()
+    pool.submit(lambda: (started.set(), release.wait()), priority=Priority.CHAT)
+    assert started.wait(2)
+    return pool, release
+
+
+def test_dropped_task_calls_on_cancel():
+    pool, release = blocked_pool(max_queue=1)
+    cancelled = []
+    pool.submit(lambda: None, priority=Priority.INDEXING, on_cancel=lambda: cancelled.append('summary'))
+    pool.submit(lambda: None, priority=Priority.CHAT)
+    assert cancelled == ['summary']
+    release.set()
+    pool.shutdown(wait=True)
+
+
+def test_cancel_and_shutdown_call_on_cancel():
+    pool, release = blocked_pool(max_queue=0)
+    cancelled = []
+    pool.submit(lambda: None, key='a', on_cancel=lambda: cancelled.append('a'))
+    pool.submit(lambda: None, key='b', on_cancel=lambda: cancelled.append('b'))
+    assert pool.cancel('a') == 1
+    pool.shutdown()
+    assert cancelled == ['a', 'b']
+    release.set()
+
+
+def test_title_queue_recovers_from_dropped_and_rejected_batches():
+    pool, release = blocked_pool(max_queue=1)
+    titled = threading.Event()
+    queue = TitleQueue(
+        lambda conversations: {conv['id']: 'Title' for conv in conversations},
+        gather_delay=0,
+        schedule=lambda fn, on_cancel: pool.submit(fn, priority=Priority.TITLES, on_cancel=on_cancel),
+    )
+    queue.submit({'id': 'a'})
+    # A chat request pushes the title batch out of the full queue
+    chat = pool.submit(lambda: None, priority=Priority.CHAT)
+    # The queue is full of chat work: this batch is rejected, not raised
+    queue.submit({'id': 'a'})
+    release.set()
+    # Once there is room, the next submit schedules the batch again
+    assert chat.done.wait(2)
+    queue.submit({'id': 'a'}, callback=lambda conv_id, title: titled.set())
+    assert titled.wait(2)
+    pool.shutdown(wait=True)
+
+
+def test_async_slot_counts_against_backend_limit():
+    pool = WorkerPool(max_workers=4, max_queue=0, backend_limits={'local': 1})
+    order = []
+
+    async def stream(name, hold):
+        async with pool.slot(Priority.CHAT, backend='local'):
+            order.append(name)
+            await hold.wait()
+
+    async def main():
+        first_done, second_done = asyncio.Event(), asyncio.Event()
+        first = asyncio.create_task(stream('first', first_done))
+        second = asyncio.create_task(stream('second', second_done))
+        await asyncio.sleep(0.1)
+        assert order == ['first']
+        assert pool.metrics()['running_per_backend'] == {'local': 1}
+        first_done.set()
+        await asyncio.wait_for(first, 2)
+        second_done.set()
+        await asyncio.wait_for(second, 2)
+
+    asyncio.run(main())
+    assert order == ['first', 'second']
+    pool.shutdown(wait=True)
+
+
+def test_async_slot_dropped_before_start_raises():
+    pool, release = blocked_pool(max_queue=1)
+
+    async def main():
+        waiting = asyncio.create_task(pool.slot(Priority.INDEXING).__aenter__())
+        await asyncio.sleep(0.05)
+        pool.submit(lambda: None, priority=Priority.CHAT)
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(waiting, 2)
+
+    asyncio.run(main())
+    release.set()
+    pool.shutdown(wait=True)